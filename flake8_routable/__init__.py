@@ -0,0 +1,1508 @@
+# Python imports
+import ast
+import bisect
+import importlib.metadata as importlib_metadata
+import threading
+import time
+import tokenize
+import warnings
+from collections import Counter, defaultdict
+from collections.abc import Callable, Generator, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from itertools import chain, islice
+from types import MappingProxyType
+from typing import Any
+
+# Internal imports
+from flake8_routable.baseline import Baseline
+
+
+CLASS_AND_FUNC_TOKENS = (
+    "class",
+    "def",
+)
+
+# comments to ignore, including section headers
+IGNORABLE_COMMENTS = (
+    "# ==",
+    "# --",
+)
+
+MAX_BLANK_LINES_AFTER_COMMENT = 2
+
+# comments that allow a .save() without update_fields
+SAVE_ALLOWED_COMMENTS = (
+    "# TODO: needs fix",
+    "# file save",
+    "# form save",
+    "# ledger save",
+    "# multi-line with update_fields",
+    "# new model save",
+    "# not a model",
+    "# save extension",
+    "# serializer save",
+)
+
+# receiver of the calls that create FeatureFlags
+FEATURE_FLAG_MANAGER = ("FeatureFlag", "objects")
+
+# comments that allow creating a FeatureFlag in code
+FEATURE_FLAG_ALLOWED_COMMENTS = (
+    "# valid for legacy cross-border work",
+    "# valid for management command",
+)
+
+# Note: The rule should be what is wrong, not how to fix it
+ROU100 = "ROU100 Triple double quotes not used for docstring"
+ROU101 = "ROU101 Import from a tests directory"
+ROU102 = "ROU102 Strings should not span multiple lines except comments or docstrings"
+ROU103 = "ROU103 Object does not have attributes in order"
+ROU104 = "ROU104 Multiple blank lines are not allowed after a non-section comment"
+ROU105 = "ROU105 Constants are not in order"
+ROU106 = "ROU106 Relative imports are not allowed"
+ROU107 = "ROU107 Inline function import is not at top of statement"
+ROU108 = "ROU108 Import from model module instead of sub-packages"
+ROU109 = "ROU109 Disallow rename migrations"
+ROU110 = "ROU110 Disallow .save() with no update_fields"
+ROU111 = "ROU111 Disallow FeatureFlag creation in code"
+ROU112 = "ROU112 Tasks mush have *args, **kwargs"
+ROU113 = "ROU113 Tasks can not have priority in the signature"
+ROU114 = "ROU114 Field default exists but db_default does not"
+ROU115 = "ROU115 Field default and db_default do not match"
+ROU116 = "ROU116 Field has both default and null set"
+ROU117 = "ROU117 File was only partly checked, it ran over its time budget"
+
+MESSAGES = (
+    ROU100,
+    ROU101,
+    ROU102,
+    ROU103,
+    ROU104,
+    ROU105,
+    ROU106,
+    ROU107,
+    ROU108,
+    ROU109,
+    ROU110,
+    ROU111,
+    ROU112,
+    ROU113,
+    ROU114,
+    ROU115,
+    ROU116,
+    ROU117,
+)
+
+ALL_CODES = frozenset(message.split(" ", 1)[0] for message in MESSAGES)
+
+# rules of the AST checker, which reads neither the tokens nor the lines of a file
+AST_CODES = frozenset(("ROU101", "ROU103", "ROU105", "ROU106", "ROU107", "ROU108"))
+
+# rules of the physical line checker
+LINE_CODES = frozenset(("ROU109",))
+
+# rules of the token checker
+TOKEN_CODES = ALL_CODES - AST_CODES - LINE_CODES - {"ROU117"}
+
+# rules that only enforce style, not run on generated or oversized files
+STYLE_CODES = frozenset(("ROU100", "ROU102", "ROU103", "ROU104", "ROU105"))
+
+# rules that do not apply to some paths, see `path_disabled_codes`
+PATH_DEPENDENT_CODES = frozenset(("ROU114", "ROU115", "ROU116"))
+
+# rules skipped once a file has run over its time budget
+EXPENSIVE_CODES = frozenset(("ROU103", "ROU114", "ROU115", "ROU116"))
+
+# how much of the start of a file is searched for the markers below
+HEADER_BYTES = 4096
+
+# markers of generated files, which are only checked by the non-style rules
+GENERATED_MARKERS = ("# Generated by Django",)
+
+# markers of files that are not checked at all
+SKIP_FILE_MARKERS = ("# routable: skip-file",)
+
+UNDEFINED = object()
+
+# statements remembered per rule before the memo starts over
+STATEMENT_MEMO_SIZE = 65536
+
+# the base class of every Django model, as in `models.Model`
+MODEL_BASE = "Model"
+
+# tokens sent to the token rules at once, all that is held of a file whose tokens are streamed
+TOKEN_CHUNK_SIZE = 4096
+
+# tokens after which the next token starts a line
+LINE_BREAK_TOKENS = frozenset((tokenize.DEDENT, tokenize.INDENT, tokenize.NEWLINE, tokenize.NL))
+
+# tokens that may end a signature (`:`) or start the line after it (a docstring or comment)
+SIGNATURE_TOKENS = frozenset((tokenize.COMMENT, tokenize.OP, tokenize.STRING))
+
+# a token rule, sent the tokens of a file a chunk at a time
+TokenConsumer = Generator[None, Sequence[tokenize.TokenInfo], None]
+
+
+@dataclass(frozen=True)
+class SkipConfig:
+    """Decides from a file's header and size which rules are not worth running on it."""
+
+    max_bytes: int | None = None
+    max_lines: int | None = None
+    time_budget: float | None = None
+    generated_markers: tuple[str, ...] = GENERATED_MARKERS
+    skip_file_markers: tuple[str, ...] = SKIP_FILE_MARKERS
+
+    def disabled_codes(self, header: str, size: int, line_count: int | None = None) -> frozenset[str]:
+        """
+        The codes not to check, from the first `HEADER_BYTES` of a file and its size.
+
+        Markers only count at the start of a line, so a string mentioning one does not skip the file.
+
+        `ALL_CODES` means the file is skipped entirely. `line_count` may be left out when it is not known yet, in
+        which case the line threshold is not applied.
+        """
+        header_lines = [line.lstrip() for line in header.splitlines()]
+        if any(line.startswith(self.skip_file_markers) for line in header_lines):
+            return ALL_CODES
+
+        if (
+            any(line.startswith(self.generated_markers) for line in header_lines)
+            or (self.max_bytes is not None and size > self.max_bytes)
+            or (self.max_lines is not None and line_count is not None and line_count > self.max_lines)
+        ):
+            return STYLE_CODES
+
+        return frozenset()
+
+
+class RuleTimer:
+    """
+    Time spent in each rule on one file.
+
+    With a `budget` in seconds, the rules in `EXPENSIVE_CODES` are skipped once the file has run over it.
+    """
+
+    def __init__(self, budget: float | None = None) -> None:
+        self.degraded = False
+        self.timings = Counter()
+
+        self._deadline = None if budget is None else time.perf_counter() + budget
+
+    @property
+    def total(self) -> float:
+        return sum(self.timings.values())
+
+    def run(self, codes: tuple[str, ...], rule: Callable[..., Any], *args: Any) -> None:
+        """Run `rule`, counting its time against `codes`, unless it is expensive and the budget has run out."""
+        if self._deadline is not None and EXPENSIVE_CODES.issuperset(codes) and time.perf_counter() > self._deadline:
+            self.degraded = True
+            return
+
+        start = time.perf_counter()
+        try:
+            rule(*args)
+        finally:
+            self.timings["/".join(codes)] += time.perf_counter() - start
+
+    def slowest_rule(self) -> str | None:
+        return max(self.timings, key=self.timings.__getitem__, default=None)
+
+
+class StatementMemo:
+    """
+    A rule's verdicts on statement texts already seen in this process.
+
+    Migrations and model modules repeat the same statements many times, so a repeated statement costs a lookup
+    instead of a scan. It is safe to share between threads.
+    """
+
+    def __init__(self, max_entries: int = STATEMENT_MEMO_SIZE) -> None:
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def get(self, key: Any) -> Any:
+        """The remembered verdict, or `UNDEFINED`."""
+        with self._lock:
+            verdict = self._entries.get(key, UNDEFINED)
+            if verdict is UNDEFINED:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return verdict
+
+    def set(self, key: Any, verdict: Any) -> None:
+        with self._lock:
+            if len(self._entries) >= self._max_entries:
+                self._entries.clear()
+            self._entries[key] = verdict
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# memos of the rules that judge a statement by its text, shared by every file linted in this process
+STATEMENT_MEMOS = MappingProxyType(
+    {
+        "model_field_definitions": StatementMemo(),
+    }
+)
+
+
+def statement_memo_counts() -> dict[str, int]:
+    """Hits and misses of every statement memo so far, for the instrumentation summary."""
+    return {
+        "memo hits": sum(memo.hits for memo in STATEMENT_MEMOS.values()),
+        "memo misses": sum(memo.misses for memo in STATEMENT_MEMOS.values()),
+    }
+
+
+def receiver_chain(node: ast.Call) -> tuple[str, ...]:
+    """
+    The names a method is called on, outermost first.
+
+    For `FeatureFlag.objects.filter(...).create()` they are `("FeatureFlag", "objects", "filter")`.
+    """
+    names = []
+    value = node.func.value
+    while True:
+        if isinstance(value, ast.Attribute):
+            names.append(value.attr)
+            value = value.value
+        elif isinstance(value, ast.Call):
+            value = value.func
+        else:
+            if isinstance(value, ast.Name):
+                names.append(value.id)
+            return tuple(reversed(names))
+
+
+def is_called_on(node: ast.Call, receiver: tuple[str, str]) -> bool:
+    """Whether a method is called on `receiver`, such as `FeatureFlag.objects`, however it is qualified."""
+    chain = receiver_chain(node)
+    return receiver in zip(chain, chain[1:])
+
+
+def path_disabled_codes(filename: str) -> frozenset[str]:
+    """The codes that do not apply to a file because of where it is."""
+    if "/migrations/" in filename or "/tests/" in filename:
+        return PATH_DEPENDENT_CODES
+    return frozenset()
+
+
+def indentation(line: str) -> int:
+    """The column of the first character of a line that is not whitespace."""
+    return len(line) - len(line.lstrip())
+
+
+def base_names(node: ast.ClassDef) -> tuple[str, ...]:
+    """The last part of each base class's name, `models.Model` is `Model` and `Generic[T]` is `Generic`."""
+    names = []
+    for base in node.bases:
+        if isinstance(base, ast.Subscript):
+            base = base.value
+        if isinstance(base, ast.Attribute):
+            names.append(base.attr)
+        elif isinstance(base, ast.Name):
+            names.append(base.id)
+    return tuple(names)
+
+
+def model_names(classes: Iterable[tuple[str, Iterable[str]]], known: Iterable[str] = ()) -> frozenset[str]:
+    """
+    Names of the classes deriving from a Django model, through any number of abstract models and mixins.
+
+    `classes` are `(name, base names)` pairs, `known` are the names already known to be models.
+    """
+    subclasses = defaultdict(list)
+    for name, bases in classes:
+        for base in bases:
+            subclasses[base].append(name)
+
+    names = {*known, MODEL_BASE}
+    pending = list(names)
+    while pending:
+        for name in subclasses.pop(pending.pop(), ()):
+            if name not in names:
+                names.add(name)
+                pending.append(name)
+    return frozenset(names)
+
+
+def split_markers(value: str) -> tuple[str, ...]:
+    """Markers from a comma-separated option, flake8's own list parsing would also split them on whitespace."""
+    return tuple(marker.strip() for marker in value.split(",") if marker.strip())
+
+
+class LintClass:
+    """A rule over file tokens, fed them in order a chunk at a time by `consume` instead of holding them all."""
+
+    def __init__(self, filename, errors) -> None:
+        self._filename = filename
+        self._errors = errors
+
+    def consume(self) -> TokenConsumer:
+        raise NotImplementedError()
+
+
+class ModelFieldDefinitions(LintClass):
+
+    # read-only so it can be shared by threads linting concurrently
+    SWAP_VALUES = MappingProxyType(
+        {
+            "list": "[]",
+            "dict": "{}",
+            "timezone.now": "Now()",
+        }
+    )
+
+    @dataclass
+    class PropertyInfo:
+        token_str: str
+        position: int = -1
+        position_end: bool = True
+        value: Any = UNDEFINED
+
+        def reset(self):
+            self.position = -1
+            self.position_end = True
+            self.value = UNDEFINED
+
+    def __init__(self, *args, in_model=False, model_spans=None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        # whether a model was entered before these tokens, when linting part of a file
+        self._in_model = in_model
+
+        # first and last line of each model class, when the models are known instead of guessed from base names
+        self._model_spans = model_spans
+
+        self.default_property = self.PropertyInfo(token_str="default")
+        self.db_default_property = self.PropertyInfo(token_str="db_default")
+        self.null_property = self.PropertyInfo(token_str="null")
+
+        self.properties = [
+            self.default_property,
+            self.db_default_property,
+            self.null_property,
+        ]
+
+        # state of the scan, carried from one chunk of tokens to the next
+        self._field_start = None
+        self._field_start_indices = None
+        self._in_field_params = 0
+        self._skip_until = -1
+
+    def consume(self) -> TokenConsumer:
+        if path_disabled_codes(self._filename):
+            return
+
+        offset = 0
+        if self._model_spans is None:
+            while True:
+                tokens = yield
+                self._in_model = self.scan(tokens, offset, self._in_model)
+                offset += len(tokens)
+
+        spans = self._model_spans
+        span_index = 0
+        in_span = False
+        while span_index < len(spans):
+            tokens = yield
+            start = 0
+            while span_index < len(spans):
+                first_line, last_line = spans[span_index]
+                start = bisect.bisect_left(tokens, first_line, lo=start, key=lambda token: token.start[0])
+                end = bisect.bisect_right(tokens, last_line, lo=start, key=lambda token: token.start[0])
+                if start < end:
+                    if not in_span:
+                        self.reset_scan()
+                        in_span = True
+                    self.scan(tokens[start:end], offset + start, in_model=True)
+                # the model may go on in the next chunk
+                if end == len(tokens):
+                    break
+
+                # a model nested in a model was scanned with it
+                while span_index < len(spans) and spans[span_index][0] <= last_line:
+                    span_index += 1
+                in_span = False
+                start = end
+            offset += len(tokens)
+
+    def reset_scan(self) -> None:
+        self._field_start = None
+        self._field_start_indices = None
+        self._in_field_params = 0
+        self._skip_until = -1
+
+    def scan(self, tokens: Sequence[tokenize.TokenInfo], offset: int, in_model: bool) -> bool:
+        """Check the fields in `tokens`, which start at index `offset` of the file, returning `in_model` after them."""
+        memo = STATEMENT_MEMOS["model_field_definitions"]
+        guess_models = self._model_spans is None
+        field_start, field_start_indices = self._field_start, self._field_start_indices
+        in_field_params, skip_until = self._in_field_params, self._skip_until
+
+        for i, (token_type, token_str, start_indices, end_indices, line) in enumerate(tokens, offset):
+            if i < skip_until:
+                continue
+
+            end_of_signature = False
+
+            if (
+                token_type == tokenize.NAME
+                and in_field_params == 0
+                and guess_models
+                and self.enters_model(token_type, token_str, line)
+            ):
+                in_model = True
+                continue
+
+            if (
+                in_field_params == 0
+                and in_model is True
+                and token_type == tokenize.NAME
+                and token_str.endswith("Field")
+            ):
+                statement = self.statement_key(line, start_indices[1])
+                skip_until = self.replay_field(memo, statement, i, start_indices)
+                if skip_until > i:
+                    field_start_indices = None
+                    continue
+
+                field_start = (i, statement, len(self._errors))
+                field_start_indices = start_indices
+                continue
+
+            if field_start_indices and token_type == tokenize.OP and token_str == "(":
+                in_field_params += 1
+                if in_field_params == 1:
+                    continue
+
+            if field_start_indices and token_type == tokenize.OP and token_str == ")":
+                if in_field_params > 1:
+                    in_field_params -= 1
+                else:
+                    end_of_signature = True
+
+            if end_of_signature:
+                self.handle_signature_end(field_start_indices)
+                self.remember_field(memo, field_start, i, start_indices[0] == field_start_indices[0])
+                in_model = True
+                in_field_params = 0
+                field_start_indices = None
+
+            elif in_field_params > 0:
+                self.update_properties(i, token_type, token_str, line)
+
+        self._field_start, self._field_start_indices = field_start, field_start_indices
+        self._in_field_params, self._skip_until = in_field_params, skip_until
+        return in_model
+
+    def replay_field(self, memo: StatementMemo, statement: tuple[str, int], i: int, start_indices) -> int:
+        """
+        Report the verdict on a field signature seen before on a line like this one.
+
+        Returns the index of the first token after the signature, or -1 when it was not seen before.
+        """
+        verdict = memo.get(statement)
+        if verdict is UNDEFINED:
+            return -1
+
+        codes, token_count = verdict
+        self._errors.extend((*start_indices, code) for code in codes)
+        return i + token_count
+
+    def remember_field(self, memo: StatementMemo, field_start, end: int, is_single_line: bool) -> None:
+        """Remember the verdict on a field signature, only one on a single line is fully described by its text."""
+        if not is_single_line:
+            return
+
+        start, statement, error_count = field_start
+        memo.set(statement, (tuple(error[2] for error in self._errors[error_count:]), end + 1 - start))
+
+    @staticmethod
+    def statement_key(line: str, col: int) -> tuple[str, int]:
+        """The line of a field signature without its indentation, with the column of the field within it."""
+        statement = line.lstrip()
+        return statement, col - (len(line) - len(statement))
+
+    @staticmethod
+    def enters_model(token_type, token_str, line) -> bool:
+        """Whether the token names a model base class, after which fields are checked."""
+        return (
+            token_type == tokenize.NAME
+            and (token_str.startswith("Base") or token_str == "Model")
+            and not line.startswith("from")
+        )
+
+    def handle_signature_end(self, field_start_indices):
+        for property in self.properties:
+            property.value = self.SWAP_VALUES.get(property.value, property.value)
+
+            if self.default_property.value != UNDEFINED and self.db_default_property.value == UNDEFINED:
+                self._errors.append((*field_start_indices, ROU114))
+            elif self.default_property.value != self.db_default_property.value:
+                self._errors.append((*field_start_indices, ROU115))
+            if self.default_property.value != UNDEFINED and self.null_property.value == "True":
+                self._errors.append((*field_start_indices, ROU116))
+
+            for property in self.properties:
+                property.reset()
+
+    def update_properties(self, i, token_type, token_str, line) -> None:
+        for property in self.properties:
+            if token_type == tokenize.NAME and token_str == property.token_str:
+                property.position = i + 2
+                property.position_end = False
+            elif i >= property.position and not property.position_end:
+                if token_str == "uuid" and line.strip() == (
+                    "id = models.UUIDField(db_index=True, default=uuid.uuid4, editable=False, primary_key=True)"
+                ):
+                    property.position_end = True
+                    continue
+
+                if token_str in [",", "\n"]:
+                    property.position_end = True
+                    continue
+
+                if property.value == UNDEFINED:
+                    property.value = ""
+                property.value += token_str
+
+
+@dataclass
+class BlankLinesAfterCommentConditions:
+
+    # Comment that is a section comment
+    section_comment: bool = True
+
+    # New line after comment
+    nl1_after_comment: bool = False
+
+    # Another new line after comment
+    nl2_after_comment: bool = False
+
+    # Another new line after comment
+    nl3_after_comment: bool = False
+
+    # A dedent
+    dedent: bool = False
+
+    # A class/function statement or statement decorator after dedent
+    stmt_or_decorator: bool = True
+
+    def is_all_passed(self):
+        return (
+            not self.section_comment
+            and self.nl1_after_comment
+            and self.nl2_after_comment
+            and self.nl3_after_comment
+            and self.dedent
+            and not self.stmt_or_decorator
+        )
+
+
+@dataclass
+class AstIndex:
+    """Nodes found by the AST pass, looked up by the rules that also need tokens."""
+
+    # method calls by method name
+    call_sites: defaultdict[str, list[ast.Call]] = field(default_factory=lambda: defaultdict(list))
+
+    # class and function definitions, in the order they start
+    definitions: list[ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef] = field(default_factory=list)
+
+    # names bound by imports, with the qualified name they import
+    import_aliases: dict[str, str] = field(default_factory=dict)
+
+    def add_imports(self, node: ast.Import | ast.ImportFrom) -> None:
+        prefix = f"{node.module}." if isinstance(node, ast.ImportFrom) and node.module else ""
+        for alias in node.names:
+            self.import_aliases[alias.asname or alias.name] = f"{prefix}{alias.name}"
+
+    def model_classes(self, names: frozenset[str]) -> list[ast.ClassDef]:
+        """The classes deriving from one of `names`, or from another model class found here."""
+        classes = [node for node in self.definitions if isinstance(node, ast.ClassDef)]
+        names = model_names(((node.name, base_names(node)) for node in classes), names)
+        return [node for node in classes if not names.isdisjoint(base_names(node))]
+
+    def is_task_decorator(self, decorator: ast.expr) -> bool:
+        """Whether a decorator is celery's `shared_task`, however it was imported."""
+        if isinstance(decorator, ast.Call):
+            decorator = decorator.func
+
+        if isinstance(decorator, ast.Attribute):
+            return decorator.attr == "shared_task"
+        if isinstance(decorator, ast.Name):
+            qualified_name = self.import_aliases.get(decorator.id, decorator.id)
+            return qualified_name.rsplit(".", 1)[-1] == "shared_task"
+        return False
+
+
+@dataclass(frozen=True)
+class ProjectModule:
+    """A module of the project, from the module index."""
+
+    path: str
+    is_package: bool
+
+    # in a `tests` package, or a `tests` module itself
+    is_test: bool
+
+    # in a `models` package, rather than the package itself
+    is_models_submodule: bool
+
+
+def import_aliases(tree: ast.AST) -> dict[str, str]:
+    """The import alias table of a whole file, for linting part of it."""
+    index = AstIndex()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            index.add_imports(node)
+    return index.import_aliases
+
+
+class Visitor(ast.NodeVisitor):
+    """Linting errors that use the AST."""
+
+    # error codes of each handler, a handler is not run when all of its codes are disabled
+    HANDLER_CODES = {
+        "visit_Assign": ("ROU105",),
+        "visit_AsyncFunctionDef": ("ROU100", "ROU112", "ROU113"),
+        "visit_Call": ("ROU110", "ROU111"),
+        # the class definitions are also where the field rules find the models
+        "visit_ClassDef": ("ROU100", "ROU114", "ROU115", "ROU116"),
+        "visit_Dict": ("ROU103",),
+        "visit_FunctionDef": ("ROU100", "ROU107", "ROU112", "ROU113"),
+        "visit_Import": ("ROU112", "ROU113"),
+        "visit_ImportFrom": ("ROU101", "ROU106", "ROU108", "ROU112", "ROU113"),
+        "visit_Set": ("ROU103",),
+    }
+
+    def __init__(
+        self,
+        disabled_codes: frozenset[str] = frozenset(),
+        timer: RuleTimer | None = None,
+        import_aliases: dict[str, str] | None = None,
+        modules: Mapping[str, ProjectModule] | None = None,
+    ) -> None:
+        self.errors = []
+        self.index = AstIndex(import_aliases=dict(import_aliases or {}))
+
+        self._constant_nodes = []
+        self._disabled_handlers = {
+            handler for handler, codes in self.HANDLER_CODES.items() if disabled_codes.issuperset(codes)
+        }
+        self._last_constant_end_lineno = None
+        self._modules = modules
+        self._timer = timer
+
+    def _check_constant_order(self, group: list[ast.Assign]):
+        group_strings = [node.targets[0].id.replace("_", " ") for node in group]
+        if sorted(group_strings) != group_strings:
+            self.errors.append((group[0].lineno, group[0].col_offset, ROU105))
+
+    def _is_ordered(self, values: list[Any]) -> bool:
+        stringify = [self._parse_to_string(value).lower() for value in values]
+        return sorted(stringify) == stringify
+
+    def _parse_Attribute(self, node: ast.Attribute | ast.Name, s="") -> str:
+        if isinstance(node, ast.Attribute):
+            return self._parse_Attribute(node.value, s=f".{node.attr}{s}")
+        return f"{self._parse_to_string(node)}{s}"
+
+    def _parse_to_string(self, node):
+        if isinstance(node, ast.Attribute):
+            value = self._parse_Attribute(node)
+        elif isinstance(node, ast.Call):
+            value = self._parse_to_string(node.func)
+        elif isinstance(node, ast.Constant):
+            value = node.value
+        elif isinstance(node, ast.Name):
+            value = node.id
+        elif isinstance(node, ast.JoinedStr):
+            value = "".join([self._parse_to_string(value) for value in node.values])
+        elif isinstance(node, ast.Tuple):
+            value = "".join([self._parse_to_string(elt) for elt in node.elts])
+        elif hasattr(node, "value"):
+            value = self._parse_to_string(node.value)
+        else:
+            warnings.warn(f"Could not parse {type(node)}")
+            return ""
+        return str(value)
+
+    def finalize(self):
+        """Run methods after every node has been visited"""
+        self._check_constant_order(self._constant_nodes)
+
+    def visit(self, node: ast.AST) -> Any:
+        method = "visit_" + node.__class__.__name__
+        visitor = getattr(self, method, None) if method not in self._disabled_handlers else None
+        if not visitor:
+            return self.generic_visit(node)
+        codes = self.HANDLER_CODES.get(method)
+        if self._timer is None or codes is None:
+            visitor(node)
+        else:
+            self._timer.run(codes, visitor, node)
+        return self.generic_visit(node)
+
+    def visit_Assign(self, node: ast.Assign) -> Any:
+        target = node.targets[0]
+        if isinstance(target, ast.Name) and target.id.isupper():
+            if self._last_constant_end_lineno != node.lineno - 1:
+                self._check_constant_order(self._constant_nodes)
+                self._constant_nodes = []
+
+            self._constant_nodes.append(node)
+            self._last_constant_end_lineno = node.end_lineno
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        self.index.definitions.append(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if isinstance(node.func, ast.Attribute):
+            self.index.call_sites[node.func.attr].append(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self.index.definitions.append(node)
+
+    def visit_Dict(self, node: ast.Dict) -> None:
+        if None not in node.keys and not self._is_ordered(node.keys):
+            self.errors.append((node.lineno, node.col_offset, ROU103))
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self.index.definitions.append(node)
+
+        has_non_docstring_before_import = False
+        for i, body_node in enumerate(node.body):
+            # ignore docstrings
+            if isinstance(body_node, ast.Expr) and i == 0:
+                continue
+            # note we hit an import statement
+            elif isinstance(body_node, ast.ImportFrom):
+                if has_non_docstring_before_import:
+                    self.errors.append((body_node.lineno, body_node.col_offset, ROU107))
+            else:
+                has_non_docstring_before_import = True
+
+    def visit_Import(self, node: ast.Import) -> None:
+        self.index.add_imports(node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        self.index.add_imports(node)
+
+        if node.module is not None and self._imports_tests(node.module):
+            self.errors.append((node.lineno, node.col_offset, ROU101))
+
+        if node.level > 0:
+            self.errors.append((node.lineno, node.col_offset, ROU106))
+
+        if node.module is not None and self._imports_models_submodule(node.module):
+            self.errors.append((node.lineno, node.col_offset, ROU108))
+
+    def _imports_tests(self, module: str) -> bool:
+        """Whether a module is in a tests directory, guessed from its name without a module index."""
+        if self._modules is None:
+            return "tests" in module
+        project_module = self._modules.get(module)
+        return project_module is not None and project_module.is_test
+
+    def _imports_models_submodule(self, module: str) -> bool:
+        """Whether a module is in a models package, guessed from its name without a module index."""
+        if self._modules is None:
+            return ".models." in module
+        project_module = self._modules.get(module)
+        return project_module is not None and project_module.is_models_submodule
+
+    def visit_Set(self, node: ast.Set) -> None:
+        if not self._is_ordered(node.elts):
+            self.errors.append((node.lineno, node.col_offset, ROU103))
+
+
+class SignatureEnds:
+    """
+    Finds the `:` ending each class or function signature in a stream of tokens, the last one before its body.
+
+    With it comes the string or comment starting the line after the `:`, where a docstring would be.
+    """
+
+    def __init__(self, nodes: Iterable[ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef]) -> None:
+        self._colon = None
+        self._next_line_start = None
+        self._last_type = None
+
+        # nodes by where their body starts, the next one to resolve last
+        self._pending = sorted(
+            ((self.body_start(node), i, node) for i, node in enumerate(nodes)),
+            key=lambda pending: pending[:2],
+            reverse=True,
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self._pending)
+
+    @staticmethod
+    def body_start(node: ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef) -> tuple[int, int]:
+        first = node.body[0]
+        return min((child.lineno, child.col_offset) for child in (first, *getattr(first, "decorator_list", ())))
+
+    def feed(self, tokens: Sequence[tokenize.TokenInfo]) -> Iterator[tuple[ast.AST, tuple[int, int], Any]]:
+        """
+        Yield `(node, position of the colon, string or comment token after it or None)` once its body starts.
+
+        Only the operators, strings and comments of a chunk are looked at, the other tokens leave the state as it is.
+        A body starting on another token is resolved at the next one looked at, or at the end of the chunk.
+        """
+        if not tokens:
+            return
+
+        for i in [i for i, token in enumerate(tokens) if token.type in SIGNATURE_TOKENS]:
+            token = tokens[i]
+            yield from self._resolve(token.start, inclusive=False)
+
+            # a docstring is the body's first statement, so it is looked at before the signature is resolved
+            if (
+                token.type != tokenize.OP
+                and self._colon is not None
+                and token.start[0] == self._colon.start[0] + 1
+                and (tokens[i - 1].type if i else self._last_type) in LINE_BREAK_TOKENS
+            ):
+                self._next_line_start = token
+
+            yield from self._resolve(token.start, inclusive=True)
+
+            if token.type == tokenize.OP and token.string == ":":
+                self._colon = token
+                self._next_line_start = None
+
+        yield from self._resolve(tokens[-1].start, inclusive=True)
+        self._last_type = tokens[-1].type
+
+    def _resolve(self, position: tuple[int, int], inclusive: bool) -> Iterator[tuple[ast.AST, tuple[int, int], Any]]:
+        """Yield the signatures whose body starts before `position`, or at it when `inclusive`."""
+        while self._pending and (position >= self._pending[-1][0] if inclusive else position > self._pending[-1][0]):
+            _, _, node = self._pending.pop()
+            if self._colon is None:
+                yield node, (node.lineno, node.col_offset), None
+            else:
+                yield node, self._colon.start, self._next_line_start
+
+
+class FileTokenHelper:
+    """
+    Linting errors that use file tokens.
+
+    Each rule is a consumer sent the tokens in order a chunk at a time, keeping only what it needs of the tokens
+    before, so the tokens can be streamed from the tokenizer instead of being held all at once.
+    """
+
+    # methods that start consuming file tokens for errors, with their error codes
+    RULES = (
+        ("lines_with_blank_lines_after_comments", ("ROU104",)),
+        ("lines_with_invalid_docstrings", ("ROU100",)),
+        ("lines_with_invalid_multi_line_strings", ("ROU102",)),
+        ("rename_migrations", ("ROU109",)),
+        ("disallow_no_update_fields_save", ("ROU110",)),
+        ("disallow_feature_flag_creation", ("ROU111",)),
+        ("task_args_kwargs_and_priority", ("ROU112", "ROU113")),
+        ("model_field_definitions", ("ROU114", "ROU115", "ROU116")),
+    )
+
+    def __init__(
+        self,
+        filename,
+        in_model=False,
+        disabled_codes: frozenset[str] = frozenset(),
+        timer: RuleTimer | None = None,
+        index: AstIndex | None = None,
+        model_names: frozenset[str] | None = None,
+    ) -> None:
+        self.errors = []
+        self._index = index or AstIndex()
+        self._model_names = model_names
+        self._disabled_codes = disabled_codes
+        self._filename = filename
+        self._in_model = in_model
+        self._timer = timer
+
+    def visit(self, file_tokens: Iterable[tokenize.TokenInfo]) -> None:
+        """Send the tokens to every rule, `file_tokens` may be a generator that is only read once."""
+        consumers = []
+        for rule, codes in self.RULES:
+            if self._disabled_codes.issuperset(codes):
+                continue
+            consumer = getattr(self, rule)()
+            # a rule with nothing to look for is done before it is sent any token
+            if next(consumer, StopIteration) is not StopIteration:
+                consumers.append((codes, consumer))
+
+        file_tokens = iter(file_tokens)
+        while consumers and (tokens := list(islice(file_tokens, TOKEN_CHUNK_SIZE))):
+            for codes, consumer in consumers:
+                if self._timer is None:
+                    self._send(consumer, tokens)
+                else:
+                    self._timer.run(codes, self._send, consumer, tokens)
+
+        for _, consumer in consumers:
+            consumer.close()
+
+    @staticmethod
+    def _send(consumer: TokenConsumer, tokens: list[tokenize.TokenInfo]) -> None:
+        try:
+            consumer.send(tokens)
+        except StopIteration:
+            pass
+
+    def model_field_definitions(self) -> TokenConsumer:
+        model_spans = None
+        if self._model_names is not None:
+            model_spans = [(node.lineno, node.end_lineno) for node in self._index.model_classes(self._model_names)]
+
+        # the rule memoizes the errors it found on a field, so other rules' errors are kept out of its list
+        errors = []
+        try:
+            yield from ModelFieldDefinitions(
+                self._filename,
+                errors,
+                in_model=self._in_model,
+                model_spans=model_spans,
+            ).consume()
+        finally:
+            self.errors.extend(errors)
+
+    def lines_with_blank_lines_after_comments(self) -> TokenConsumer:
+        """
+        Comments should not have more than one blank line after them.
+
+        The exception to this rule is if a comment is a section comment like so:
+            # -----------------
+            # Section Comment
+            # -----------------
+        """
+        # A bit array representing all the conditions it takes for an error to be found
+        # (see inline comments below on conditions)
+        conditions = BlankLinesAfterCommentConditions()
+        previous_start = None
+
+        while True:
+            tokens = yield
+            conditions = self._blank_lines_after_comments(tokens, conditions, previous_start)
+            previous_start = tokens[-1].start
+
+    def _blank_lines_after_comments(
+        self,
+        tokens: Sequence[tokenize.TokenInfo],
+        conditions: BlankLinesAfterCommentConditions,
+        previous_start: tuple[int, int] | None,
+    ) -> BlankLinesAfterCommentConditions:
+        """Check a chunk of tokens for ROU104, returning the conditions met at its end."""
+        for i, (token_type, token_str, start_indices, _, _) in enumerate(tokens):
+            do_reset_conditions = False
+
+            # Dedenting in progress
+            if conditions.dedent and conditions.stmt_or_decorator and token_type == tokenize.DEDENT:
+                continue
+            # Condition 6: Not a class/function statement, statement decorator, or section after dedent
+            elif (
+                conditions.dedent
+                and not (token_type == tokenize.NAME and token_str in CLASS_AND_FUNC_TOKENS)
+                and not (token_type == tokenize.OP and token_str == "@")
+            ):
+                conditions.stmt_or_decorator = False
+            elif conditions.nl3_after_comment and not conditions.dedent:
+                # Condition 5a: A dedent
+                if token_type == tokenize.DEDENT:
+                    conditions.dedent = True
+                # Condition 5b: Not a dedent, ignorable comment, ignore
+                elif token_type == tokenize.COMMENT and token_str.startswith(IGNORABLE_COMMENTS):
+                    do_reset_conditions = True
+                # Condition 5c: Not a dedent, not an ignorable comment, this meets enough conditions to be an error
+                else:
+                    conditions.dedent = True
+                    conditions.stmt_or_decorator = False
+
+                    # we want to use previous start_indices where the double new-line was found
+                    start_indices = tokens[i - 1].start if i else previous_start
+            # Condition 4: Another new line after comment
+            elif conditions.nl2_after_comment and not conditions.nl3_after_comment and token_type == tokenize.NL:
+                conditions.nl3_after_comment = True
+            # Condition 3: Another new line after comment
+            elif conditions.nl1_after_comment and not conditions.nl2_after_comment and token_type == tokenize.NL:
+                conditions.nl2_after_comment = True
+            # Condition 2: New line after comment
+            elif not conditions.section_comment and not conditions.nl1_after_comment and token_type == tokenize.NL:
+                conditions.nl1_after_comment = True
+            # Condition 1: Comment that is not a section comment
+            elif (
+                conditions.section_comment
+                and token_type == tokenize.COMMENT
+                and not token_str.startswith(IGNORABLE_COMMENTS)
+            ):
+                conditions.section_comment = False
+            else:
+                do_reset_conditions = True
+
+            if conditions.is_all_passed():
+                do_reset_conditions = True
+                self.errors.append((*start_indices, ROU104))
+
+            if do_reset_conditions:
+                conditions = BlankLinesAfterCommentConditions()
+
+        return conditions
+
+    def lines_with_invalid_multi_line_strings(self) -> TokenConsumer:
+        """
+        Multi-line strings should be single-quoted strings concatenated across multiple lines,
+        not with triple-quotes.
+
+        To find a multi-line string with triple-quotes look for a string that spans multiple
+        lines that does not start a line, as comments and docstrings do.
+        """
+        # It could also be the first line of a line of the file.
+        last_type = tokenize.NEWLINE
+
+        while True:
+            tokens = yield
+            # only the strings spanning lines are looked at, the token before each tells whether it starts a line
+            for i in [
+                i for i, token in enumerate(tokens) if token.type == tokenize.STRING and token.end[0] > token.start[0]
+            ]:
+                token_str = tokens[i].string
+                if (
+                    (tokens[i - 1].type if i else last_type) not in LINE_BREAK_TOKENS
+                    and token_str.startswith(("'''", '"""'))
+                    and token_str.endswith(("'''", '"""'))
+                ):
+                    self.errors.append((*tokens[i].start, ROU102))
+
+            if tokens:
+                last_type = tokens[-1].type
+
+    def lines_with_invalid_docstrings(self) -> TokenConsumer:
+        """
+        A docstring should contain triple-double-quotes and applies to
+        classes, functions, and methods.
+
+        The string or comment starting the line after each class or function signature is
+        kept as the tokens go by, if one starts it then you are looking at a docstring.
+
+        Comments can happen on code immediately following a statement definition but this is
+        rare, unusual, and most likely warranting the inclusion of a docstring.
+        """
+        signature_ends = SignatureEnds(self._index.definitions)
+
+        while signature_ends:
+            for _, _, token in signature_ends.feed((yield)):
+                if token is None:
+                    continue
+
+                # encountered a hash comment or a triple-single-quote docstring
+                if token.type == tokenize.COMMENT or token.line.strip().startswith("'''"):
+                    self.errors.append((*token.start, ROU100))
+
+    def rename_migrations(self) -> TokenConsumer:
+        """Migrations should not allow renames."""
+        return self._report_lines(self.is_rename_migration, ROU109)
+
+    def disallow_no_update_fields_save(self) -> TokenConsumer:
+        """.save() must be called with update_fields."""
+        return self._report_calls(
+            (
+                node
+                for node in self._index.call_sites.get("save", ())
+                if not any(keyword.arg == "update_fields" for keyword in node.keywords)
+            ),
+            SAVE_ALLOWED_COMMENTS,
+            ROU110,
+        )
+
+    def disallow_feature_flag_creation(self) -> TokenConsumer:
+        """We can not create FeatureFlags in code, they are cached on the request."""
+        return self._report_calls(
+            (
+                node
+                for method, nodes in self._index.call_sites.items()
+                if method.endswith("create")
+                for node in nodes
+                if is_called_on(node, FEATURE_FLAG_MANAGER)
+            ),
+            FEATURE_FLAG_ALLOWED_COMMENTS,
+            ROU111,
+        )
+
+    def _report_calls(self, nodes: Iterable[ast.Call], allowed_comments: tuple[str, ...], msg: str) -> TokenConsumer:
+        """Report the first token of each line calling one of `nodes`, unless the line has an allowed comment."""
+        # the line of the method name, where a multi-line call starts, the next one last
+        rows = sorted({node.func.end_lineno for node in nodes}, reverse=True)
+
+        while rows:
+            for first_token in (yield):
+                if first_token.start[0] < rows[-1]:
+                    continue
+                while rows and rows[-1] <= first_token.start[0]:
+                    rows.pop()
+
+                # Ignore lines with these comments, as they are valid
+                if not any(comment in first_token.line for comment in allowed_comments):
+                    self.errors.append((*first_token.start, msg))
+
+                if not rows:
+                    return
+
+    def _report_lines(self, is_error: Callable[[str], bool], msg: str) -> TokenConsumer:
+        """
+        Report every physical line that `is_error` at its indentation.
+
+        The lines are those flake8 sends a physical line checker, including each line of a multi-line string.
+        """
+        checked_row = 0
+
+        while True:
+            for token in (yield):
+                # a multi-line token carries all of its lines, and there could be many tokens on a same line
+                if token.end[0] <= checked_row:
+                    continue
+
+                for row, line in enumerate(token.line.splitlines(), start=token.start[0]):
+                    if row > checked_row:
+                        checked_row = row
+                        if is_error(line):
+                            self.errors.append((row, indentation(line), msg))
+
+    @staticmethod
+    def is_rename_migration(line: str) -> bool:
+        return "migrations.RenameField" in line
+
+    def task_args_kwargs_and_priority(self) -> TokenConsumer:
+        """Don't allow tasks without args or kwargs or with priority."""
+        missing_args_or_kwargs = []
+        for node in self._index.definitions:
+            if isinstance(node, ast.ClassDef):
+                continue
+            task_decorators = [
+                decorator for decorator in node.decorator_list if self._index.is_task_decorator(decorator)
+            ]
+            if not task_decorators:
+                continue
+
+            # a priority given to the decorator, as in `@shared_task(priority=5)`
+            for decorator in task_decorators:
+                for keyword in getattr(decorator, "keywords", ()):
+                    if keyword.arg == "priority":
+                        self.errors.append((keyword.lineno, keyword.col_offset, ROU113))
+
+            arguments = node.args
+            for arg in (*arguments.posonlyargs, *arguments.args, *arguments.kwonlyargs):
+                if arg.arg == "priority":
+                    self.errors.append((arg.lineno, arg.col_offset, ROU113))
+
+            if (
+                arguments.vararg is None
+                or arguments.vararg.arg != "args"
+                or arguments.kwarg is None
+                or arguments.kwarg.arg != "kwargs"
+            ):
+                missing_args_or_kwargs.append(node)
+
+        # reported at the end of the signature, found in the tokens
+        signature_ends = SignatureEnds(missing_args_or_kwargs)
+        while signature_ends:
+            for _, signature_end, _ in signature_ends.feed((yield)):
+                self.errors.append((*signature_end, ROU112))
+
+
+class Plugin:
+    """
+    Flake8 plugin for Routable's best coding practices, running every rule.
+
+    flake8 runs the rules as `AstPlugin`, `TokenPlugin` and `check_physical_line` instead, which only read the
+    input their rules need. This class holds the settings they share.
+    """
+
+    name = __name__
+    version = importlib_metadata.version(__name__)
+
+    # the codes of the rules run
+    codes = ALL_CODES
+
+    # codes flake8 would not report, from its --select and --ignore options
+    deselected_codes = frozenset()
+
+    skip_config = SkipConfig()
+
+    # names of the project's model classes from the model index, when one is configured
+    model_names: frozenset[str] | None = None
+
+    # the project's modules by dotted name from the module index, when one is configured
+    modules: Mapping[str, ProjectModule] | None = None
+
+    # violations not to report, when a baseline is configured
+    baseline: Baseline | None = None
+
+    def __init__(
+        self,
+        tree,
+        file_tokens: Iterable[tokenize.TokenInfo],
+        filename: str,
+        lines: list[str] | None = None,
+    ) -> None:
+        self._file_tokens = file_tokens
+        self._filename = filename
+        self._lines = lines
+        self._tree = tree
+
+    @classmethod
+    def add_options(cls, option_manager) -> None:
+        option_manager.add_option(
+            "--routable-max-bytes",
+            type=int,
+            parse_from_config=True,
+            help="Only run the non-style ROU rules on files larger than this many bytes.",
+        )
+        option_manager.add_option(
+            "--routable-max-lines",
+            type=int,
+            parse_from_config=True,
+            help="Only run the non-style ROU rules on files longer than this many lines.",
+        )
+        option_manager.add_option(
+            "--routable-generated-markers",
+            default=",".join(GENERATED_MARKERS),
+            parse_from_config=True,
+            help="Only run the non-style ROU rules on files with one of these in their header.",
+        )
+        option_manager.add_option(
+            "--routable-skip-file-markers",
+            default=",".join(SKIP_FILE_MARKERS),
+            parse_from_config=True,
+            help="Do not run the ROU rules on files with one of these in their header.",
+        )
+        option_manager.add_option(
+            "--routable-time-budget",
+            type=float,
+            parse_from_config=True,
+            help="Skip the expensive ROU rules on a file once checking it has taken this many seconds.",
+        )
+        option_manager.add_option(
+            "--routable-model-index",
+            parse_from_config=True,
+            help="Index the models under the current directory in this file and only check fields on those models.",
+        )
+        option_manager.add_option(
+            "--routable-module-index",
+            parse_from_config=True,
+            help="Index the modules under the current directory in this file and resolve imports against it.",
+        )
+        option_manager.add_option(
+            "--routable-module-roots",
+            default=".",
+            parse_from_config=True,
+            help="Comma-separated directories to index the modules of instead of the current directory, such as src.",
+        )
+        option_manager.add_option(
+            "--routable-baseline",
+            parse_from_config=True,
+            help="Do not report the ROU violations in this baseline file, see `flake8-routable baseline`.",
+        )
+
+    @staticmethod
+    def parse_options(options) -> None:
+        Plugin.skip_config = SkipConfig(
+            max_bytes=options.routable_max_bytes,
+            max_lines=options.routable_max_lines,
+            generated_markers=split_markers(options.routable_generated_markers),
+            skip_file_markers=split_markers(options.routable_skip_file_markers),
+            time_budget=options.routable_time_budget,
+        )
+        # set on `Plugin` rather than the class flake8 loaded, since every checker reads them
+        Plugin.deselected_codes = codes_not_selected(options)
+
+        if options.routable_model_index:
+            # the model index finds files with the runner, which imports this module
+            # Internal imports
+            from flake8_routable.hierarchy import load_model_names
+
+            Plugin.model_names = load_model_names(options.routable_model_index)
+        if options.routable_module_index:
+            # Internal imports
+            from flake8_routable.hierarchy import load_modules
+
+            Plugin.modules = load_modules(options.routable_module_index, split_markers(options.routable_module_roots))
+        if options.routable_baseline:
+            Plugin.baseline = Baseline.load(options.routable_baseline)
+
+    def disabled_codes(self) -> frozenset[str]:
+        if self._lines is None:
+            return frozenset()
+
+        header = []
+        header_size = 0
+        for line in self._lines:
+            if header_size >= HEADER_BYTES:
+                break
+            header.append(line)
+            header_size += len(line)
+
+        size = sum(map(len, self._lines))
+        return self.skip_config.disabled_codes("".join(header)[:HEADER_BYTES], size, len(self._lines))
+
+    def file_timer(self) -> RuleTimer | None:
+        return None if self.skip_config.time_budget is None else RuleTimer(self.skip_config.time_budget)
+
+    def visit_tree(self, disabled_codes: frozenset[str], timer: RuleTimer | None) -> Visitor:
+        visitor = Visitor(disabled_codes, timer=timer, modules=self.modules)
+        visitor.visit(self._tree)
+        visitor.finalize()
+        return visitor
+
+    def token_errors(
+        self,
+        index: AstIndex,
+        disabled_codes: frozenset[str],
+        timer: RuleTimer | None,
+    ) -> list[tuple[int, int, str]]:
+        file_token_helper = FileTokenHelper(
+            self._filename,
+            disabled_codes=disabled_codes,
+            timer=timer,
+            index=index,
+            model_names=self.model_names,
+        )
+        file_token_helper.visit(self._file_tokens)
+        return file_token_helper.errors
+
+    @staticmethod
+    def partly_checked(timer: RuleTimer | None) -> list[tuple[int, int, str]]:
+        return [(1, 0, ROU117)] if timer is not None and timer.degraded else []
+
+    def errors(
+        self,
+        disabled_codes: frozenset[str] = frozenset(),
+        timer: RuleTimer | None = None,
+    ) -> Iterator[tuple[int, int, str]]:
+        visitor = self.visit_tree(disabled_codes, timer)
+        token_errors = self.token_errors(visitor.index, disabled_codes, timer)
+        return chain(visitor.errors, token_errors, self.partly_checked(timer))
+
+    def run(self) -> Generator[tuple[int, int, str, type["Plugin"]]]:
+        disabled_codes = self.disabled_codes() | self.deselected_codes
+        if disabled_codes >= self.codes:
+            return
+
+        for line, col, msg in self.errors(disabled_codes, self.file_timer()):
+            # known violations are dropped here, before flake8 spends any time on them
+            if self.baseline is not None and self.baseline.matches(self._filename, self._lines or (), line, msg):
+                continue
+            yield line, col, msg, type(self)
+
+
+class SplitPlugin(Plugin):
+    """
+    Part of the rules as a flake8 checker of its own, so each can be measured and deselected alone.
+
+    The AST and token checkers of a file share one walk of flake8's tree, which is the same object for both, and
+    one time budget.
+    """
+
+    # the last tree walked, with the codes disabled and the visitor
+    _last_visit: tuple[ast.AST, frozenset[str], Visitor] | None = None
+
+    # the last tree timed, with its timer
+    _last_timer: tuple[ast.AST, RuleTimer] | None = None
+
+    def file_timer(self) -> RuleTimer | None:
+        last_timer = SplitPlugin._last_timer
+        if last_timer is not None and last_timer[0] is self._tree:
+            return last_timer[1]
+
+        timer = super().file_timer()
+        SplitPlugin._last_timer = None if timer is None else (self._tree, timer)
+        return timer
+
+    def visit_tree(self, disabled_codes: frozenset[str], timer: RuleTimer | None) -> Visitor:
+        last_visit = SplitPlugin._last_visit
+        if last_visit is not None and last_visit[0] is self._tree and last_visit[1] == disabled_codes:
+            return last_visit[2]
+
+        visitor = super().visit_tree(disabled_codes, timer)
+        SplitPlugin._last_visit = self._tree, disabled_codes, visitor
+        return visitor
+
+
+class AstPlugin(SplitPlugin):
+    """The rules that only read the AST, registering the plugin's options."""
+
+    codes = AST_CODES
+
+    def __init__(self, tree, filename: str, lines: list[str] | None = None) -> None:
+        super().__init__(tree, (), filename, lines)
+
+    def errors(
+        self,
+        disabled_codes: frozenset[str] = frozenset(),
+        timer: RuleTimer | None = None,
+    ) -> Iterator[tuple[int, int, str]]:
+        visitor = self.visit_tree(disabled_codes, timer)
+        # ROU117 is left to the token checker, which has walked the tree by the time it reports, unless it does not run
+        partly_checked = self.partly_checked(timer) if disabled_codes >= TokenPlugin.codes else []
+        return chain(visitor.errors, partly_checked)
+
+
+class TokenPlugin(SplitPlugin):
+    """The rules that read the tokens, on top of what the AST tells them, and ROU117 for both checkers."""
+
+    codes = TOKEN_CODES
+
+    # the options are registered and parsed by `AstPlugin`
+    add_options = None
+    parse_options = None
+
+    def errors(
+        self,
+        disabled_codes: frozenset[str] = frozenset(),
+        timer: RuleTimer | None = None,
+    ) -> Iterator[tuple[int, int, str]]:
+        visitor = self.visit_tree(disabled_codes, timer)
+        token_errors = self.token_errors(visitor.index, disabled_codes | LINE_CODES, timer)
+        return chain(token_errors, self.partly_checked(timer))
+
+
+def check_physical_line(
+    physical_line: str,
+    line_number: int,
+    lines: list[str],
+    filename: str,
+) -> tuple[int, str] | None:
+    """
+    The physical line rules as a flake8 checker, ROU109.
+
+    Whether the file is skipped, the rule deselected or the violation in the baseline is only worked out for lines
+    that break the rule, which few do.
+    """
+    if not FileTokenHelper.is_rename_migration(physical_line):
+        return None
+
+    if "ROU109" in Plugin(None, (), filename, lines).disabled_codes() | Plugin.deselected_codes:
+        return None
+
+    if Plugin.baseline is not None and Plugin.baseline.matches(filename, lines, line_number, ROU109):
+        return None
+    return indentation(physical_line), ROU109
+
+
+def codes_not_selected(options) -> frozenset[str]:
+    """The codes flake8 would not report with these `options`, so their rules need not run."""
+    # Pip imports
+    from flake8.style_guide import Decision, DecisionEngine
+
+    decider = DecisionEngine(options)
+    return frozenset(code for code in ALL_CODES if decider.decision_for(code) is Decision.Ignored)
@@ -0,0 +1,127 @@
+"""
+Baselines of known violations, so legacy code only reports new ones.
+
+A violation is fingerprinted by its rule code, its file and a hash of its line with the whitespace collapsed, so
+it still matches after lines are added or removed above it. A baseline file holds one fingerprint per line, and
+is loaded once per process into a set.
+"""
+
+# Python imports
+import hashlib
+import os
+from collections.abc import Iterable, Iterator, Sequence
+
+
+BASELINE_HEADER = "# flake8-routable baseline, one violation fingerprint per line"
+
+# bytes of each fingerprint, enough to tell apart the violations of a large repository
+FINGERPRINT_BYTES = 8
+
+# violations that say how a file was checked rather than what is wrong with it
+UNBASELINED_CODES = ("ROU117",)
+
+
+def normalize_path(filename: str) -> str:
+    """A path the same however it was given, `./app/models.py` is `app/models.py`."""
+    return os.path.normpath(filename).replace(os.sep, "/")
+
+
+def fingerprint(code: str, filename: str, line: str) -> str:
+    """The fingerprint of a violation of `code` on `line` of `filename`."""
+    key = "\0".join((code, normalize_path(filename), " ".join(line.split())))
+    return hashlib.blake2b(key.encode(), digest_size=FINGERPRINT_BYTES).hexdigest()
+
+
+def line_at(lines: Sequence[str], line: int) -> str:
+    return lines[line - 1] if 0 < line <= len(lines) else ""
+
+
+class Baseline:
+    """A set of violation fingerprints, read-only once loaded so it can be shared by threads."""
+
+    def __init__(self, fingerprints: Iterable[str] = ()) -> None:
+        self._fingerprints = frozenset(fingerprints)
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self._fingerprints
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fingerprints)
+
+    @classmethod
+    def load(cls, path: str) -> "Baseline":
+        with open(path) as f:
+            return cls(line.strip() for line in f if line.strip() and not line.startswith("#"))
+
+    def write(self, path: str) -> None:
+        """Write the fingerprints sorted, so regenerating a baseline gives a small diff."""
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as f:
+            f.write(BASELINE_HEADER + "\n")
+            f.writelines(f"{fingerprint}\n" for fingerprint in sorted(self._fingerprints))
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[str, int, int, str]], root: str | None = None) -> "Baseline":
+        """A baseline of every violation in `(filename, line, col, message)` rows."""
+        return cls(fingerprint for fingerprint, _ in _fingerprint_rows(rows, root) if fingerprint is not None)
+
+    def matches(self, filename: str, lines: Sequence[str], line: int, msg: str) -> bool:
+        """Whether a violation on `line` of `filename`, whose text is `lines`, is in the baseline."""
+        code = msg.split(" ", 1)[0]
+        if not self._fingerprints or code in UNBASELINED_CODES:
+            return False
+        return fingerprint(code, filename, line_at(lines, line)) in self._fingerprints
+
+    def filter(
+        self,
+        filename: str,
+        lines: Sequence[str],
+        results: Iterable[tuple[int, int, str]],
+    ) -> list[tuple[int, int, str]]:
+        """The results of a file that are not in the baseline."""
+        return [result for result in results if not self.matches(filename, lines, result[0], result[2])]
+
+    def filter_file(
+        self,
+        filename: str,
+        results: list[tuple[int, int, str]],
+        root: str | None = None,
+    ) -> list[tuple[int, int, str]]:
+        """The results of a file on disk that are not in the baseline, the file is only read when it has results."""
+        if not results:
+            return results
+        with open(os.path.join(root, filename) if root else filename, encoding="utf-8", errors="replace") as f:
+            return self.filter(filename, f.readlines(), results)
+
+    def filter_rows(
+        self,
+        rows: Iterable[tuple[str, int, int, str]],
+        root: str | None = None,
+    ) -> Iterator[tuple[str, int, int, str]]:
+        """The `(filename, line, col, message)` rows not in the baseline, only files with rows are read."""
+        for row_fingerprint, row in _fingerprint_rows(rows, root):
+            if row_fingerprint not in self._fingerprints:
+                yield row
+
+
+def _fingerprint_rows(
+    rows: Iterable[tuple[str, int, int, str]],
+    root: str | None,
+) -> Iterator[tuple[str | None, tuple[str, int, int, str]]]:
+    """Each row with its fingerprint, None for the codes that are never baselined."""
+    filename, lines = None, []
+    for row in rows:
+        if row[0] != filename:
+            filename = row[0]
+            with open(os.path.join(root, filename) if root else filename, encoding="utf-8", errors="replace") as f:
+                lines = f.readlines()
+
+        code = row[3].split(" ", 1)[0]
+        if code in UNBASELINED_CODES:
+            yield None, row
+        else:
+            yield fingerprint(code, filename, line_at(lines, row[1])), row
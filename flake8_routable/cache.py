@@ -0,0 +1,90 @@
+# Python imports
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+DEFAULT_MAX_ENTRIES = 4096
+
+# entries kept in a cache file, which outlives a single run over the whole repository
+PERSISTED_MAX_ENTRIES = 65536
+
+
+def blob_id(data: bytes) -> str:
+    """The ID git gives a blob with these contents, so a clean file's key can come from `git ls-files -s`."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class ResultCache:
+    """
+    In-memory LRU cache of lint results keyed by the git blob ID of the file's content.
+
+    The key includes the filename because some rules depend on the path (e.g. `/migrations/`).
+    It is safe to share between threads.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(data: bytes, filename: str) -> tuple[str, str]:
+        return blob_id(data), filename
+
+    def get(self, key: tuple[str, str]) -> list[tuple[int, int, str]] | None:
+        with self._lock:
+            results = self._entries.get(key)
+            if results is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return results
+
+    def set(self, key: tuple[str, str], results: list[tuple[int, int, str]]) -> None:
+        with self._lock:
+            self._entries[key] = results
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    @classmethod
+    def load(cls, path: str, settings: str, max_entries: int = PERSISTED_MAX_ENTRIES) -> "ResultCache":
+        """
+        Load a cache written by `write`, or an empty one when it is missing or was written with other `settings`.
+
+        `settings` describes whatever else the results depend on, such as the plugin version and the indexes.
+        """
+        cache = cls(max_entries)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cache
+
+        if isinstance(data, dict) and data.get("settings") == settings:
+            for object_id, filename, results in data.get("entries", ())[-max_entries:]:
+                cache._entries[object_id, filename] = [tuple(result) for result in results]
+        return cache
+
+    def write(self, path: str, settings: str) -> None:
+        """Write the entries, least recently used first, replacing the previous file at once."""
+        with self._lock:
+            entries = [[object_id, filename, results] for (object_id, filename), results in self._entries.items()]
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump({"entries": entries, "settings": settings}, f)
+        os.replace(temporary_path, path)
@@ -0,0 +1,426 @@
+# Python imports
+import argparse
+import hashlib
+import random
+import sys
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from itertools import groupby
+from operator import itemgetter
+
+# Internal imports
+from flake8_routable import (
+    GENERATED_MARKERS,
+    SKIP_FILE_MARKERS,
+    Plugin,
+    SkipConfig,
+    daemon,
+    fuzz,
+    gitobjects,
+    membench,
+    reporters,
+    scheduling,
+    sharding,
+    watch,
+)
+from flake8_routable.baseline import Baseline
+from flake8_routable.cache import ResultCache
+from flake8_routable.hierarchy import load_model_names, load_modules
+from flake8_routable.runner import (
+    RunStats,
+    file_rows,
+    first_failing_file,
+    iter_python_files,
+    lint_files,
+    lint_paths,
+)
+
+
+def skip_config(args: argparse.Namespace) -> SkipConfig:
+    return SkipConfig(
+        max_bytes=args.max_bytes,
+        max_lines=args.max_lines,
+        time_budget=args.time_budget,
+        generated_markers=tuple(args.generated_marker or GENERATED_MARKERS),
+        skip_file_markers=tuple(args.skip_file_marker or SKIP_FILE_MARKERS),
+    )
+
+
+def use_indexes(args: argparse.Namespace) -> None:
+    if args.model_index:
+        Plugin.model_names = load_model_names(args.model_index)
+    if args.module_index:
+        Plugin.modules = load_modules(args.module_index, args.module_root or ["."])
+
+
+def cache_settings(args: argparse.Namespace) -> str:
+    """What else the cached results depend on, a cache file written with other settings is not used."""
+    model_names = Plugin.model_names and sorted(Plugin.model_names)
+    modules = Plugin.modules and sorted(Plugin.modules.items())
+    return hashlib.sha1(repr((Plugin.version, skip_config(args), model_names, modules)).encode()).hexdigest()
+
+
+def check(args: argparse.Namespace) -> int:
+    use_indexes(args)
+    baseline = Baseline.load(args.baseline) if args.baseline else None
+    cache = ResultCache.load(args.cache, cache_settings(args)) if args.cache else None
+    history = sharding.TimingHistory.load(args.timing_history) if args.timing_history else None
+    stats = RunStats(slow_files=args.slow_files, record_durations=history is not None)
+
+    paths = args.paths
+    if args.shard or args.changed_first or history is not None:
+        filenames = list(iter_python_files(args.paths))
+        paths = filenames
+        if args.shard:
+            paths = sharding.select_shard(filenames, args.shard, history or sharding.TimingHistory())
+        if args.changed_first:
+            paths = sharding.changed_first(paths, gitobjects.recently_changed(), history or sharding.TimingHistory())
+
+    file_results = lint_file_results(args, paths, stats, baseline, cache)
+    results = first_failing_file(file_results) if args.fail_fast else file_rows(file_results)
+    violations = Counter()
+    if history is not None:
+        results = count_violations(results, violations)
+    if args.output:
+        with open(args.output, "w") as out:
+            count = reporters.write_report(results, out, args.format)
+    else:
+        count = reporters.write_report(results, sys.stdout, args.format)
+
+    if cache is not None:
+        cache.write(args.cache, cache_settings(args))
+    if history is not None:
+        history.update(stats.durations, filenames, violations=violations)
+        history.write(args.timing_history)
+    if args.statistics:
+        # files linted by the daemon are counted in the daemon
+        print(stats.summary() or "no files linted in-process", file=sys.stderr)
+    if args.slow_files and stats.slowest():
+        print(f"slowest files:\n{stats.slow_file_report()}", file=sys.stderr)
+    return 1 if count else 0
+
+
+def count_violations(
+    rows: Iterable[tuple[str, int, int, str]],
+    counts: Counter,
+) -> Iterator[tuple[str, int, int, str]]:
+    for row in rows:
+        counts[row[0]] += 1
+        yield row
+
+
+def lint_file_results(
+    args: argparse.Namespace,
+    paths: list[str],
+    stats: RunStats,
+    baseline: Baseline | None,
+    cache: ResultCache | None,
+) -> Iterable[tuple[str, list[tuple[int, int, str]]]]:
+    """The `(filename, results)` to report, from wherever `args` say the files come from."""
+    if args.stdin_filename:
+        source = sys.stdin.read()
+        rows = daemon.lint(
+            source=source,
+            filename=args.stdin_filename,
+            socket_path=args.socket,
+            use_daemon=not args.no_daemon,
+            skip_config=skip_config(args),
+            stats=stats,
+        )
+        results = [row[1:] for row in rows]
+        if baseline is not None:
+            results = baseline.filter(args.stdin_filename, source.splitlines(keepends=True), results)
+        return [(args.stdin_filename, results)]
+
+    if args.ref or args.staged:
+        return gitobjects.lint_revision_files(
+            args.ref, paths, skip_config=skip_config(args), stats=stats, baseline=baseline
+        )
+
+    if args.processes > 1:
+        file_results = check_on_processes(args, paths, stats)
+    elif args.fail_fast or args.no_daemon or stats.durations is not None:
+        # the daemon's timings stay in the daemon, and it answers once the whole run is linted
+        file_results = lint_files(
+            paths,
+            cache=cache,
+            threads=args.threads,
+            skip_config=skip_config(args),
+            stats=stats,
+            blob_ids=None if cache is None else gitobjects.clean_blob_ids(),
+        )
+    else:
+        rows = daemon.lint(
+            paths=paths,
+            socket_path=args.socket,
+            threads=args.threads,
+            skip_config=skip_config(args),
+            stats=stats,
+            cache=cache,
+        )
+        file_results = (
+            (filename, [row[1:] for row in rows_of_file]) for filename, rows_of_file in groupby(rows, key=itemgetter(0))
+        )
+    if baseline is None:
+        return file_results
+    return ((filename, baseline.filter_file(filename, results)) for filename, results in file_results)
+
+
+def check_on_processes(
+    args: argparse.Namespace,
+    paths: list[str],
+    stats: RunStats,
+) -> Iterator[tuple[str, list[tuple[int, int, str]]]]:
+    scheduler = scheduling.MemoryAwareScheduler(
+        processes=args.processes,
+        memory_budget=args.memory_budget_mb * 1024 * 1024,
+        large_file_bytes=args.large_file_kb * 1024,
+        skip_config=skip_config(args),
+        slow_files=args.slow_files,
+        record_durations=stats.durations is not None,
+    )
+    filenames = list(iter_python_files(paths))
+    file_results = scheduler.run(filenames)
+    try:
+        if args.fail_fast:
+            # files come back as they finish, so the first to fail ends the run as soon as it is linted
+            yield from file_results
+        else:
+            results_by_file = dict(file_results)
+            yield from ((filename, results_by_file[filename]) for filename in filenames)
+    finally:
+        file_results.close()
+        stats.update(scheduler.stats.counts)
+        for seconds, filename, rule in scheduler.stats.slowest():
+            stats.add_timing(filename, seconds, rule)
+        for filename, seconds in (scheduler.stats.durations or {}).items():
+            stats.add_duration(filename, seconds)
+
+        if args.memory_report:
+            for pid, worker in sorted(scheduler.worker_stats.items()):
+                kind = "dedicated" if worker.dedicated else "batched"
+                print(
+                    f"worker {pid} ({kind}): {worker.files} files, peak RSS {worker.peak_rss / (1024 * 1024):.1f} MB",
+                    file=sys.stderr,
+                )
+
+
+def update_baseline(args: argparse.Namespace) -> int:
+    """Write a baseline of every violation under the paths, or with `--prune` drop the fixed ones from it."""
+    use_indexes(args)
+    baseline = Baseline.from_rows(lint_paths(args.paths, skip_config=skip_config(args)))
+    if args.prune:
+        previous = Baseline.load(args.baseline)
+        baseline = Baseline(fingerprint for fingerprint in baseline if fingerprint in previous)
+        print(f"pruned {len(previous) - len(baseline)} fixed violations", file=sys.stderr)
+    baseline.write(args.baseline)
+    print(f"{len(baseline)} violations in {args.baseline}", file=sys.stderr)
+    return 0
+
+
+def fuzz_engines(args: argparse.Namespace) -> int:
+    """Compare the rule engine with the frozen reference on mutated snippets, printing the first difference."""
+    seeds = fuzz.seed_snippets(args.paths or fuzz.default_seed_files())
+    seed = random.randrange(2**32) if args.seed is None else args.seed
+    result = fuzz.fuzz(seeds, args.seconds, seed=seed)
+    print(f"checked {result.checked} sources from seed {seed}", file=sys.stderr)
+    if result.mismatch is not None:
+        print(result.mismatch.describe())
+        return 1
+    return 0
+
+
+def benchmark_memory(args: argparse.Namespace) -> int:
+    """Print the memory each rule allocates on the synthetic corpus, per MB of source."""
+    results = membench.benchmark(scale=args.scale)
+    if args.json:
+        print(membench.format_json(results))
+    else:
+        print(membench.format_summary(membench.summarize(results)))
+    return 0
+
+
+def serve(args: argparse.Namespace) -> int:
+    use_indexes(args)
+    daemon.serve(args.socket, skip_config=skip_config(args))
+    return 0
+
+
+def watch_files(args: argparse.Namespace) -> int:
+    use_indexes(args)
+    watcher = watch.Watcher(args.paths, debounce=args.debounce, skip_config=skip_config(args))
+    try:
+        watcher.run(interval=args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="flake8-routable", description="Run the ROU rules without flake8.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    skip_parser = argparse.ArgumentParser(add_help=False)
+    skip_parser.add_argument("--max-bytes", type=int, help="only run the non-style rules on larger files")
+    skip_parser.add_argument("--max-lines", type=int, help="only run the non-style rules on longer files")
+    skip_parser.add_argument(
+        "--time-budget",
+        type=float,
+        help="skip the expensive rules on a file once checking it has taken this many seconds",
+    )
+    skip_parser.add_argument(
+        "--generated-marker",
+        action="append",
+        help=f"only run the non-style rules on files with this in their header (default: {GENERATED_MARKERS})",
+    )
+    skip_parser.add_argument(
+        "--skip-file-marker",
+        action="append",
+        help=f"skip files with this in their header (default: {SKIP_FILE_MARKERS})",
+    )
+    skip_parser.add_argument(
+        "--model-index",
+        help="index the models under the current directory in this file and only check fields on those models",
+    )
+    skip_parser.add_argument(
+        "--module-index",
+        help="index the modules under the current directory in this file and resolve imports against it",
+    )
+    skip_parser.add_argument(
+        "--module-root",
+        action="append",
+        help="index the modules of this directory instead of the current one, such as src, may be given more than once",
+    )
+
+    check_parser = subparsers.add_parser(
+        "check",
+        help="lint paths, through the daemon when it is running",
+        parents=[skip_parser],
+    )
+    check_parser.add_argument("paths", nargs="*", default=["."])
+    check_parser.add_argument("--no-daemon", action="store_true", help="always lint in this process")
+    check_parser.add_argument("--socket", default=daemon.DEFAULT_SOCKET_PATH, help="daemon socket path")
+    check_parser.add_argument("--stdin-filename", help="lint standard input, reporting it as this filename")
+    check_parser.add_argument(
+        "--cache",
+        help="keep results in this file between in-process runs, clean git files are looked up without reading them",
+    )
+    git_group = check_parser.add_mutually_exclusive_group()
+    git_group.add_argument("--ref", help="lint the files at this git commit or branch rather than the checkout")
+    git_group.add_argument("--staged", action="store_true", help="lint the files in the git staging index")
+    check_parser.add_argument(
+        "--shard",
+        type=sharding.parse_shard,
+        help="only lint shard I of N (as I/N), balanced by the timing history or else by file size",
+    )
+    check_parser.add_argument(
+        "--changed-first",
+        action="store_true",
+        help="lint files with uncommitted or recent git changes first, then those with past violations",
+    )
+    check_parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="stop linting once a file has a violation, reporting only that file's",
+    )
+    check_parser.add_argument(
+        "--timing-history",
+        help="record how long each file took to lint and its violations in this file, lints in-process",
+    )
+    check_parser.add_argument("--baseline", help="do not report the violations in this baseline file")
+    check_parser.add_argument(
+        "--threads",
+        default=1,
+        type=int,
+        help="threads to lint with in-process, only faster on a free-threaded interpreter",
+    )
+    check_parser.add_argument(
+        "--format",
+        choices=sorted(reporters.REPORTERS),
+        default="text",
+        help="report findings as flake8 text, JSON lines or a SARIF log",
+    )
+    check_parser.add_argument("--output", help="write the report to this file instead of standard output")
+    check_parser.add_argument("--processes", default=1, type=int, help="worker processes to lint with")
+    check_parser.add_argument(
+        "--memory-budget-mb",
+        default=scheduling.DEFAULT_MEMORY_BUDGET // (1024 * 1024),
+        type=int,
+        help="estimated memory the worker processes may use at once",
+    )
+    check_parser.add_argument(
+        "--large-file-kb",
+        default=scheduling.DEFAULT_LARGE_FILE_BYTES // 1024,
+        type=int,
+        help="files this size or larger are linted by a dedicated worker",
+    )
+    check_parser.add_argument("--memory-report", action="store_true", help="print each worker's peak memory")
+    check_parser.add_argument("--statistics", action="store_true", help="print how many files were linted or skipped")
+    check_parser.add_argument("--slow-files", type=int, default=0, help="print this many of the slowest files")
+    check_parser.set_defaults(handler=check)
+
+    baseline_parser = subparsers.add_parser(
+        "baseline",
+        help="write the violations under paths to a baseline file, so only new ones are reported",
+        parents=[skip_parser],
+    )
+    baseline_parser.add_argument("paths", nargs="*", default=["."])
+    baseline_parser.add_argument("--baseline", required=True, help="baseline file to write")
+    baseline_parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="only drop the violations that were fixed, never add new ones",
+    )
+    baseline_parser.set_defaults(handler=update_baseline)
+
+    fuzz_parser = subparsers.add_parser(
+        "fuzz",
+        help="compare the rules with the frozen reference engine on mutated snippets",
+    )
+    fuzz_parser.add_argument(
+        "paths",
+        nargs="*",
+        help=f"files whose multi-line strings are the snippets to start from (default: {fuzz.DEFAULT_SEED_FILES})",
+    )
+    fuzz_parser.add_argument("--seconds", default=60, type=float, help="how long to run for")
+    fuzz_parser.add_argument("--seed", type=int, help="random seed, to repeat a run")
+    fuzz_parser.set_defaults(handler=fuzz_engines)
+
+    benchmark_parser = subparsers.add_parser(
+        "benchmark",
+        help="measure the memory each rule allocates on the synthetic corpus with tracemalloc",
+    )
+    benchmark_parser.add_argument("--scale", default=1, type=int, help="size of the corpus sources")
+    benchmark_parser.add_argument("--json", action="store_true", help="print a JSON line per rule and source")
+    benchmark_parser.set_defaults(handler=benchmark_memory)
+
+    serve_parser = subparsers.add_parser("serve", help="start the lint daemon", parents=[skip_parser])
+    serve_parser.add_argument("--socket", default=daemon.DEFAULT_SOCKET_PATH, help="daemon socket path")
+    serve_parser.set_defaults(handler=serve)
+
+    watch_parser = subparsers.add_parser(
+        "watch",
+        help="re-lint files as they change, printing JSON lines",
+        parents=[skip_parser],
+    )
+    watch_parser.add_argument("paths", nargs="*", default=["."])
+    watch_parser.add_argument(
+        "--debounce", default=watch.DEFAULT_DEBOUNCE, type=float, help="seconds a change must settle"
+    )
+    watch_parser.add_argument("--interval", default=watch.DEFAULT_INTERVAL, type=float, help="seconds between polls")
+    watch_parser.set_defaults(handler=watch_files)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.handler is check and (args.ref or args.staged) and (args.shard or args.changed_first):
+        # both list and order the files of the checkout
+        parser.error("--shard and --changed-first cannot be used with --ref or --staged")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Synthetic sources that stress the rules, each generated at a given scale.
+
+A source at scale 4 has four times the statements of the same source at scale 1, so the time and memory the rules
+take on it should grow about four times as well. The inputs are the shapes that a rule could handle in more than
+linear time: dict literals with many keys, long attribute chains, deeply nested calls, long runs of comments and
+blank lines, a model class with thousands of fields and a migration of 100k lines at scale 16.
+
+Attribute chains and nested calls also grow in depth, so a rule that is quadratic in the depth of an expression shows
+up, but they get fewer in number as they get deeper, so the source still grows linearly. Past `MAX_DEPTH` they only
+grow in number, since Python's parser and the AST visitor recurse once per level.
+"""
+
+# Python imports
+from collections.abc import Callable
+
+
+# statements of each source at scale 1
+BASE_STATEMENTS = 128
+
+# attributes in each chain, and calls in each nesting, at scale 1
+CHAIN_LENGTH = 16
+
+# deepest chain or nesting at any scale, below the 200 nested parentheses the parser allows and the recursion limit
+MAX_DEPTH = 100
+
+# lines of a migration at scale 1, 100k lines at scale 16
+MIGRATION_LINES = 6250
+
+NESTING_DEPTH = 16
+
+
+def grown_depth(depth: int, scale: int) -> int:
+    """`depth` grown with `scale`, up to `MAX_DEPTH`."""
+    return min(depth * scale, MAX_DEPTH)
+
+
+def dict_keys(scale: int) -> str:
+    """One dict literal with ordered keys, so every key is compared."""
+    keys = "".join(f'    "key_{index:07}": {index},\n' for index in range(BASE_STATEMENTS * 4 * scale))
+    return f"MAPPING = {{\n{keys}}}\n"
+
+
+def attribute_chains(scale: int) -> str:
+    """Dict keys and method calls on long attribute chains."""
+    length = grown_depth(CHAIN_LENGTH, scale)
+    chain = ".".join(f"attribute_{index}" for index in range(length))
+    statements = []
+    for index in range(BASE_STATEMENTS * scale * CHAIN_LENGTH // length):
+        statements.append(f"value_{index} = {{root_{index}.{chain}: 1, root_{index}.{chain}.last: 2}}\n")
+        statements.append(f"root_{index}.{chain}.objects.create(name='{index}')\n")
+    return "".join(statements)
+
+
+def nested_calls(scale: int) -> str:
+    """Deeply nested calls, as values and as the members of set literals."""
+    depth = grown_depth(NESTING_DEPTH, scale)
+    statements = []
+    for index in range(BASE_STATEMENTS * scale * NESTING_DEPTH // depth):
+        call = f"value_{index}"
+        for level in range(depth):
+            call = f"call_{level}({call})"
+        statements.append(f"result_{index} = {{{call}, call_0(value_{index})}}\n")
+    return "".join(statements)
+
+
+def comments_and_blank_lines(scale: int) -> str:
+    """Long runs of comments, each followed by a long run of blank lines."""
+    blocks = []
+    for index in range(8):
+        comments = "".join(f"# comment {index} {line}\n" for line in range(BASE_STATEMENTS * scale))
+        blocks.append(f"{comments}{chr(10) * BASE_STATEMENTS * scale}value_{index} = {index}\n")
+    return "".join(blocks)
+
+
+def model_fields(scale: int) -> str:
+    """One model class with thousands of `*Field(...)` calls, single and multi-line, some broken."""
+    fields = []
+    for index in range(BASE_STATEMENTS * scale):
+        if index % 2:
+            fields.append(f"    field_{index} = models.CharField(default='{index}', max_length=10)\n")
+        else:
+            fields.append(
+                f"    field_{index} = models.IntegerField(\n"
+                f"        db_default={index},\n"
+                f"        default={index},\n"
+                f"        null=True,\n"
+                f"    )\n"
+            )
+    return "from django.db import models\n\n\nclass Invoice(models.Model):\n" + "".join(fields)
+
+
+def migration(scale: int) -> str:
+    """A migration of `MIGRATION_LINES` lines for each scale, adding fields with a rename among them."""
+    operations = []
+    for index in range(MIGRATION_LINES * scale // 5):
+        operation = "RenameField" if index % 100 == 0 else "AddField"
+        operations.append(
+            f"        migrations.{operation}(\n"
+            f"            model_name='invoice',\n"
+            f"            name='field_{index}',\n"
+            f"            field=models.CharField(default='{index}', max_length=10),\n"
+            f"        ),\n"
+        )
+    return (
+        "from django.db import migrations, models\n\n\n"
+        "class Migration(migrations.Migration):\n"
+        "    dependencies = []\n"
+        "    operations = [\n" + "".join(operations) + "    ]\n"
+    )
+
+
+# each source with the path it is linted at, where the path dependent rules apply as they would to it
+SOURCES: tuple[tuple[Callable[[int], str], str], ...] = (
+    (dict_keys, "app/settings.py"),
+    (attribute_chains, "app/views.py"),
+    (nested_calls, "app/utils.py"),
+    (comments_and_blank_lines, "app/constants.py"),
+    (model_fields, "app/models.py"),
+    (migration, "app/migrations/0001_initial.py"),
+)
+
+
+def corpus(scale: int) -> list[tuple[str, str, str]]:
+    """The `(name, filename, source)` of every source at `scale`."""
+    return [(generate.__name__, filename, generate(scale)) for generate, filename in SOURCES]
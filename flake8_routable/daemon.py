@@ -0,0 +1,229 @@
+"""
+A long-lived lint process listening on a Unix socket.
+
+The protocol is one JSON object per line in each direction. A request either lints paths:
+    {"cwd": "/repo", "paths": ["app/models.py"]}
+or an unsaved editor buffer:
+    {"filename": "app/models.py", "source": "..."}
+and is answered with:
+    {"results": [["app/models.py", 12, 0, "ROU110 Disallow .save() with no update_fields"]]}
+or with {"error": "..."} when it fails. A request may carry the skip settings to lint with as "skip_config", the
+fields of a `SkipConfig`, otherwise the daemon applies the settings it was started with.
+"""
+
+# Python imports
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from collections.abc import Iterable
+from dataclasses import asdict
+from typing import Any
+
+# Internal imports
+from flake8_routable import ROU117
+from flake8_routable.cache import ResultCache
+from flake8_routable.gitobjects import clean_blob_ids
+from flake8_routable.regions import RegionLinter
+from flake8_routable.runner import DEFAULT_SKIP_CONFIG, RunStats, SkipConfig, lint_buffer, lint_paths
+
+
+DEFAULT_SOCKET_PATH = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(),
+    f"flake8-routable-{os.getuid()}.sock",
+)
+
+# seconds to wait for the daemon to accept a connection, the reply takes as long as linting does
+DEFAULT_CONNECT_TIMEOUT = 5.0
+
+
+class LintRequestHandler(socketserver.StreamRequestHandler):
+    """Answers each request line on a connection until the client hangs up."""
+
+    def handle(self) -> None:
+        for raw_request in self.rfile:
+            try:
+                response = {"results": self.server.dispatch(json.loads(raw_request))}
+            except Exception as exc:
+                # a request that fails is answered, so the client does not wait on a connection that was dropped
+                response = {"error": f"{type(exc).__name__}: {exc}"}
+
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class LintServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Keeps the rule engine and the result caches warm between requests.
+
+    Whole files are cached by content, and on a miss only the regions of the file that changed since it was last
+    linted are re-analysed. Each connection is served on its own thread.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        cache: ResultCache | None = None,
+        skip_config: SkipConfig = DEFAULT_SKIP_CONFIG,
+    ) -> None:
+        self.cache = cache if cache is not None else ResultCache()
+        self.regions = RegionLinter()
+        self.skip_config = skip_config
+        self.stats = RunStats()
+
+        # results depend on the skip settings, so the requests with other settings than the daemon's have their own
+        self._caches = {}
+        self._caches_lock = threading.Lock()
+        super().__init__(socket_path, LintRequestHandler)
+
+    def dispatch(self, request: dict[str, Any]) -> list[tuple[str, int, int, str]]:
+        skip_config = self.skip_config
+        if request.get("skip_config") is not None:
+            skip_config = SkipConfig(
+                **{
+                    name: tuple(value) if isinstance(value, list) else value
+                    for name, value in request["skip_config"].items()
+                }
+            )
+
+        if "source" in request:
+            filename = request["filename"]
+            return [(filename, *result) for result in self._lint_buffer(request["source"], filename, skip_config)]
+
+        return list(
+            lint_paths(
+                request["paths"],
+                cache=self._cache(skip_config),
+                root=request.get("cwd"),
+                linter=self.regions.lint,
+                skip_config=skip_config,
+                stats=self.stats,
+                blob_ids=clean_blob_ids(request.get("cwd")),
+            )
+        )
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+    def _cache(self, skip_config: SkipConfig) -> ResultCache:
+        if skip_config == self.skip_config:
+            return self.cache
+        with self._caches_lock:
+            return self._caches.setdefault(skip_config, ResultCache())
+
+    def _lint_buffer(self, source: str, filename: str, skip_config: SkipConfig) -> list[tuple[int, int, str]]:
+        cache = self._cache(skip_config)
+        key = cache.key(source.encode(), filename)
+        results = cache.get(key)
+        if results is None:
+            results = lint_buffer(
+                source,
+                filename,
+                linter=self.regions.lint,
+                skip_config=skip_config,
+                stats=self.stats,
+            )
+            # a buffer that ran over its time budget gets another chance next time
+            if not any(msg == ROU117 for _, _, msg in results):
+                cache.set(key, results)
+        return results
+
+
+def is_running(socket_path: str = DEFAULT_SOCKET_PATH) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def serve(socket_path: str = DEFAULT_SOCKET_PATH, skip_config: SkipConfig = DEFAULT_SKIP_CONFIG) -> None:
+    """Serve lint requests until interrupted."""
+    if os.path.exists(socket_path):
+        if is_running(socket_path):
+            raise RuntimeError(f"A daemon is already listening on {socket_path}")
+        # left behind by a daemon that did not shut down cleanly
+        os.unlink(socket_path)
+
+    with LintServer(socket_path, skip_config=skip_config) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def request(
+    payload: dict[str, Any],
+    socket_path: str = DEFAULT_SOCKET_PATH,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+):
+    """
+    Send one request to a running daemon and wait for its reply.
+
+    Raises `FileNotFoundError` or `ConnectionError` when no daemon answers, including one that hangs up before
+    replying, and `RuntimeError` when the daemon fails to lint.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(connect_timeout)
+        client.connect(socket_path)
+        client.settimeout(None)
+        client.sendall(json.dumps(payload).encode() + b"\n")
+
+        with client.makefile("rb") as response_file:
+            try:
+                response = json.loads(response_file.readline())
+            except ValueError as exc:
+                raise ConnectionError(f"Malformed reply from the daemon: {exc}") from exc
+
+    if "error" in response:
+        raise RuntimeError(f"The daemon failed to lint: {response['error']}")
+    return [tuple(result) for result in response["results"]]
+
+
+def lint(
+    paths: list[str] | None = None,
+    source: str | None = None,
+    filename: str | None = None,
+    socket_path: str = DEFAULT_SOCKET_PATH,
+    use_daemon: bool = True,
+    threads: int = 1,
+    skip_config: SkipConfig = DEFAULT_SKIP_CONFIG,
+    stats: RunStats | None = None,
+    cache: ResultCache | None = None,
+) -> Iterable[tuple[str, int, int, str]]:
+    """
+    Lint through the daemon when it is running, otherwise in this process.
+
+    The daemon lints with `skip_config` too, while `cache` only applies in-process, the daemon keeps its own. Only
+    a missing daemon falls back to linting in-process, a daemon that fails raises `RuntimeError`. Paths linted
+    in-process are yielded as each file is linted, so the rows can be reported without holding them all.
+    """
+    if source is not None:
+        payload = {"filename": filename, "source": source}
+    else:
+        payload = {"cwd": os.getcwd(), "paths": paths}
+    payload["skip_config"] = asdict(skip_config)
+
+    if use_daemon:
+        try:
+            return request(payload, socket_path=socket_path)
+        except (ConnectionError, FileNotFoundError):
+            pass
+
+    if source is not None:
+        return [(filename, *result) for result in lint_buffer(source, filename, skip_config=skip_config, stats=stats)]
+    return lint_paths(
+        paths,
+        cache=cache,
+        threads=threads,
+        skip_config=skip_config,
+        stats=stats,
+        blob_ids=None if cache is None else clean_blob_ids(),
+    )
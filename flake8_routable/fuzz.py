@@ -0,0 +1,387 @@
+"""
+Differential fuzzing of the rule engine against the frozen reference engine in `reference`.
+
+Sources start from seed snippets, the multi-line strings of the rule tests, and are changed by a few random
+structural edits each: lines duplicated, dropped, swapped or spliced in from another snippet, comments and blank
+lines inserted, and collection members, call keywords and class bases shuffled through the AST. Every source that
+still parses is linted by both engines at a few paths, and the first difference in `(line, col, code)` is reported
+with the source that produced it. A run is repeatable from its seed.
+
+Some rules were changed on purpose since the reference was frozen. `KNOWN_DIFFERENCES` lists them with the rows of
+a source each can show up on, and the results of those codes on those rows are left out of the comparison.
+"""
+
+# Python imports
+import ast
+import glob
+import io
+import random
+import textwrap
+import time
+import tokenize
+import warnings
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+# Internal imports
+from flake8_routable import Plugin
+from flake8_routable.reference import reference_errors
+
+
+# comments inserted by the edits, the ones some rules look for among them
+COMMENTS = (
+    "# comment",
+    "# noqa",
+    "# Python imports",
+    "# -----------------",
+    "# no update_fields: the whole instance is new",
+    "# feature flag created for a test",
+)
+
+DEFAULT_SEED_FILES = "tests/test_rou_*.py"
+
+# snippets of the constructs the rule tests only build at run time, ordered so a shuffle can break them
+SEEDS = (
+    'LIMITS = {"a": 1, "b": 2, C.D: 3, e.f(): 4, g["h"]: 5}\nCOLORS = {"blue", f"{green}", red}\n',
+    "A_LIMIT = 1\nB_LIMIT = 2\nC_LIMIT = {1: (a, 'b'), 2: (b, 'a')}\n",
+)
+
+# paths each source is linted at, so the path dependent rules are both on and off
+FILENAMES = ("app/models.py", "app/migrations/0001_initial.py", "app/tests/test_views.py")
+
+# edits applied to a seed for each source, at most
+MAX_EDITS = 4
+
+# attempts at an edit that leaves the source parseable before it is given up
+MAX_EDIT_ATTEMPTS = 8
+
+
+@dataclass(frozen=True)
+class KnownDifference:
+    """A rule the engine changed on purpose, with the rows of a source where its results may differ."""
+
+    codes: tuple[str, ...]
+    reason: str
+    rows: Callable[[ast.AST, list[tokenize.TokenInfo]], set[int]]
+
+
+def _signature_rows(tree: ast.AST, file_tokens: list[tokenize.TokenInfo]) -> set[int]:
+    """
+    The rows after the signatures with another `:` than the one ending them, an annotation's or a lambda's, or with
+    their body on the same row. The reference took the first `:` after `def` or `class` as the end of a signature.
+    """
+    colons = [token.start for token in file_tokens if token.type == tokenize.OP and token.string == ":"]
+    rows = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body_start = (node.body[0].lineno, node.body[0].col_offset)
+            header = [start for start in colons if (node.lineno, node.col_offset) <= start < body_start]
+            if len(header) > 1 or header[-1][0] == body_start[0]:
+                rows.update(range(node.lineno + 1, body_start[0] + 2))
+    return rows
+
+
+def _rename_rows(tree: ast.AST, file_tokens: list[tokenize.TokenInfo]) -> set[int]:
+    """
+    The rows starting with an indent, which the reference reported at column 0, and the rows of the tokens spanning
+    several rows, which it reported once at the token's start.
+    """
+    rows = {token.start[0] for token in file_tokens if token.type == tokenize.INDENT}
+    for token in file_tokens:
+        rows.update(range(token.start[0], token.end[0] + 1) if token.end[0] > token.start[0] else ())
+    return rows
+
+
+def _call_rows(tree: ast.AST, file_tokens: list[tokenize.TokenInfo]) -> set[int]:
+    """
+    The rows of `.save()` and `*create()` calls spanning several rows, of the strings and comments naming them and
+    of the names ending in `FeatureFlag`, where the reference matched a pattern against the text of each row.
+    """
+    rows = set()
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and (node.func.attr == "save" or node.func.attr.endswith("create"))
+        ):
+            rows.update(range(node.lineno, node.end_lineno + 1) if node.end_lineno > node.lineno else ())
+    for token in file_tokens:
+        if token.type in (tokenize.COMMENT, tokenize.STRING) and (
+            ".save(" in token.string or "FeatureFlag" in token.string
+        ):
+            rows.update(range(token.start[0], token.end[0] + 1))
+        elif token.type == tokenize.NAME and token.string != "FeatureFlag" and token.string.endswith("FeatureFlag"):
+            rows.add(token.start[0])
+    return rows
+
+
+def _names_shared_task(decorator: ast.expr, aliases: dict[str, str]) -> bool:
+    """Whether a decorator is `shared_task` once its imports are resolved."""
+    if isinstance(decorator, ast.Call):
+        decorator = decorator.func
+    if isinstance(decorator, ast.Attribute):
+        return decorator.attr == "shared_task"
+    return (
+        isinstance(decorator, ast.Name) and aliases.get(decorator.id, decorator.id).rsplit(".", 1)[-1] == "shared_task"
+    )
+
+
+def _has_starred_text(node: ast.FunctionDef | ast.AsyncFunctionDef, file_tokens: list[tokenize.TokenInfo]) -> bool:
+    """Whether the tokens of a signature show `*args` and `**kwargs` just when its arguments have them."""
+    body_start = (node.body[0].lineno, node.body[0].col_offset)
+    pairs = {
+        (token.string, next_token.string)
+        for token, next_token in zip(file_tokens, file_tokens[1:])
+        if (node.lineno, node.col_offset) <= token.start < body_start
+    }
+    arguments = node.args
+    return (("*", "args") in pairs, ("**", "kwargs") in pairs) == (
+        arguments.vararg is not None and arguments.vararg.arg == "args",
+        arguments.kwarg is not None and arguments.kwarg.arg == "kwargs",
+    )
+
+
+def _task_rows(tree: ast.AST, file_tokens: list[tokenize.TokenInfo]) -> set[int]:
+    """
+    The rows from the decorators of a task to the first `):` after its `def`, when only one engine takes it for a
+    task, it has a return annotation or its tokens look like `*args` or `**kwargs` where its arguments are not. The
+    reference knew `shared_task` by its name alone, ended a signature at the first `):` and read the arguments from
+    the tokens.
+    """
+    aliases = {}
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            prefix = f"{node.module}." if isinstance(node, ast.ImportFrom) and node.module else ""
+            aliases.update((alias.asname or alias.name, f"{prefix}{alias.name}") for alias in node.names)
+    ends = [
+        token.start
+        for token, next_token in zip(file_tokens, file_tokens[1:])
+        if (token.string, next_token.string) == (")", ":")
+    ]
+
+    rows = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.AsyncFunctionDef, ast.ClassDef, ast.FunctionDef)) or not node.decorator_list:
+            continue
+        # only functions are tasks to the engine
+        is_task = not isinstance(node, ast.ClassDef) and any(
+            _names_shared_task(decorator, aliases) for decorator in node.decorator_list
+        )
+        is_named_task = any(
+            "shared_task" in (getattr(name, "id", None), getattr(name, "attr", None))
+            for decorator in node.decorator_list
+            for name in ast.walk(decorator)
+        )
+        if is_task != is_named_task or (
+            is_task and (node.returns is not None or not _has_starred_text(node, file_tokens))
+        ):
+            end = next((end for end in ends if end >= (node.lineno, node.col_offset)), file_tokens[-1].end)
+            rows.update(range(node.decorator_list[0].lineno, max(end[0], node.body[0].lineno) + 1))
+    return rows
+
+
+# the rules changed on purpose since the reference was frozen
+KNOWN_DIFFERENCES = (
+    KnownDifference(
+        ("ROU100",),
+        "a comment is only a docstring on the row after the `:` ending a signature, with the body on a later row",
+        _signature_rows,
+    ),
+    KnownDifference(
+        ("ROU109",),
+        "each physical line with a rename is reported at its indentation, inside multi-line strings as well",
+        _rename_rows,
+    ),
+    KnownDifference(
+        ("ROU110", "ROU111"),
+        "calls are judged from the AST, across rows and not inside strings or comments",
+        _call_rows,
+    ),
+    KnownDifference(
+        ("ROU112", "ROU113"),
+        "`shared_task` is resolved through the imports, and a signature ends at its own `:`",
+        _task_rows,
+    ),
+)
+
+
+@dataclass(frozen=True)
+class Mismatch:
+    """A source the engines disagree on, with the `(line, col, code)` results of each."""
+
+    source: str
+    filename: str
+    expected: list[tuple[int, int, str]] | str
+    actual: list[tuple[int, int, str]] | str
+
+    def describe(self) -> str:
+        lines = [f"{self.filename}:", *(f"    {line}" for line in self.source.splitlines())]
+        if isinstance(self.expected, str) or isinstance(self.actual, str):
+            lines += [f"reference: {self.expected}", f"engine: {self.actual}"]
+        else:
+            lines += [f"only reference: {result}" for result in sorted(set(self.expected) - set(self.actual))]
+            lines += [f"only engine: {result}" for result in sorted(set(self.actual) - set(self.expected))]
+            if set(self.expected) == set(self.actual):
+                lines.append(f"same results, different counts: {self.expected} != {self.actual}")
+        return "\n".join(lines)
+
+
+@dataclass
+class FuzzResult:
+    """How many sources were linted by both engines, and the first mismatch if there was one."""
+
+    checked: int = 0
+    mismatch: Mismatch | None = None
+
+
+def parses(source: str) -> bool:
+    try:
+        ast.parse(source)
+        list(tokenize.generate_tokens(io.StringIO(source).readline))
+    except (SyntaxError, ValueError, tokenize.TokenError):
+        return False
+    return True
+
+
+def seed_snippets(paths: Iterable[str]) -> list[str]:
+    """`SEEDS` and the parseable multi-line strings in the files at `paths`, such as the snippets of the rule tests."""
+    snippets = list(SEEDS)
+    for path in paths:
+        with open(path) as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and "\n" in node.value:
+                if parses(node.value):
+                    snippets.append(node.value)
+    return snippets
+
+
+def _results(
+    errors: Callable[[ast.AST, Iterable[tokenize.TokenInfo], str], Iterable[tuple[int, int, str]]],
+    source: str,
+    filename: str,
+) -> list[tuple[int, int, str]] | str:
+    """The sorted `(line, col, code)` of an engine, or the exception it raised by name."""
+    try:
+        with warnings.catch_warnings():
+            # both engines warn about the nodes ROU103 can not compare
+            warnings.simplefilter("ignore")
+            tree = ast.parse(source, filename)
+            file_tokens = tokenize.generate_tokens(io.StringIO(source).readline)
+            return sorted((line, col, msg.split(" ", 1)[0]) for line, col, msg in errors(tree, file_tokens, filename))
+    except Exception as e:
+        return type(e).__name__
+
+
+def known_rows(source: str) -> set[tuple[int, str]]:
+    """The `(row, code)` of `source` where the engines may differ because of `KNOWN_DIFFERENCES`."""
+    tree = ast.parse(source)
+    file_tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+    return {
+        (row, code)
+        for difference in KNOWN_DIFFERENCES
+        for row in difference.rows(tree, file_tokens)
+        for code in difference.codes
+    }
+
+
+def compare(source: str, filename: str) -> Mismatch | None:
+    """Lint `source` with both engines, the mismatch when their results differ other than as they are known to."""
+    expected = _results(reference_errors, source, filename)
+    actual = _results(
+        lambda tree, file_tokens, filename: Plugin(tree, file_tokens, filename).errors(), source, filename
+    )
+    if expected != actual and not isinstance(expected, str) and not isinstance(actual, str):
+        known = known_rows(source)
+        expected = [result for result in expected if (result[0], result[2]) not in known]
+        actual = [result for result in actual if (result[0], result[2]) not in known]
+    if expected != actual:
+        return Mismatch(source, filename, expected, actual)
+    return None
+
+
+def _line_edit(rng: random.Random, source: str, seeds: list[str]) -> str:
+    lines = source.splitlines(keepends=True) or ["\n"]
+    i = rng.randrange(len(lines))
+    edit = rng.randrange(6)
+    if edit == 0:
+        lines.insert(i, lines[i])
+    elif edit == 1:
+        del lines[i]
+    elif edit == 2 and i + 1 < len(lines):
+        lines[i], lines[i + 1] = lines[i + 1], lines[i]
+    elif edit == 3:
+        lines[i:i] = ["\n"] * rng.randint(1, 3)
+    elif edit == 4:
+        indentation = lines[i][: len(lines[i]) - len(lines[i].lstrip())]
+        lines.insert(i, f"{indentation}{rng.choice(COMMENTS)}\n")
+    else:
+        # another snippet at the indentation of this line, as a block of the same body
+        indentation = lines[i][: len(lines[i]) - len(lines[i].lstrip())].rstrip("\n")
+        spliced = textwrap.indent(textwrap.dedent(rng.choice(seeds)).strip("\n") + "\n", indentation)
+        lines.insert(i, spliced)
+    return "".join(lines)
+
+
+def _tree_edit(rng: random.Random, source: str, seeds: list[str]) -> str:
+    """Shuffle the members of a collection, the keywords of a call or the bases of a class, losing comments."""
+    tree = ast.parse(source)
+    nodes = [
+        node
+        for node in ast.walk(tree)
+        if isinstance(node, (ast.Dict, ast.Set, ast.List, ast.Tuple))
+        or getattr(node, "keywords", None)
+        or getattr(node, "bases", None)
+    ]
+    if not nodes:
+        return source
+
+    node = rng.choice(nodes)
+    if isinstance(node, ast.Dict):
+        pairs = list(zip(node.keys, node.values))
+        rng.shuffle(pairs)
+        node.keys, node.values = [key for key, _ in pairs], [value for _, value in pairs]
+    elif isinstance(node, (ast.Set, ast.List, ast.Tuple)):
+        rng.shuffle(node.elts)
+    else:
+        rng.shuffle(node.keywords)
+        if isinstance(node, ast.ClassDef):
+            rng.shuffle(node.bases)
+    return ast.unparse(tree) + "\n"
+
+
+def mutate(rng: random.Random, seeds: list[str]) -> str:
+    """A seed snippet changed by up to `MAX_EDITS` edits, each one kept only when the source still parses."""
+    source = rng.choice(seeds)
+    for _ in range(rng.randint(1, MAX_EDITS)):
+        edit = _tree_edit if rng.random() < 0.2 else _line_edit
+        for _ in range(MAX_EDIT_ATTEMPTS):
+            edited = edit(rng, source, seeds)
+            if parses(edited):
+                source = edited
+                break
+    return source
+
+
+def fuzz(seeds: list[str], seconds: float, seed: int = 0, max_sources: int | None = None) -> FuzzResult:
+    """
+    Compare the engines on the seeds and then on mutated sources until `seconds` have passed, or `max_sources`
+    sources were checked, stopping at the first mismatch.
+    """
+    rng = random.Random(seed)
+    deadline = time.monotonic() + seconds
+    result = FuzzResult()
+
+    sources = iter(seeds)
+    while time.monotonic() < deadline and (max_sources is None or result.checked < max_sources):
+        source = next(sources, None) or mutate(rng, seeds)
+        for filename in FILENAMES:
+            result.mismatch = compare(source, filename)
+            if result.mismatch is not None:
+                return result
+        result.checked += 1
+    return result
+
+
+def default_seed_files() -> list[str]:
+    return sorted(glob.glob(DEFAULT_SEED_FILES))
@@ -0,0 +1,217 @@
+"""
+Lint the Python files of a git commit, or of the staging index, without checking them out.
+
+The blob IDs come from one `git ls-tree` or `git ls-files` call and the contents are read through a single
+long-lived `git cat-file --batch` process, so nothing is written to disk. Files are named the way flake8 names them
+when run from the current directory, `./app/migrations/0001_initial.py`, so the path-based rules apply as they do to
+a checkout. Paths sharing a blob are linted once, like files with the same contents on disk.
+"""
+
+# Python imports
+import os
+import subprocess
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+
+# Internal imports
+from flake8_routable import path_disabled_codes
+from flake8_routable.baseline import Baseline
+from flake8_routable.runner import (
+    DEFAULT_SKIP_CONFIG,
+    EXCLUDED_DIRECTORIES,
+    RunStats,
+    SkipConfig,
+    decode_source,
+    file_rows,
+    lint_buffer,
+    lint_source,
+    results_at,
+)
+
+
+# the file mode of a regular blob, symlinks and submodules have others
+BLOB_MODES = ("100644", "100755")
+
+# commits looked back through for recently changed files
+RECENT_COMMITS = 100
+
+
+class BlobReader:
+    """Reads blobs through one `git cat-file --batch` process, started on the first read."""
+
+    def __init__(self, cwd: str | None = None) -> None:
+        self._cwd = cwd
+        self._process: subprocess.Popen | None = None
+
+    def __enter__(self) -> "BlobReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def read(self, object_id: str) -> bytes:
+        if self._process is None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self._cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+
+        self._process.stdin.write(object_id.encode() + b"\n")
+        self._process.stdin.flush()
+        header = self._process.stdout.readline().split()
+        if len(header) != 3 or header[1] != b"blob":
+            raise LookupError(f"{object_id} is not a blob")
+
+        data = self._process.stdout.read(int(header[2]))
+        self._process.stdout.read(1)  # the newline after the contents
+        return data
+
+    def close(self) -> None:
+        if self._process is not None:
+            self._process.stdin.close()
+            self._process.wait()
+            self._process.stdout.close()
+            self._process = None
+
+
+def _git(args: list[str], cwd: str | None) -> list[str]:
+    """The NUL separated records git prints for `args`, a bad ref raises CalledProcessError."""
+    output = subprocess.run(["git", *args], capture_output=True, check=True, cwd=cwd).stdout
+    return [record for record in output.decode().split("\0") if record]
+
+
+def python_blobs(ref: str | None, paths: Iterable[str] = (), cwd: str | None = None) -> list[tuple[str, str]]:
+    """
+    The `(filename, blob ID)` of every Python file at `ref`, or in the staging index when `ref` is None.
+
+    Like a checkout, `paths` and the filenames are relative to the current directory.
+    """
+    if ref is None:
+        records = _git(["ls-files", "--stage", "-z", "--", *paths], cwd)
+    else:
+        records = _git(["ls-tree", "-r", "-z", ref, "--", *paths], cwd)
+
+    blobs = []
+    for record in records:
+        info, path = record.split("\t", 1)
+        if ref is None:
+            mode, object_id, stage = info.split()
+            # conflicted files have no stage 0 entry, only the sides of the merge
+            if stage != "0":
+                continue
+        else:
+            mode, _, object_id = info.split()
+
+        directories = path.split("/")[:-1]
+        if mode in BLOB_MODES and path.endswith(".py") and not set(directories) & set(EXCLUDED_DIRECTORIES):
+            blobs.append((os.path.join(".", path), object_id))
+    return blobs
+
+
+def clean_blob_ids(cwd: str | None = None) -> dict[str, str]:
+    """
+    The blob ID of every tracked file whose checkout matches the staging index, by its normalized path.
+
+    Two git calls cover the whole tree, so the results of these files can be looked up in a cache without reading
+    them. Outside a git repository, or without git, there are none.
+    """
+    try:
+        records = _git(["ls-files", "--stage", "-z"], cwd)
+        dirty = set(_git(["diff", "--name-only", "--relative", "-z"], cwd))
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+
+    blob_ids = {}
+    for record in records:
+        info, path = record.split("\t", 1)
+        mode, object_id, stage = info.split()
+        if mode in BLOB_MODES and stage == "0" and path not in dirty:
+            blob_ids[os.path.normpath(path)] = object_id
+    return blob_ids
+
+
+def recently_changed(cwd: str | None = None) -> dict[str, int]:
+    """
+    How recently each file changed by its normalized path, 0 for uncommitted changes and otherwise how many of the
+    last `RECENT_COMMITS` commits are newer than the one that changed it. Outside a git repository there are none.
+    """
+    try:
+        uncommitted = _git(["diff", "HEAD", "--name-only", "--relative", "-z"], cwd)
+        untracked = _git(["ls-files", "--others", "--exclude-standard", "-z"], cwd)
+        log = subprocess.run(
+            ["git", "log", f"-{RECENT_COMMITS}", "--name-only", "--relative", "--format=%x00"],
+            capture_output=True,
+            check=True,
+            cwd=cwd,
+        ).stdout.decode()
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+
+    ages = {}
+    for age, commit in enumerate(log.split("\0")[1:], start=1):
+        for path in commit.split("\n"):
+            if path:
+                ages.setdefault(os.path.normpath(path), age)
+    ages.update((os.path.normpath(path), 0) for path in uncommitted + untracked)
+    return ages
+
+
+def lint_revision(
+    ref: str | None,
+    paths: Iterable[str] = (),
+    cwd: str | None = None,
+    linter: Callable[..., list[tuple[int, int, str]]] = lint_source,
+    skip_config: SkipConfig = DEFAULT_SKIP_CONFIG,
+    stats: RunStats | None = None,
+    baseline: Baseline | None = None,
+) -> Iterator[tuple[str, int, int, str]]:
+    """
+    Lint the Python files at `ref`, or in the staging index when it is None, yielding rows in path order.
+
+    The violations in `baseline` are matched against the blob's lines, since the checkout may differ from `ref`.
+    """
+    yield from file_rows(lint_revision_files(ref, paths, cwd, linter, skip_config, stats, baseline))
+
+
+def lint_revision_files(
+    ref: str | None,
+    paths: Iterable[str] = (),
+    cwd: str | None = None,
+    linter: Callable[..., list[tuple[int, int, str]]] = lint_source,
+    skip_config: SkipConfig = DEFAULT_SKIP_CONFIG,
+    stats: RunStats | None = None,
+    baseline: Baseline | None = None,
+) -> Iterator[tuple[str, list[tuple[int, int, str]]]]:
+    """The `(filename, results)` of every file of `lint_revision`, with or without results, in path order."""
+    blobs = python_blobs(ref, paths, cwd)
+    paths_by_blob = defaultdict(list)
+    for filename, object_id in blobs:
+        paths_by_blob[object_id].append(filename)
+
+    results_by_blob = {}
+    with BlobReader(cwd) as reader:
+        for filename, object_id in blobs:
+            if object_id not in results_by_blob:
+                group = paths_by_blob[object_id]
+                # lint at the path where the most rules apply and hand the results to the others
+                first = min(group, key=lambda filename: len(path_disabled_codes(filename)))
+                source = decode_source(reader.read(object_id))
+                results = lint_buffer(source, first, linter=linter, skip_config=skip_config, stats=stats)
+                lines = source.splitlines(keepends=True) if baseline is not None and results else None
+                results_by_blob[object_id] = first, results, lines
+                if stats is not None and len(group) > 1:
+                    stats.add("duplicates", len(group) - 1)
+
+            first, results, lines = results_by_blob[object_id]
+            if filename != first:
+                results = results_at(results, filename)
+            if lines is not None:
+                results = baseline.filter(filename, lines, results)
+            yield filename, results
+
+            # only the results of blobs with paths still to come are kept
+            paths_by_blob[object_id].remove(filename)
+            if not paths_by_blob[object_id]:
+                del results_by_blob[object_id]
@@ -0,0 +1,206 @@
+"""
+On-disk indexes of the project's module hierarchy and Django model class hierarchy.
+
+The module index maps every dotted module name under the project's import roots to its file, so the import rules
+resolve an import with a dictionary lookup. The roots default to the current directory, a src-layout project names
+its `src` directory instead, as it would put it on `sys.path`. It keeps each directory's listing with the
+directory's modification time, which changes whenever a file is added, removed or renamed in it, so keeping it up
+to date costs a stat per directory.
+
+The model index only covers `models.py` files and the modules of `models` packages, each with the name and base
+names of its classes. A file is parsed again only when its modification time or size changed, so keeping it up
+to date costs a stat per models file. The model names are resolved from the whole index, which lets
+ModelFieldDefinitions check just the classes that really are models, whatever their abstract bases and mixins
+are called.
+"""
+
+# Python imports
+import ast
+import json
+import os
+from collections.abc import Iterable
+
+# Internal imports
+from flake8_routable import ProjectModule, base_names, model_names
+from flake8_routable.runner import EXCLUDED_DIRECTORIES, iter_python_files
+
+
+def is_models_file(filename: str) -> bool:
+    """Whether a file is a models module or part of a models package."""
+    *directories, name = os.path.normpath(filename).split(os.sep)
+    return name == "models.py" or "models" in directories
+
+
+def class_bases(source: bytes, filename: str) -> list[tuple[str, tuple[str, ...]]]:
+    """The `(name, base names)` of every class in a file, none when it does not parse."""
+    try:
+        tree = ast.parse(source, filename)
+    except (SyntaxError, ValueError):
+        return []
+    return [(node.name, base_names(node)) for node in ast.walk(tree) if isinstance(node, ast.ClassDef)]
+
+
+class JsonIndex:
+    """An index kept in a JSON file between runs."""
+
+    # bumped whenever the format of the index changes, older indexes are rebuilt
+    VERSION = 1
+
+    def __init__(self) -> None:
+        self._entries: dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def load(cls, path: str) -> "JsonIndex":
+        """Load an index written to `path`, or an empty one when it is missing, unreadable or of an older version."""
+        index = cls()
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+
+        if isinstance(data, dict) and data.get("version") == cls.VERSION and isinstance(data.get("entries"), dict):
+            index._entries = data["entries"]
+        return index
+
+    def write(self, path: str) -> None:
+        """Write the index, replacing the previous one at once so a concurrent load never sees half of it."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump({"entries": self._entries, "version": self.VERSION}, f)
+        os.replace(temporary_path, path)
+
+
+class ModuleIndex(JsonIndex):
+    """
+    The modules and packages under import roots, each directory listed again only when its mtime changed.
+
+    The entries are the directory listings of each root, by their path relative to the root.
+    """
+
+    VERSION = 2
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        # directories listed by the last update
+        self.listed = 0
+
+    def update(self, roots: Iterable[str] = (".",)) -> None:
+        """Bring the index up to date with the directories under `roots`, forgetting those that are gone."""
+        self.listed = 0
+        self._entries = {root: self._update_root(root, self._entries.get(root, {})) for root in roots}
+
+    def _update_root(self, root: str, previous: dict[str, dict]) -> dict[str, dict]:
+        entries = {}
+        pending = ["."]
+        while pending:
+            directory = pending.pop()
+            path = os.path.join(root, directory)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+
+            entry = previous.get(directory)
+            if entry is None or entry["mtime_ns"] != mtime_ns:
+                entry = self._list(path, mtime_ns)
+                self.listed += 1
+            entries[directory] = entry
+            pending.extend(os.path.normpath(os.path.join(directory, name)) for name in entry["directories"])
+        return entries
+
+    @staticmethod
+    def _list(path: str, mtime_ns: int) -> dict:
+        """The modules of a directory and its subdirectories that may hold more, only these names can be imported."""
+        directories, modules = [], []
+        with os.scandir(path) as dir_entries:
+            for dir_entry in dir_entries:
+                name, extension = os.path.splitext(dir_entry.name)
+                if dir_entry.is_dir():
+                    if dir_entry.name.isidentifier() and dir_entry.name not in EXCLUDED_DIRECTORIES:
+                        directories.append(dir_entry.name)
+                elif extension == ".py" and name.isidentifier():
+                    modules.append(name)
+        return {"directories": sorted(directories), "modules": sorted(modules), "mtime_ns": mtime_ns}
+
+    def modules(self) -> dict[str, ProjectModule]:
+        """
+        Every indexed module by its dotted name, a package by the name of its directory.
+
+        A name found under several roots is the module of the first root, as Python would import it.
+        """
+        modules = {}
+        for root, entries in self._entries.items():
+            for directory, entry in entries.items():
+                packages = [] if directory == "." else directory.split(os.sep)
+                for name in entry["modules"]:
+                    is_package = name == "__init__"
+                    parts = packages if is_package else [*packages, name]
+                    if not parts:
+                        continue
+                    modules.setdefault(
+                        ".".join(parts),
+                        ProjectModule(
+                            path=os.path.normpath(os.path.join(root, directory, f"{name}.py")),
+                            is_package=is_package,
+                            is_test="tests" in parts,
+                            is_models_submodule="models" in parts[:-1],
+                        ),
+                    )
+        return modules
+
+
+class ModelIndex(JsonIndex):
+    """The classes of every models file, updated incrementally from the files' modification times and sizes."""
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        # files parsed by the last update
+        self.parsed = 0
+
+    def update(self, filenames: Iterable[str]) -> None:
+        """Bring the index up to date with the models files among `filenames`, forgetting those that are gone."""
+        self.parsed = 0
+        entries = {}
+        for filename in filenames:
+            if not is_models_file(filename):
+                continue
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                continue
+
+            entry = self._entries.get(filename)
+            if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                with open(filename, "rb") as f:
+                    classes = class_bases(f.read(), filename)
+                entry = {"classes": classes, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+                self.parsed += 1
+            entries[filename] = entry
+        self._entries = entries
+
+    def model_names(self) -> frozenset[str]:
+        """Names of the indexed classes that derive from a Django model."""
+        return model_names((name, bases) for entry in self._entries.values() for name, bases in entry["classes"])
+
+
+def load_modules(path: str, roots: Iterable[str] = (".",)) -> dict[str, ProjectModule]:
+    """Update the module index written to `path` with the modules under `roots` and return them."""
+    index = ModuleIndex.load(path)
+    index.update(roots)
+    index.write(path)
+    return index.modules()
+
+
+def load_model_names(path: str, root: str = ".") -> frozenset[str]:
+    """Update the model index written to `path` with the models files under `root` and return the model names."""
+    index = ModelIndex.load(path)
+    index.update(iter_python_files([root]))
+    index.write(path)
+    return index.model_names()
@@ -0,0 +1,157 @@
+"""
+The memory each rule allocates, measured under tracemalloc with every other rule disabled.
+
+The AST rules are measured by the Visitor handlers of each code, the token rules one `FileTokenHelper` rule at a
+time, fed the tokens and AST index of the whole rule engine. The tree walk on its own is measured too, every handler
+group's numbers include it. The tree, tokens and index are built before tracing starts and the statement memos are
+emptied before each rule, so each number is the rule's own.
+
+tracemalloc follows live memory, so for each rule there is its peak while it ran and what it still held after, in
+the memos for instance, both per MB of source.
+"""
+
+# Python imports
+import ast
+import gc
+import io
+import json
+import tokenize
+import tracemalloc
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
+
+# Internal imports
+from flake8_routable import ALL_CODES, STATEMENT_MEMOS, FileTokenHelper, Visitor
+from flake8_routable.corpus import corpus
+
+
+BYTES_PER_MB = 1024 * 1024
+
+# the name of the measurement of the tree walk with no handler run
+TREE_WALK = "tree walk"
+
+
+@dataclass(frozen=True)
+class RuleMemory:
+    """The memory of one rule on one source."""
+
+    rule: str
+    source: str
+    source_bytes: int
+    peak: int
+    retained: int
+
+    @property
+    def peak_per_mb(self) -> float:
+        return self.peak * BYTES_PER_MB / self.source_bytes
+
+    @property
+    def retained_per_mb(self) -> float:
+        return self.retained * BYTES_PER_MB / self.source_bytes
+
+
+def handler_groups() -> list[tuple[str, frozenset[str]]]:
+    """The name and codes of the Visitor handlers run for each code, `visit_Dict/visit_Set ROU103` for instance."""
+    groups = []
+    for code in sorted({code for codes in Visitor.HANDLER_CODES.values() for code in codes}):
+        handlers = [handler for handler, codes in Visitor.HANDLER_CODES.items() if code in codes]
+        groups.append((f"{'/'.join(handlers)} {code}", frozenset((code,))))
+    return groups
+
+
+def token_rules() -> list[tuple[str, frozenset[str]]]:
+    """The name and codes of each `FileTokenHelper` rule."""
+    return [(f"{rule} {'/'.join(codes)}", frozenset(codes)) for rule, codes in FileTokenHelper.RULES]
+
+
+def traced(run: Callable[[], object]) -> tuple[int, int]:
+    """The peak memory `run` allocated and what was still allocated once its result was dropped."""
+    for memo in STATEMENT_MEMOS.values():
+        memo.clear()
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        run()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, retained
+
+
+def measure_source(name: str, filename: str, source: str) -> list[RuleMemory]:
+    """The memory of the tree walk, each handler group and each token rule on one source."""
+    source_bytes = len(source.encode())
+    tree = ast.parse(source, filename)
+    file_tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+    index_visitor = Visitor()
+    index_visitor.visit(tree)
+
+    def visit(enabled_codes: frozenset[str]) -> Callable[[], object]:
+        def run():
+            visitor = Visitor(ALL_CODES - enabled_codes)
+            visitor.visit(tree)
+            visitor.finalize()
+
+        return run
+
+    def consume(enabled_codes: frozenset[str]) -> Callable[[], object]:
+        def run():
+            FileTokenHelper(filename, disabled_codes=ALL_CODES - enabled_codes, index=index_visitor.index).visit(
+                file_tokens
+            )
+
+        return run
+
+    runs = [(TREE_WALK, visit(frozenset()))]
+    runs += [(rule, visit(codes)) for rule, codes in handler_groups()]
+    runs += [(rule, consume(codes)) for rule, codes in token_rules()]
+    return [RuleMemory(rule, name, source_bytes, *traced(run)) for rule, run in runs]
+
+
+def benchmark(sources: Iterable[tuple[str, str, str]] | None = None, scale: int = 1) -> list[RuleMemory]:
+    """The memory of every rule on each `(name, filename, source)`, by default the synthetic corpus at `scale`."""
+    results = []
+    for name, filename, source in corpus(scale) if sources is None else sources:
+        results += measure_source(name, filename, source)
+    return results
+
+
+def summarize(results: Iterable[RuleMemory]) -> list[dict]:
+    """
+    Each rule's highest peak per MB of source with the source it was on, and its memory retained per MB of all of
+    the sources, highest peak first.
+    """
+    by_rule = {}
+    for result in results:
+        by_rule.setdefault(result.rule, []).append(result)
+
+    summary = []
+    for rule, rule_results in by_rule.items():
+        worst = max(rule_results, key=lambda result: result.peak_per_mb)
+        source_bytes = sum(result.source_bytes for result in rule_results)
+        summary.append(
+            {
+                "peak_per_mb": round(worst.peak_per_mb),
+                "peak_source": worst.source,
+                "retained_per_mb": round(sum(result.retained for result in rule_results) * BYTES_PER_MB / source_bytes),
+                "rule": rule,
+            }
+        )
+    return sorted(summary, key=lambda row: -row["peak_per_mb"])
+
+
+def format_summary(summary: list[dict]) -> str:
+    width = max(len(row["rule"]) for row in summary)
+    lines = [f"{'rule':<{width}}  {'peak KB/MB':>10}  {'retained KB/MB':>14}  peak source"]
+    for row in summary:
+        lines.append(
+            f"{row['rule']:<{width}}  {row['peak_per_mb'] / 1024:>10.0f}  {row['retained_per_mb'] / 1024:>14.0f}"
+            f"  {row['peak_source']}"
+        )
+    return "\n".join(lines)
+
+
+def format_json(results: Iterable[RuleMemory]) -> str:
+    """One JSON line per rule and source, to compare runs over time."""
+    return "\n".join(json.dumps(asdict(result), sort_keys=True) for result in results)
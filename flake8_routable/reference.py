@@ -1,10 +1,18 @@
+"""
+The rule engine as it was before the performance work, frozen to check the live engine against.
+
+The `Visitor` and `FileTokenHelper` here are the original single-pass AST visitor and full token list scans,
+copied as they were and sharing nothing with the live engine, so a change to a live helper can not change the
+reference with it. They are not to be optimized or fixed. `fuzz` runs both engines on generated sources and reports
+the first one where they differ, apart from the differences the live engine made on purpose, which it lists.
+"""
+
 # Python imports
 import ast
-import importlib.metadata as importlib_metadata
 import re
 import tokenize
 import warnings
-from collections.abc import Generator
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from itertools import chain
 from typing import Any
@@ -607,24 +615,16 @@ class FileTokenHelper:
                 kwargs_found = False
 
 
-class Plugin:
-    """Flake8 plugin for Routable's best coding practices."""
-
-    name = __name__
-    version = importlib_metadata.version(__name__)
-
-    def __init__(self, tree, file_tokens: list[tokenize.TokenInfo], filename: str) -> None:
-        self._file_tokens = file_tokens
-        self._filename = filename
-        self._tree = tree
-
-    def run(self) -> Generator[tuple[int, int, str, type["Plugin"]]]:
-        visitor = Visitor()
-        visitor.visit(self._tree)
-        visitor.finalize()
-
-        file_token_helper = FileTokenHelper(self._filename)
-        file_token_helper.visit(self._file_tokens)
+def reference_errors(
+    tree: ast.AST,
+    file_tokens: Iterable[tokenize.TokenInfo],
+    filename: str,
+) -> Iterator[tuple[int, int, str]]:
+    """Every rule's errors on a file, as the original plugin reported them."""
+    visitor = Visitor()
+    visitor.visit(tree)
+    visitor.finalize()
 
-        for line, col, msg in chain(visitor.errors, file_token_helper.errors):
-            yield line, col, msg, type(self)
+    file_token_helper = FileTokenHelper(filename)
+    file_token_helper.visit(list(file_tokens))
+    return chain(visitor.errors, file_token_helper.errors)
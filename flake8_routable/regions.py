@@ -0,0 +1,195 @@
+"""
+Region-level incremental linting.
+
+A file is split into regions of top-level statements and each region is linted on its own, so re-linting an
+edited buffer only re-analyses the regions whose text changed. Regions are merged wherever a rule needs to
+see across a statement boundary:
+* statements with no blank line between them (ROU105 constant groups, ROU100 comments after a `def` line)
+* an indented block followed by comments (ROU104 depends on where the DEDENT falls)
+
+ModelFieldDefinitions keeps checking fields once any model base class was seen, so that state is carried from
+region to region and is part of each region's cache key. With a model index, the models defined in the file
+are resolved from the whole file instead, and those are part of the key.
+"""
+
+# Python imports
+import ast
+import hashlib
+import io
+import threading
+import tokenize
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# Internal imports
+from flake8_routable import (
+    ROU117,
+    FileTokenHelper,
+    ModelFieldDefinitions,
+    Plugin,
+    RuleTimer,
+    Visitor,
+    base_names,
+    import_aliases,
+    model_names,
+)
+
+
+DEFAULT_MAX_ENTRIES = 16384
+
+
+@dataclass(frozen=True)
+class Region:
+
+    # first and last line of the region, 1-based and inclusive
+    start: int
+    end: int
+
+    text: str
+    digest: str
+
+
+def _node_start(node: ast.stmt) -> int:
+    return min([node.lineno] + [decorator.lineno for decorator in getattr(node, "decorator_list", ())])
+
+
+def _is_joined(lines: list[str], previous_end: int, start: int) -> bool:
+    """Whether the statement starting at `start` must share a region with the one ending at `previous_end`."""
+    gap = lines[previous_end : start - 1]
+    if not gap or gap[0].strip():
+        return True
+
+    ends_indented = lines[previous_end - 1][:1] in (" ", "\t")
+    return ends_indented and any(line.lstrip().startswith("#") for line in gap)
+
+
+def split_regions(lines: list[str], tree: ast.Module) -> list[Region]:
+    """Split a file into regions, each a run of top-level statements with the lines leading up to them."""
+    spans = []
+    for node in tree.body:
+        if spans and _is_joined(lines, spans[-1][1], _node_start(node)):
+            spans[-1][1] = node.end_lineno
+        else:
+            spans.append([spans[-1][1] + 1 if spans else 1, node.end_lineno])
+
+    if spans:
+        spans[-1][1] = len(lines)
+    else:
+        spans.append([1, len(lines)])
+
+    regions = []
+    for start, end in spans:
+        text = "".join(lines[start - 1 : end])
+        regions.append(Region(start, end, text, hashlib.sha1(text.encode()).hexdigest()))
+    return regions
+
+
+def file_model_names(tree: ast.Module) -> frozenset[str] | None:
+    """The model names of the model index with the models defined in the file, None without an index."""
+    if Plugin.model_names is None:
+        return None
+    classes = [node for node in ast.walk(tree) if isinstance(node, ast.ClassDef)]
+    return model_names(((node.name, base_names(node)) for node in classes), Plugin.model_names)
+
+
+class RegionLinter:
+    """
+    Lints files region by region, re-using the results of regions that did not change.
+
+    It is safe to share between threads, the lock is only held around cache lookups and updates.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def lint(self, source: str, filename: str, timer: RuleTimer | None = None) -> list[tuple[int, int, str]]:
+        try:
+            tree = ast.parse(source, filename)
+        except SyntaxError:
+            # flake8 reports these itself as E999
+            return []
+
+        results = []
+        in_model = False
+        # tasks are recognized through the imports of the whole file, which may be in other regions
+        aliases = import_aliases(tree)
+        aliases_key = frozenset(aliases.items())
+        # models may derive from a model defined in another region
+        names = file_model_names(tree)
+        names_key = names and names - Plugin.model_names
+
+        for region in split_regions(source.splitlines(keepends=True), tree):
+            key = (filename, region.digest, in_model, aliases_key, names_key)
+            entry = self._get(key)
+            if entry is None:
+                entry = self._lint_region(region, filename, in_model, aliases, timer, names)
+                # a region linted after running over the time budget is missing the expensive rules
+                if timer is None or not timer.degraded:
+                    self._set(key, entry)
+
+            region_results, enters_model = entry
+            results.extend((line + region.start - 1, col, msg) for line, col, msg in region_results)
+            in_model = in_model or enters_model
+
+        if timer is not None and timer.degraded:
+            results.append((1, 0, ROU117))
+        return sorted(results)
+
+    def _get(
+        self, key: tuple[str, str, bool, frozenset, frozenset | None]
+    ) -> tuple[list[tuple[int, int, str]], bool] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return entry
+
+    def _set(
+        self, key: tuple[str, str, bool, frozenset, frozenset | None], entry: tuple[list[tuple[int, int, str]], bool]
+    ) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _lint_region(
+        region: Region,
+        filename: str,
+        in_model: bool,
+        aliases: dict[str, str] | None = None,
+        timer: RuleTimer | None = None,
+        names: frozenset[str] | None = None,
+    ) -> tuple[list[tuple[int, int, str]], bool]:
+        """Lint a region as if it were a file, returning results relative to its first line."""
+        try:
+            tree = ast.parse(region.text, filename)
+            file_tokens = list(tokenize.generate_tokens(io.StringIO(region.text).readline))
+        except (SyntaxError, tokenize.TokenError):
+            return [], False
+
+        visitor = Visitor(timer=timer, import_aliases=aliases, modules=Plugin.modules)
+        visitor.visit(tree)
+        visitor.finalize()
+
+        file_token_helper = FileTokenHelper(
+            filename,
+            in_model=in_model,
+            timer=timer,
+            index=visitor.index,
+            model_names=names,
+        )
+        file_token_helper.visit(file_tokens)
+
+        enters_model = any(
+            ModelFieldDefinitions.enters_model(token.type, token.string, token.line) for token in file_tokens
+        )
+        return visitor.errors + file_token_helper.errors, enters_model
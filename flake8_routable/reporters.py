@@ -0,0 +1,132 @@
+"""
+Reporters that stream `(filename, line, col, message)` rows as text, JSON Lines or SARIF.
+
+Each row is formatted as it arrives and appended to a buffer that is written out in one call once it holds
+`buffer_bytes`, so a run with hundreds of thousands of findings costs a few large writes and never holds more
+than one buffer of output. SARIF is written the same way: each result is one element of the `results` array,
+streamed between a fixed header and a footer that carries the rule table.
+"""
+
+# Python imports
+import json
+from collections.abc import Iterable
+from typing import TextIO
+
+# Internal imports
+from flake8_routable import MESSAGES, Plugin
+
+
+DEFAULT_BUFFER_BYTES = 64 * 1024
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_VERSION = "2.1.0"
+
+# `code: (index, description)` of every rule, from the message table
+RULES = {message.split(" ", 1)[0]: (index, message.split(" ", 1)[1]) for index, message in enumerate(MESSAGES)}
+
+
+class Reporter:
+    """Formats rows and writes them to `out` in buffered chunks."""
+
+    def __init__(self, out: TextIO, buffer_bytes: int = DEFAULT_BUFFER_BYTES) -> None:
+        self._buffer: list[str] = []
+        self._buffered_bytes = 0
+        self._buffer_bytes = buffer_bytes
+        self._out = out
+
+        # findings reported so far
+        self.count = 0
+
+    def start(self) -> None:
+        pass
+
+    def add(self, filename: str, line: int, col: int, msg: str) -> None:
+        self._write(self.format(filename, line, col, msg))
+        self.count += 1
+
+    def finish(self) -> None:
+        self._flush()
+
+    def format(self, filename: str, line: int, col: int, msg: str) -> str:
+        raise NotImplementedError
+
+    def report(self, rows: Iterable[tuple[str, int, int, str]]) -> int:
+        """Write every row, consuming them as they come, and return how many there were."""
+        self.start()
+        for row in rows:
+            self.add(*row)
+        self.finish()
+        return self.count
+
+    def _write(self, text: str) -> None:
+        self._buffer.append(text)
+        self._buffered_bytes += len(text)
+        if self._buffered_bytes >= self._buffer_bytes:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        self._out.write("".join(self._buffer))
+        self._buffer.clear()
+        self._buffered_bytes = 0
+
+
+class TextReporter(Reporter):
+    """flake8's default `filename:line:col: message` format."""
+
+    def format(self, filename: str, line: int, col: int, msg: str) -> str:
+        return f"{filename}:{line}:{col + 1}: {msg}\n"  # flake8 reports 1-based columns
+
+
+class JsonLinesReporter(Reporter):
+    """One JSON object per finding, with the rule's code and description apart."""
+
+    def format(self, filename: str, line: int, col: int, msg: str) -> str:
+        code, text = msg.split(" ", 1)
+        return json.dumps({"code": code, "column": col + 1, "filename": filename, "line": line, "message": text}) + "\n"
+
+
+class SarifReporter(Reporter):
+    """A SARIF 2.1.0 log with one run, whose rules are the ROU message table."""
+
+    def start(self) -> None:
+        self._write(f'{{"$schema": "{SARIF_SCHEMA}", "runs": [{{"results": [')
+
+    def format(self, filename: str, line: int, col: int, msg: str) -> str:
+        code, text = msg.split(" ", 1)
+        result = {
+            "level": "warning",
+            "locations": [
+                {
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": filename},
+                        "region": {"startColumn": col + 1, "startLine": line},
+                    }
+                }
+            ],
+            "message": {"text": text},
+            "ruleId": code,
+        }
+        if code in RULES:
+            result["ruleIndex"] = RULES[code][0]
+        return ("," if self.count else "") + json.dumps(result)
+
+    def finish(self) -> None:
+        rules = [{"id": code, "shortDescription": {"text": text}} for code, (_, text) in RULES.items()]
+        driver = {"name": Plugin.name, "rules": rules, "version": Plugin.version}
+        self._write(f'], "tool": {{"driver": {json.dumps(driver)}}}}}], "version": "{SARIF_VERSION}"}}\n')
+        super().finish()
+
+
+REPORTERS = {"jsonl": JsonLinesReporter, "sarif": SarifReporter, "text": TextReporter}
+
+
+def write_report(
+    rows: Iterable[tuple[str, int, int, str]],
+    out: TextIO,
+    output_format: str = "text",
+    buffer_bytes: int = DEFAULT_BUFFER_BYTES,
+) -> int:
+    """Stream `rows`, such as those of `lint_paths`, to `out` in `output_format` and return how many there were."""
+    return REPORTERS[output_format](out, buffer_bytes).report(rows)
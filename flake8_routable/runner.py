@@ -0,0 +1,474 @@
+# Python imports
+import ast
+import hashlib
+import heapq
+import io
+import os
+import re
+import threading
+import time
+import tokenize
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+
+# Pip imports
+from flake8.defaults import NOQA_FILE, NOQA_INLINE_REGEXP
+
+# Internal imports
+from flake8_routable import (
+    ALL_CODES,
+    HEADER_BYTES,
+    ROU117,
+    Plugin,
+    RuleTimer,
+    SkipConfig,
+    path_disabled_codes,
+    statement_memo_counts,
+)
+from flake8_routable.cache import ResultCache
+
+
+# directories never worth descending into when discovering files
+EXCLUDED_DIRECTORIES = (
+    ".git",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".tox",
+    ".venv",
+    "__pycache__",
+    "node_modules",
+    "venv",
+)
+
+
+DEFAULT_SKIP_CONFIG = SkipConfig()
+
+
+class RunStats:
+    """
+    Counters for the instrumentation summary, safe to update from several threads.
+
+    With `slow_files` above zero, the rules are timed and that many of the slowest files are kept for the report.
+    With `record_durations`, the time each file took to read and lint is kept for the timing history, for the files
+    that were not found in a cache.
+    """
+
+    def __init__(self, slow_files: int = 0, record_durations: bool = False) -> None:
+        self.counts = Counter()
+        self.durations: dict[str, float] | None = {} if record_durations else None
+        self.slow_files = slow_files
+
+        self._lock = threading.Lock()
+        self._slowest = []
+
+    def add(self, name: str, count: int = 1) -> None:
+        with self._lock:
+            self.counts[name] += count
+
+    def update(self, counts: dict[str, int]) -> None:
+        with self._lock:
+            self.counts.update(counts)
+
+    def add_timing(self, filename: str, seconds: float, slowest_rule: str | None) -> None:
+        with self._lock:
+            entry = (seconds, filename, slowest_rule)
+            if len(self._slowest) < self.slow_files:
+                heapq.heappush(self._slowest, entry)
+            elif self._slowest and entry > self._slowest[0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def add_duration(self, filename: str, seconds: float) -> None:
+        with self._lock:
+            self.durations[filename] = seconds
+
+    def slowest(self) -> list[tuple[float, str, str | None]]:
+        """The `(seconds, filename, slowest rule)` of the slowest files, slowest first."""
+        with self._lock:
+            return sorted(self._slowest, reverse=True)
+
+    def add_memo_counts(self, before: dict[str, int]) -> None:
+        """Count the statement memo lookups since `before`, taken with `statement_memo_counts`."""
+        self.update({name: count - before[name] for name, count in statement_memo_counts().items()})
+
+    def summary(self) -> str:
+        summary = ", ".join(f"{name}: {count}" for name, count in sorted(self.counts.items()) if count)
+        lookups = self.counts["memo hits"] + self.counts["memo misses"]
+        if lookups:
+            summary += f", memo hit rate: {self.counts['memo hits'] / lookups:.0%}"
+        return summary
+
+    def slow_file_report(self) -> str:
+        return "\n".join(
+            f"{seconds:8.3f}s {filename}" + (f" (mostly {rule})" if rule else "")
+            for seconds, filename, rule in self.slowest()
+        )
+
+
+def decode_source(data: bytes) -> str:
+    """
+    Decode file contents honouring a PEP 263 encoding cookie, like flake8 does.
+
+    Contents that do not decode, or name an unknown encoding, are read as latin-1 as flake8 reads them, so they get
+    the same results.
+    """
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+        return data.decode(encoding)
+    except (SyntaxError, UnicodeError):
+        return data.decode("latin-1")
+
+
+def iter_python_files(paths: Iterable[str], root: str | None = None) -> Iterator[str]:
+    """
+    Yield the Python files found under `paths`, named the way flake8 names them.
+
+    When `root` is given, relative paths are resolved against it but are yielded unchanged.
+    """
+    for path in paths:
+        real_path = os.path.join(root, path) if root else path
+
+        if not os.path.isdir(real_path):
+            yield path
+            continue
+
+        for dir_path, dir_names, file_names in os.walk(real_path):
+            dir_names[:] = sorted(name for name in dir_names if name not in EXCLUDED_DIRECTORIES)
+            display_dir = path if dir_path == real_path else os.path.join(path, os.path.relpath(dir_path, real_path))
+            for file_name in sorted(file_names):
+                if file_name.endswith(".py"):
+                    yield os.path.join(display_dir, file_name)
+
+
+def group_by_content(
+    filenames: Iterable[str],
+    root: str | None = None,
+    skip_config: SkipConfig = DEFAULT_SKIP_CONFIG,
+    blob_ids: Mapping[str, str] | None = None,
+) -> list[tuple[str | None, list[str]]]:
+    """
+    Group files with the same contents, in the order each content is first seen, as `(blob ID, filenames)`.
+
+    Each group starts with the path where the most rules apply, so its results can be handed to the rest of the
+    group with `results_at`. Files skipped by their header are not hashed and stay in a group of their own, without a
+    blob ID. Files are hashed the way git hashes blobs, so the blob ID is the key of their results in a
+    `ResultCache`, and the files in `blob_ids` are grouped by their blob ID without reading them.
+    """
+    # by blob ID, or by `(None, filename)` for the files that are not hashed
+    groups = defaultdict(list)
+    for filename in filenames:
+        if blob_ids and (object_id := blob_ids.get(os.path.normpath(filename))):
+            groups[object_id].append(filename)
+            continue
+
+        with open(os.path.join(root, filename) if root else filename, "rb") as f:
+            data = f.read(HEADER_BYTES)
+            if skip_config.disabled_codes(data.decode(errors="replace"), 0) == ALL_CODES:
+                groups[None, filename].append(filename)
+                continue
+            digest = hashlib.sha1(b"blob %d\0" % os.fstat(f.fileno()).st_size + data)
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+        groups[digest.hexdigest()].append(filename)
+
+    return [
+        (object_id if isinstance(object_id, str) else None, sorted(group, key=lambda f: len(path_disabled_codes(f))))
+        for object_id, group in groups.items()
+    ]
+
+
+def results_at(results: list[tuple[int, int, str]], filename: str) -> list[tuple[int, int, str]]:
+    """The results of a file with the same contents as `filename`, without the rules that do not apply there."""
+    disabled_codes = path_disabled_codes(filename)
+    if not disabled_codes:
+        return results
+    return [result for result in results if result[2].split(" ", 1)[0] not in disabled_codes]
+
+
+def noqa_spans(source: str) -> dict[int, tuple[int, int]]:
+    """The first and last line of the statement or multi-line string each line is part of, as flake8 maps them."""
+    spans = {}
+    first, last = None, None
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(source).readline):
+            if token.type in (tokenize.ENDMARKER, tokenize.DEDENT):
+                continue
+
+            first = token.start[0] if first is None else min(first, token.start[0])
+            last = token.end[0] if last is None else max(last, token.end[0])
+            if token.type in (tokenize.NL, tokenize.NEWLINE):
+                spans.update(dict.fromkeys(range(first, last + 1), (first, last)))
+                first, last = None, None
+    except (SyntaxError, tokenize.TokenError):
+        return {}
+    return spans
+
+
+def without_noqa(source: str, results: list[tuple[int, int, str]]) -> list[tuple[int, int, str]]:
+    """
+    The results not silenced by a `# noqa` or `# noqa: ROUxxx` comment, as flake8 silences them.
+
+    A comment applies to every line of the statement or multi-line string it is on, and a `# flake8: noqa` line to
+    the whole file. ROU117 is never silenced, since it says how the file was checked.
+    """
+    if not results or not re.search("noqa", source, re.IGNORECASE):
+        return results
+
+    lines = source.splitlines(keepends=True)
+    if any(NOQA_FILE.match(line) for line in lines):
+        return [result for result in results if result[2] == ROU117]
+
+    spans = noqa_spans(source)
+
+    def is_silenced(line: int, msg: str) -> bool:
+        first, last = spans.get(line, (line, line))
+        match = NOQA_INLINE_REGEXP.search("".join(lines[first - 1 : last]))
+        if match is None or msg == ROU117:
+            return False
+        if match.group("codes") is None:
+            return True
+        # a code silences the codes it is a prefix of, `# noqa: ROU1` silences ROU103
+        codes = tuple(code for code in re.split(r"[,\s]", match.group("codes")) if code)
+        return msg.split(" ", 1)[0].startswith(codes)
+
+    return [(line, col, msg) for line, col, msg in results if not is_silenced(line, msg)]
+
+
+def lint_tree(
+    tree: ast.AST,
+    file_tokens: Iterable[tokenize.TokenInfo],
+    filename: str,
+    disabled_codes: frozenset[str] = frozenset(),
+    timer: RuleTimer | None = None,
+) -> list[tuple[int, int, str]]:
+    """Run the rules over already parsed inputs, returning the results sorted by position."""
+    return sorted(Plugin(tree, file_tokens, filename).errors(disabled_codes, timer))
+
+
+def lint_source(
+    source: str,
+    filename: str,
+    disabled_codes: frozenset[str] = frozenset(),
+    timer: RuleTimer | None = None,
+) -> list[tuple[int, int, str]]:
+    """
+    Lint a source string, returning the ROU results sorted by position.
+
+    The tokens are fed to the rules straight from the tokenizer, so they are never all held at once.
+    """
+    try:
+        tree = ast.parse(source, filename)
+        file_tokens = tokenize.generate_tokens(io.StringIO(source).readline)
+        return lint_tree(tree, file_tokens, filename, disabled_codes, timer)
+    except (SyntaxError, tokenize.TokenError):
+        # flake8 reports these itself as E999
+        return []
+
+
+def lint_buffer(
+    source: str,
+    filename: str,
+    linter: Callable[..., list[tuple[int, int, str]]] = lint_source,
+    skip_config: SkipConfig = DEFAULT_SKIP_CONFIG,
+    stats: RunStats | None = None,
+) -> list[tuple[int, int, str]]:
+    """Lint an in-memory source, such as an unsaved editor buffer, skipping rules as `skip_config` says."""
+    disabled_codes = skip_config.disabled_codes(source[:HEADER_BYTES], len(source), source.count("\n") + 1)
+    return _lint_with(source, filename, disabled_codes, linter, skip_config, stats)
+
+
+def lint_file(
+    filename: str,
+    cache: ResultCache | None = None,
+    root: str | None = None,
+    linter: Callable[..., list[tuple[int, int, str]]] = lint_source,
+    skip_config: SkipConfig = DEFAULT_SKIP_CONFIG,
+    stats: RunStats | None = None,
+    object_id: str | None = None,
+) -> list[tuple[int, int, str]]:
+    """
+    Lint a file on disk, consulting `cache` before running any rule.
+
+    Only the header is read before deciding whether the file is skipped entirely. When the file's git blob ID is
+    known as `object_id`, a cached result is returned without opening the file at all.
+    """
+    key = results = None
+    if cache is not None and object_id is not None:
+        key = (object_id, filename)
+        results = cache.get(key)
+        if results is not None:
+            if stats is not None:
+                stats.add("files")
+            return results
+
+    start = time.perf_counter()
+    with open(os.path.join(root, filename) if root else filename, "rb") as f:
+        data = f.read(HEADER_BYTES)
+        header = data.decode(errors="replace")
+        disabled_codes = skip_config.disabled_codes(header, os.fstat(f.fileno()).st_size)
+        if disabled_codes != ALL_CODES:
+            data += f.read()
+
+    if not disabled_codes and skip_config.max_lines is not None:
+        disabled_codes = skip_config.disabled_codes(header, len(data), data.count(b"\n") + 1)
+
+    if cache is not None and disabled_codes != ALL_CODES:
+        if key is None:
+            key = cache.key(data, filename)
+            results = cache.get(key)
+        if results is not None:
+            if stats is not None:
+                stats.add("files")
+            return results
+
+    results = _lint_with(data, filename, disabled_codes, linter, skip_config, stats)
+    # a file that ran over its time budget gets another chance next time
+    if cache is not None and disabled_codes != ALL_CODES and not any(msg == ROU117 for _, _, msg in results):
+        cache.set(key, results)
+    # the timing history only learns from files that were linted, not from cache hits
+    if stats is not None and stats.durations is not None:
+        stats.add_duration(filename, time.perf_counter() - start)
+    return results
+
+
+def _lint_with(
+    source: str | bytes,
+    filename: str,
+    disabled_codes: frozenset[str],
+    linter: Callable[..., list[tuple[int, int, str]]],
+    skip_config: SkipConfig,
+    stats: RunStats | None,
+) -> list[tuple[int, int, str]]:
+    if stats is not None:
+        stats.add("files")
+        if disabled_codes == ALL_CODES:
+            stats.add("skipped")
+        elif disabled_codes:
+            stats.add("reduced")
+
+    if disabled_codes == ALL_CODES:
+        return []
+
+    timer = None
+    if skip_config.time_budget is not None or (stats is not None and stats.slow_files):
+        timer = RuleTimer(skip_config.time_budget)
+
+    if isinstance(source, bytes):
+        source = decode_source(source)
+    if disabled_codes:
+        # the reduced rule set is not worth the incremental linters' caching
+        results = lint_source(source, filename, disabled_codes, timer=timer)
+    else:
+        results = linter(source, filename, timer=timer)
+    results = without_noqa(source, results)
+
+    if timer is not None and stats is not None:
+        if timer.degraded:
+            stats.add("partly checked")
+        if stats.slow_files:
+            stats.add_timing(filename, timer.total, timer.slowest_rule())
+    return results
+
+
+def lint_paths(
+    paths: Iterable[str],
+    cache: ResultCache | None = None,
+    root: str | None = None,
+    linter: Callable[..., list[tuple[int, int, str]]] = lint_source,
+    threads: int = 1,
+    skip_config: SkipConfig = DEFAULT_SKIP_CONFIG,
+    stats: RunStats | None = None,
+    blob_ids: Mapping[str, str] | None = None,
+) -> Iterator[tuple[str, int, int, str]]:
+    """Lint every Python file under `paths`, yielding `(filename, line, col, message)` rows, see `lint_files`."""
+    yield from file_rows(lint_files(paths, cache, root, linter, threads, skip_config, stats, blob_ids))
+
+
+def lint_files(
+    paths: Iterable[str],
+    cache: ResultCache | None = None,
+    root: str | None = None,
+    linter: Callable[..., list[tuple[int, int, str]]] = lint_source,
+    threads: int = 1,
+    skip_config: SkipConfig = DEFAULT_SKIP_CONFIG,
+    stats: RunStats | None = None,
+    blob_ids: Mapping[str, str] | None = None,
+) -> Iterator[tuple[str, list[tuple[int, int, str]]]]:
+    """
+    Lint every Python file under `paths`, yielding the `(filename, results)` of each file, with or without results.
+
+    Files are hashed before anything is parsed, so files with the same contents are linted once. The files in
+    `blob_ids`, the clean tracked files by normalized path, are neither hashed nor read when `cache` has their
+    results. With `threads` above one the files are linted on a thread pool, which only runs rules in parallel on a
+    free-threaded interpreter. Files are yielded in the same order either way, each as soon as it is linted.
+    """
+    filenames = list(iter_python_files(paths, root=root))
+    groups = group_by_content(filenames, root=root, skip_config=skip_config, blob_ids=blob_ids)
+    memo_counts = statement_memo_counts()
+
+    def lint_group(object_id_and_group: tuple[str | None, list[str]]) -> dict[str, list[tuple[int, int, str]]]:
+        object_id, group = object_id_and_group
+        # the blob ID the group was hashed to is the file's cache key, so it is not hashed again
+        results = lint_file(
+            group[0],
+            cache=cache,
+            root=root,
+            linter=linter,
+            skip_config=skip_config,
+            stats=stats,
+            object_id=object_id,
+        )
+        if stats is not None and len(group) > 1:
+            stats.add("duplicates", len(group) - 1)
+        return {filename: results_at(results, filename) for filename in group}
+
+    def in_order(group_results: Iterator[dict[str, list[tuple[int, int, str]]]]):
+        """Yield each file's results in discovery order, as soon as its group has been linted."""
+        file_results = {}
+        for filename in filenames:
+            while filename not in file_results:
+                file_results.update(next(group_results))
+            yield filename, file_results[filename]
+
+    if threads > 1:
+        executor = ThreadPoolExecutor(max_workers=threads)
+        try:
+            yield from in_order(executor.map(lint_group, groups))
+        finally:
+            # a consumer that stops early, such as --fail-fast, waits for neither the files not started yet nor those
+            # still being linted
+            executor.shutdown(wait=False, cancel_futures=True)
+    else:
+        yield from in_order(map(lint_group, groups))
+
+    if stats is not None:
+        stats.add_memo_counts(memo_counts)
+
+
+def file_rows(
+    file_results: Iterable[tuple[str, list[tuple[int, int, str]]]],
+) -> Iterator[tuple[str, int, int, str]]:
+    """The `(filename, line, col, message)` rows of each file's `(filename, results)`."""
+    for filename, results in file_results:
+        for line, col, msg in results:
+            yield filename, line, col, msg
+
+
+def first_failing_file(
+    file_results: Iterable[tuple[str, list[tuple[int, int, str]]]],
+) -> Iterator[tuple[str, int, int, str]]:
+    """
+    The rows of the first of each file's `(filename, results)` that has any, then stop linting by closing
+    `file_results`.
+
+    The files are taken one at a time, so no file after the failing one is linted.
+    """
+    file_results = iter(file_results)
+    try:
+        for filename, results in file_results:
+            if results:
+                yield from file_rows([(filename, results)])
+                return
+    finally:
+        if hasattr(file_results, "close"):
+            file_results.close()
@@ -0,0 +1,218 @@
+"""
+Memory-aware scheduling of files onto worker processes.
+
+Linting materializes every token and AST node of a file, so a file's peak memory is roughly proportional to
+its size. Each file's cost is estimated from its byte size and work is only handed out while the estimated
+memory of everything in flight stays within the budget. Large files go to dedicated workers that exit after
+each file, returning the memory to the OS, while small files are batched to amortize the process overhead.
+"""
+
+# Python imports
+import os
+import resource
+from collections.abc import Container, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+
+# Internal imports
+from flake8_routable import Plugin, ProjectModule, statement_memo_counts
+from flake8_routable.runner import DEFAULT_SKIP_CONFIG, RunStats, SkipConfig, group_by_content, lint_file, results_at
+
+
+# measured peak of tokenizing, parsing and linting, per byte of source
+MEMORY_PER_SOURCE_BYTE = 100
+
+DEFAULT_BATCH_BYTES = 256 * 1024
+DEFAULT_LARGE_FILE_BYTES = 1024 * 1024
+DEFAULT_MEMORY_BUDGET = 2 * 1024 * 1024 * 1024
+
+
+@dataclass
+class Task:
+    filenames: list[str]
+    cost: int
+    is_large: bool
+
+
+@dataclass
+class WorkerStats:
+    files: int = 0
+    peak_rss: int = 0
+
+    # whether the worker was dedicated to a single large file
+    dedicated: bool = False
+
+
+def estimate_cost(size: int) -> int:
+    """Estimated peak memory, in bytes, of linting a file of `size` bytes."""
+    return size * MEMORY_PER_SOURCE_BYTE
+
+
+def _peak_rss() -> int:
+    """Peak resident memory of this process in bytes, `ru_maxrss` is in kilobytes on Linux."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _use_indexes(model_names: frozenset[str] | None, modules: dict[str, ProjectModule] | None) -> None:
+    """Hand the model and module indexes to a worker, which may not have inherited them."""
+    Plugin.model_names = model_names
+    Plugin.modules = modules
+
+
+def _lint_batch(
+    filenames: list[str],
+    root: str | None,
+    skip_config: SkipConfig,
+    slow_files: int,
+    record_durations: bool,
+) -> tuple[int, int, dict[str, int], list[tuple[float, str, str | None]], list[tuple[str, list]], dict[str, float]]:
+    stats = RunStats(slow_files, record_durations)
+    memo_counts = statement_memo_counts()
+    file_results = [
+        (filename, lint_file(filename, root=root, skip_config=skip_config, stats=stats)) for filename in filenames
+    ]
+    stats.add_memo_counts(memo_counts)
+    return os.getpid(), _peak_rss(), stats.counts, stats.slowest(), file_results, stats.durations or {}
+
+
+class MemoryAwareScheduler:
+    """Lints files on worker processes without letting their estimated memory exceed a budget."""
+
+    def __init__(
+        self,
+        processes: int = os.cpu_count() or 1,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        large_file_bytes: int = DEFAULT_LARGE_FILE_BYTES,
+        batch_bytes: int = DEFAULT_BATCH_BYTES,
+        root: str | None = None,
+        skip_config: SkipConfig = DEFAULT_SKIP_CONFIG,
+        slow_files: int = 0,
+        record_durations: bool = False,
+    ) -> None:
+        self.stats = RunStats(slow_files, record_durations)
+        self.worker_stats: dict[int, WorkerStats] = {}
+
+        self._batch_bytes = batch_bytes
+        self._large_file_bytes = large_file_bytes
+        self._memory_budget = memory_budget
+        self._processes = max(processes, 1)
+        self._root = root
+        self._skip_config = skip_config
+
+    def plan(self, filenames: Iterable[str]) -> list[Task]:
+        """Split files into dedicated tasks for large files, largest first, followed by batches of small files."""
+        large, small = [], []
+        for filename in filenames:
+            size = os.path.getsize(os.path.join(self._root, filename) if self._root else filename)
+            (large if size >= self._large_file_bytes else small).append((size, filename))
+
+        tasks = [Task([filename], estimate_cost(size), True) for size, filename in sorted(large, reverse=True)]
+
+        batch, batch_size = [], 0
+        for size, filename in small:
+            batch.append(filename)
+            batch_size += size
+            if batch_size >= self._batch_bytes:
+                tasks.append(Task(batch, estimate_cost(batch_size), False))
+                batch, batch_size = [], 0
+        if batch:
+            tasks.append(Task(batch, estimate_cost(batch_size), False))
+
+        return tasks
+
+    def run(self, filenames: Iterable[str]) -> Iterator[tuple[str, list[tuple[int, int, str]]]]:
+        """
+        Yield `(filename, results)` for every file, in the order the workers finish them.
+
+        Only the first file of each group with the same contents is sent to a worker. The processes are shared out
+        between the dedicated workers and those running batches, see `worker_counts`.
+        """
+        duplicates = {group[0]: group[1:] for _, group in group_by_content(filenames, self._root, self._skip_config)}
+        tasks = self.plan(duplicates)
+        in_flight: dict[Future, Task] = {}
+        in_flight_cost = 0
+
+        workers = self.worker_counts(tasks)
+        worker_options = {"initargs": (Plugin.model_names, Plugin.modules), "initializer": _use_indexes}
+        pools = {}
+        if workers[False]:
+            pools[False] = ProcessPoolExecutor(max_workers=workers[False], **worker_options)
+        if workers[True]:
+            # dedicated workers are replaced after every file so a large file's memory is released
+            pools[True] = ProcessPoolExecutor(max_workers=workers[True], max_tasks_per_child=1, **worker_options)
+        busy = dict.fromkeys(pools, 0)
+        try:
+            while tasks or in_flight:
+                while len(in_flight) < self._processes:
+                    full = {is_large for is_large, count in busy.items() if count == workers[is_large]}
+                    task = self._admit(tasks, in_flight_cost, is_idle=not in_flight, full=full)
+                    if task is None:
+                        break
+                    future = pools[task.is_large].submit(
+                        _lint_batch,
+                        task.filenames,
+                        self._root,
+                        self._skip_config,
+                        self.stats.slow_files,
+                        self.stats.durations is not None,
+                    )
+                    in_flight[future] = task
+                    in_flight_cost += task.cost
+                    busy[task.is_large] += 1
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = in_flight.pop(future)
+                    in_flight_cost -= task.cost
+                    busy[task.is_large] -= 1
+
+                    pid, peak_rss, counts, slowest, file_results, durations = future.result()
+                    self.stats.update(counts)
+                    for seconds, filename, rule in slowest:
+                        self.stats.add_timing(filename, seconds, rule)
+                    for filename, seconds in durations.items():
+                        self.stats.add_duration(filename, seconds)
+                    stats = self.worker_stats.setdefault(pid, WorkerStats(dedicated=task.is_large))
+                    stats.files += len(file_results)
+                    stats.peak_rss = max(stats.peak_rss, peak_rss)
+
+                    for filename, results in file_results:
+                        yield filename, results
+                        for duplicate in duplicates[filename]:
+                            self.stats.add("duplicates")
+                            yield duplicate, results_at(results, duplicate)
+        finally:
+            # a consumer that stops early, such as --fail-fast, does not wait for the tasks in flight
+            for pool in pools.values():
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def worker_counts(self, tasks: list[Task]) -> dict[bool, int]:
+        """
+        How many of the `processes` go to the batch workers and to the dedicated workers, by `is_large`.
+
+        Dedicated workers get at most one process per large file and leave at least one to the batches. Each kind of
+        task that is planned gets a process, so a single process with both kinds becomes two, one of them idle.
+        """
+        large = sum(task.is_large for task in tasks)
+        if large == len(tasks):
+            return {False: 0, True: min(large, self._processes)}
+        dedicated = min(large, max(self._processes - 1, 1))
+        return {False: max(self._processes - dedicated, 1), True: dedicated}
+
+    def _admit(
+        self,
+        tasks: list[Task],
+        in_flight_cost: int,
+        is_idle: bool,
+        full: Container[bool] = (),
+    ) -> Task | None:
+        """
+        Take the first task that fits in the remaining budget, or any task when nothing is running, leaving the tasks
+        of the kinds in `full` whose workers are all busy.
+        """
+        for i, task in enumerate(tasks):
+            if task.is_large in full:
+                continue
+            if is_idle or in_flight_cost + task.cost <= self._memory_budget:
+                return tasks.pop(i)
+        return None
@@ -0,0 +1,115 @@
+"""
+Splitting the files of a run across CI nodes by how long they are expected to take, and ordering them.
+
+Each run can record how long every file took to lint in a timing history. A shard is then chosen by greedy longest
+processing time assignment: files are taken from the most to the least expensive and each goes to the shard with
+the least work so far. Files without history are estimated from their size, at the rate the history has measured
+across all files. Every node must use the same history for the shards to cover each file exactly once.
+
+The history also keeps how many violations each file had, so a run can lint the likely offenders first: files
+with uncommitted or recent changes, and among those the files that had the most violations.
+"""
+
+# Python imports
+import heapq
+import os
+from collections.abc import Iterable, Mapping
+
+# Internal imports
+from flake8_routable.hierarchy import JsonIndex
+
+
+# estimated lint time per byte of source, before any history has been recorded
+DEFAULT_SECONDS_PER_BYTE = 2e-6
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """The `(index, count)` of a `--shard i/N` value, with `i` counting from 1."""
+    index, _, count = value.partition("/")
+    if not (index.isdigit() and count.isdigit() and 1 <= int(index) <= int(count)):
+        raise ValueError(f"{value!r} is not a shard like 1/4")
+    return int(index), int(count)
+
+
+class TimingHistory(JsonIndex):
+    """The seconds each file took to lint and its size at the time, by normalized path."""
+
+    def seconds_per_byte(self) -> float:
+        """The lint time per byte of source across the history."""
+        seconds = sum(entry["seconds"] for entry in self._entries.values())
+        size = sum(entry["size"] for entry in self._entries.values())
+        return seconds / size if seconds and size else DEFAULT_SECONDS_PER_BYTE
+
+    def costs(self, filenames: Iterable[str], root: str | None = None) -> dict[str, float]:
+        """The predicted seconds of each file, its recorded time or an estimate from its size."""
+        seconds_per_byte = self.seconds_per_byte()
+        costs = {}
+        for filename in filenames:
+            entry = self._entries.get(os.path.normpath(filename))
+            if entry is not None:
+                costs[filename] = entry["seconds"]
+            else:
+                costs[filename] = os.path.getsize(os.path.join(root, filename) if root else filename) * seconds_per_byte
+        return costs
+
+    def violations(self, filename: str) -> int:
+        """The violations a file had when it was last linted."""
+        return self._entries.get(os.path.normpath(filename), {}).get("violations", 0)
+
+    def update(
+        self,
+        durations: Mapping[str, float],
+        filenames: Iterable[str],
+        root: str | None = None,
+        violations: Mapping[str, int] | None = None,
+    ) -> None:
+        """Record the `durations` and `violations` of this run and forget the files no longer among `filenames`."""
+        paths = {os.path.normpath(filename): filename for filename in filenames}
+        for filename, seconds in durations.items():
+            path = os.path.normpath(filename)
+            if path in paths:
+                size = os.path.getsize(os.path.join(root, filename) if root else filename)
+                count = violations.get(filename, 0) if violations is not None else self.violations(filename)
+                self._entries[path] = {"seconds": seconds, "size": size, "violations": count}
+        self._entries = {path: entry for path, entry in self._entries.items() if path in paths}
+
+
+def assign_shards(costs: Mapping[str, float], count: int) -> list[list[str]]:
+    """Split files into `count` shards of about the same cost, each listing its files in the order given."""
+    shards = [[] for _ in range(count)]
+    loads = [(0.0, index) for index in range(count)]
+    order = {filename: position for position, filename in enumerate(costs)}
+
+    # ties are broken by name so every node computes the same assignment
+    for filename in sorted(costs, key=lambda filename: (-costs[filename], filename)):
+        load, index = heapq.heappop(loads)
+        shards[index].append(filename)
+        heapq.heappush(loads, (load + costs[filename], index))
+
+    return [sorted(shard, key=order.__getitem__) for shard in shards]
+
+
+def select_shard(
+    filenames: list[str],
+    shard: tuple[int, int],
+    history: TimingHistory,
+    root: str | None = None,
+) -> list[str]:
+    """The files of shard `index` out of `count`, counting from 1."""
+    index, count = shard
+    return assign_shards(history.costs(filenames, root), count)[index - 1]
+
+
+def changed_first(filenames: list[str], ages: Mapping[str, int], history: TimingHistory) -> list[str]:
+    """
+    Files with uncommitted changes first, then those changed by the most recent commits, then the rest.
+
+    `ages` are the files' ages by normalized path from `gitobjects.recently_changed`. Files of the same age are
+    ordered by their violations in `history`, most first, and otherwise keep their order.
+    """
+    oldest = max(ages.values(), default=0) + 1
+
+    def priority(filename: str) -> tuple[int, int]:
+        return ages.get(os.path.normpath(filename), oldest), -history.violations(filename)
+
+    return sorted(filenames, key=priority)
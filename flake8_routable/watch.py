@@ -0,0 +1,129 @@
+"""
+Continuously re-lint a working tree, printing results as JSON lines.
+
+Files are polled by `(mtime, size)` signature, so only modified files are read and re-linted. A change is
+linted once it has been stable for the debounce period, which keeps editors that save in several writes
+from triggering several runs. Files are skipped and linted as by `check`, region by region, so an edit only
+re-lints the regions it changed.
+"""
+
+# Python imports
+import json
+import os
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, TextIO
+
+# Internal imports
+from flake8_routable.regions import RegionLinter
+from flake8_routable.runner import DEFAULT_SKIP_CONFIG, SkipConfig, decode_source, iter_python_files, lint_buffer
+
+
+DEFAULT_DEBOUNCE = 0.3
+DEFAULT_INTERVAL = 1.0
+
+
+@dataclass
+class FileState:
+    signature: tuple[int, int]
+    results: list[tuple[int, int, str]] = field(default_factory=list)
+
+
+def result_to_dict(line: int, col: int, msg: str) -> dict[str, Any]:
+    code, _, message = msg.partition(" ")
+    return {"code": code, "col": col, "line": line, "message": message}
+
+
+class Watcher:
+    """Tracks the Python files under `paths` and re-lints the ones that change."""
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        root: str | None = None,
+        debounce: float = DEFAULT_DEBOUNCE,
+        skip_config: SkipConfig = DEFAULT_SKIP_CONFIG,
+    ) -> None:
+        self.files: dict[str, FileState] = {}
+        self.regions = RegionLinter()
+
+        self._debounce = debounce
+        self._paths = list(paths)
+        self._pending = {}
+        self._primed = False
+        self._root = root
+        self._skip_config = skip_config
+
+    def poll(self, now: float | None = None) -> Iterator[dict[str, Any]]:
+        """Check every file once, yielding an event per file that was re-linted or deleted."""
+        now = time.monotonic() if now is None else now
+        seen = set()
+
+        for filename in iter_python_files(self._paths, root=self._root):
+            seen.add(filename)
+            try:
+                stat = os.stat(self._real_path(filename))
+            except OSError:
+                continue
+
+            signature = (stat.st_mtime_ns, stat.st_size)
+            state = self.files.get(filename)
+            if state is not None and state.signature == signature:
+                self._pending.pop(filename, None)
+                continue
+
+            if self._primed and self._debounce > 0 and not self._is_settled(filename, signature, now):
+                continue
+
+            self._pending.pop(filename, None)
+            event = self._lint(filename, signature)
+            if event is not None:
+                yield event
+
+        self._primed = True
+
+        for filename in self._pending.keys() - seen:
+            del self._pending[filename]
+
+        for filename in self.files.keys() - seen:
+            del self.files[filename]
+            yield {"deleted": True, "filename": filename}
+
+    def run(self, interval: float = DEFAULT_INTERVAL, out: TextIO = sys.stdout) -> None:
+        while True:
+            for event in self.poll():
+                out.write(json.dumps(event) + "\n")
+            out.flush()
+            time.sleep(interval)
+
+    def _is_settled(self, filename: str, signature: tuple[int, int], now: float) -> bool:
+        """Whether this version of the file has stayed unchanged for the debounce period."""
+        pending = self._pending.get(filename)
+        if pending is None or pending[0] != signature:
+            self._pending[filename] = (signature, now)
+            return False
+        return now - pending[1] >= self._debounce
+
+    def _lint(self, filename: str, signature: tuple[int, int]) -> dict[str, Any] | None:
+        try:
+            with open(self._real_path(filename), "rb") as f:
+                source = decode_source(f.read())
+        except OSError:
+            return None
+
+        state = FileState(
+            signature,
+            lint_buffer(source, filename, linter=self.regions.lint, skip_config=self._skip_config),
+        )
+        is_new = filename not in self.files
+        self.files[filename] = state
+
+        if is_new and not state.results:
+            # nothing to tell the listener about a clean file it has never seen
+            return None
+        return {"filename": filename, "results": [result_to_dict(*result) for result in state.results]}
+
+    def _real_path(self, filename: str) -> str:
+        return os.path.join(self._root, filename) if self._root else filename
@@ -0,0 +1,24 @@
+# Python imports
+import ast
+import glob
+import os
+
+# Pip imports
+import pytest
+
+
+TESTS_DIRECTORY = os.path.dirname(__file__)
+
+
+@pytest.fixture(scope="session")
+def snippets():
+    """Every multi-line snippet of the rule tests, each as `(source, filename)` under a model and a migration path."""
+    sources = []
+    for path in sorted(glob.glob(os.path.join(TESTS_DIRECTORY, "test_rou_*.py"))):
+        with open(path) as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and "\n" in node.value:
+                sources.append(node.value)
+
+    return [(source, filename) for source in sources for filename in ("app/models.py", "app/migrations/0001.py")]
@@ -0,0 +1,101 @@
+# Python imports
+import ast
+import io
+import subprocess
+import sys
+import tokenize
+
+# Pip imports
+import pytest
+
+# Internal imports
+from flake8_routable import Plugin, cli
+from flake8_routable.baseline import Baseline, fingerprint
+
+
+LEGACY = 'LIMITS = {"b": 1, "a": 2}\nCOLORS = {"red", "blue"}\n'
+
+SHIFTED = "# Python imports\nimport os\n\n\n" + LEGACY
+
+NEW_VIOLATION = SHIFTED + 'SIZES = {"m", "l"}\n'
+
+
+def plugin_results(source, filename="app/views.py"):
+    lines = source.splitlines(keepends=True)
+    tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+    return [result[:3] for result in Plugin(ast.parse(source), tokens, filename, lines).run()]
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "views.py").write_text(LEGACY)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestFingerprint:
+    def test_ignores_whitespace_and_path_prefix(self):
+        assert fingerprint("ROU104", "./app/views.py", "def  bar():\n") == fingerprint(
+            "ROU104", "app/views.py", "def bar():"
+        )
+
+    def test_differs_by_code_file_and_line(self):
+        key = fingerprint("ROU104", "app/views.py", "def bar():")
+        assert key != fingerprint("ROU105", "app/views.py", "def bar():")
+        assert key != fingerprint("ROU104", "app/urls.py", "def bar():")
+        assert key != fingerprint("ROU104", "app/views.py", "def baz():")
+
+    def test_load_and_write(self, tmp_path):
+        baseline = Baseline(["b", "a"])
+        baseline.write(str(tmp_path / "baseline.txt"))
+
+        assert (tmp_path / "baseline.txt").read_text().splitlines()[1:] == ["a", "b"]
+        assert set(Baseline.load(str(tmp_path / "baseline.txt"))) == {"a", "b"}
+
+
+class TestPlugin:
+    def test_baselined_violations_are_dropped_after_lines_shift(self, project, monkeypatch):
+        rows = [("app/views.py", *result) for result in plugin_results(LEGACY)]
+        assert rows
+        monkeypatch.setattr(Plugin, "baseline", Baseline.from_rows(rows))
+
+        assert plugin_results(SHIFTED) == []
+        assert [result[:2] for result in plugin_results(NEW_VIOLATION)] == [(7, 8)]
+
+    def test_other_files_are_reported(self, project, monkeypatch):
+        rows = [("app/views.py", *result) for result in plugin_results(LEGACY)]
+        monkeypatch.setattr(Plugin, "baseline", Baseline.from_rows(rows))
+
+        assert plugin_results(LEGACY, "app/urls.py") == [result[1:] for result in rows]
+
+
+class TestCli:
+    def test_check_with_baseline(self, project, capsys):
+        assert cli.main(["baseline", "app", "--baseline", "baseline.txt"]) == 0
+        assert cli.main(["check", "app", "--no-daemon", "--baseline", "baseline.txt"]) == 0
+
+        (project / "app" / "views.py").write_text(NEW_VIOLATION)
+        capsys.readouterr()
+        assert cli.main(["check", "app", "--no-daemon", "--baseline", "baseline.txt"]) == 1
+        assert capsys.readouterr().out.count("\n") == 1
+
+    def test_flake8_option(self, project):
+        cli.main(["baseline", "app", "--baseline", "baseline.txt"])
+        (project / "app" / "views.py").write_text(NEW_VIOLATION)
+
+        flake8 = [sys.executable, "-m", "flake8", "--select", "ROU", "app/views.py"]
+        output = subprocess.run([*flake8, "--routable-baseline", "baseline.txt"], capture_output=True, text=True).stdout
+        assert output.splitlines() == ["app/views.py:7:9: ROU103 Object does not have attributes in order"]
+
+    def test_prune(self, project):
+        cli.main(["baseline", "app", "--baseline", "baseline.txt"])
+        generated = Baseline.load("baseline.txt")
+
+        (project / "app" / "views.py").write_text('LIMITS = {"b": 1, "a": 2}\nCOLORS = {"blue", "red"}\n')
+        cli.main(["baseline", "app", "--baseline", "baseline.txt", "--prune"])
+
+        pruned = Baseline.load("baseline.txt")
+        assert len(generated) == 3
+        assert len(pruned) == 2
+        assert set(pruned) <= set(generated)
@@ -0,0 +1,120 @@
+# Python imports
+import ast
+import io
+import subprocess
+import sys
+import tokenize
+
+# Pip imports
+import pytest
+from flake8.options.parse_args import parse_args
+
+# Internal imports
+from flake8_routable import ALL_CODES, AstPlugin, Plugin, TokenPlugin, check_physical_line
+from flake8_routable.runner import lint_source
+
+
+SOURCE = (
+    "from .models import Invoice\n"
+    'LIMITS = {"b": 1, "a": 2}\n'
+    "\n"
+    "\n"
+    "def pay(invoice):\n"
+    "    invoice.save()\n"
+    "    operations = [migrations.RenameField(a, b)]\n"
+    '    return """\n'
+    "  migrations.RenameField\n"
+    '"""\n'
+)
+
+
+def checker_results(source, filename="app/views.py"):
+    tree = ast.parse(source)
+    lines = source.splitlines(keepends=True)
+    tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+    results = [*AstPlugin(tree, filename, lines).run(), *TokenPlugin(tree, tokens, filename, lines).run()]
+    for line_number, physical_line in enumerate(lines, start=1):
+        result = check_physical_line(physical_line, line_number, lines, filename)
+        if result is not None:
+            results.append((line_number, *result, check_physical_line))
+    return sorted(result[:3] for result in results)
+
+
+@pytest.fixture
+def options(monkeypatch):
+    for name in ("baseline", "deselected_codes", "model_names", "modules", "skip_config"):
+        monkeypatch.setattr(Plugin, name, getattr(Plugin, name))
+
+    def parse(*args):
+        return parse_args([*args, "file.py"])[1]
+
+    return parse
+
+
+class TestCheckers:
+    def test_same_results_as_the_plugin(self):
+        assert checker_results(SOURCE) == lint_source(SOURCE, "app/views.py")
+
+    def test_rename_on_each_physical_line(self):
+        assert [result for result in lint_source(SOURCE, "file.py") if "ROU109" in result[2]] == [
+            (7, 4, "ROU109 Disallow rename migrations"),
+            (9, 2, "ROU109 Disallow rename migrations"),
+        ]
+
+    def test_one_walk_of_the_tree(self, monkeypatch):
+        walks = []
+        visit_tree = Plugin.visit_tree
+        monkeypatch.setattr(Plugin, "visit_tree", lambda self, *args: walks.append(self) or visit_tree(self, *args))
+
+        checker_results(SOURCE)
+        assert len(walks) == 1
+
+    def test_deselected_checker_does_not_read_tokens(self, monkeypatch):
+        monkeypatch.setattr(Plugin, "deselected_codes", ALL_CODES - {"ROU103"})
+        pulled = []
+
+        def tokens():
+            pulled.append(True)
+            yield from tokenize.generate_tokens(io.StringIO(SOURCE).readline)
+
+        assert list(TokenPlugin(ast.parse(SOURCE), tokens(), "file.py").run()) == []
+        assert not pulled
+        assert [result[2] for result in AstPlugin(ast.parse(SOURCE), "file.py").run()] == [
+            "ROU103 Object does not have attributes in order"
+        ]
+
+
+class TestSelect:
+    def test_deselected_codes(self, options):
+        options("--select", "ROU103,ROU11")
+        assert sorted(ALL_CODES - Plugin.deselected_codes) == ["ROU103", *(f"ROU11{digit}" for digit in range(8))]
+
+        options("--extend-ignore", "ROU10")
+        assert Plugin.deselected_codes == {f"ROU10{digit}" for digit in range(10)}
+
+    def test_flake8(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "views.py").write_text(SOURCE)
+
+        flake8 = [sys.executable, "-m", "flake8", "views.py", "--select"]
+        output = subprocess.run([*flake8, "ROU"], capture_output=True, text=True).stdout
+        assert [line.split(": ", 1)[1] for line in output.splitlines()] == [
+            message for _, _, message in lint_source(SOURCE, "views.py")
+        ]
+
+        output = subprocess.run([*flake8, "ROU103,ROU109"], capture_output=True, text=True).stdout
+        assert output.splitlines() == [
+            "views.py:2:10: ROU103 Object does not have attributes in order",
+            "views.py:7:5: ROU109 Disallow rename migrations",
+            "views.py:9:3: ROU109 Disallow rename migrations",
+        ]
+
+    @pytest.mark.parametrize("select", ["ROU", "ROU103,ROU117"])
+    def test_partly_checked_once(self, tmp_path, monkeypatch, select):
+        monkeypatch.chdir(tmp_path)
+        # both checkers have expensive rules to skip, ROU103 and ROU114
+        (tmp_path / "views.py").write_text(f"{SOURCE}\n\nclass Invoice(Model):\n    total = IntegerField(default=0)\n")
+
+        flake8 = [sys.executable, "-m", "flake8", "views.py", "--select", select, "--routable-time-budget", "0"]
+        output = subprocess.run(flake8, capture_output=True, text=True).stdout
+        assert output.count("ROU117") == 1
@@ -0,0 +1,100 @@
+# Python imports
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+# Pip imports
+import pytest
+
+# Internal imports
+from flake8_routable import SkipConfig, daemon
+from flake8_routable.runner import lint_buffer, lint_source
+
+
+SOURCE = "# Setup\n\n\nUser = get_user_model()\nfrom foo.tests import bar\n"
+
+
+@contextmanager
+def fake_daemon(socket_path, reply, delay=0.0):
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen()
+
+    def answer():
+        connection, _ = listener.accept()
+        with connection, connection.makefile("rb") as request_file:
+            request_file.readline()
+            time.sleep(delay)
+            connection.sendall(reply)
+
+    thread = threading.Thread(target=answer, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        thread.join()
+        listener.close()
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = daemon.LintServer(str(tmp_path / "rou.sock"))
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+class TestDaemon:
+    def test_lint_buffer(self, server):
+        results = daemon.request({"filename": "file.py", "source": SOURCE}, socket_path=server.server_address)
+        assert results == [("file.py", *result) for result in lint_source(SOURCE, "file.py")]
+
+    def test_lint_paths_uses_cache(self, server, tmp_path):
+        (tmp_path / "module.py").write_text(SOURCE)
+        payload = {"cwd": str(tmp_path), "paths": ["module.py"]}
+
+        first = daemon.request(payload, socket_path=server.server_address)
+        second = daemon.request(payload, socket_path=server.server_address)
+
+        assert first == second == [("module.py", *result) for result in lint_source(SOURCE, "module.py")]
+        assert server.cache.hits == 1
+
+    def test_missing_path_is_an_error(self, server, tmp_path):
+        with pytest.raises(RuntimeError, match="FileNotFoundError"):
+            daemon.request({"cwd": str(tmp_path), "paths": ["missing.py"]}, socket_path=server.server_address)
+
+    def test_failed_request_is_answered(self, server, monkeypatch):
+        monkeypatch.setattr(server, "dispatch", lambda request: 1 / 0)
+        with pytest.raises(RuntimeError, match="ZeroDivisionError"):
+            daemon.lint(source=SOURCE, filename="file.py", socket_path=server.server_address)
+
+    def test_lint_with_client_skip_config(self, server):
+        skip_config = SkipConfig(max_lines=1)
+        results = daemon.lint(
+            source=SOURCE, filename="file.py", skip_config=skip_config, socket_path=server.server_address
+        )
+
+        assert results == [("file.py", *result) for result in lint_buffer(SOURCE, "file.py", skip_config=skip_config)]
+        assert results != [("file.py", *result) for result in lint_source(SOURCE, "file.py")]
+        assert server.cache.misses == 0
+
+    def test_fallback_on_malformed_reply(self, tmp_path):
+        socket_path = str(tmp_path / "rou.sock")
+        with fake_daemon(socket_path, reply=b""):
+            results = daemon.lint(source=SOURCE, filename="file.py", socket_path=socket_path)
+        assert results == [("file.py", *result) for result in lint_source(SOURCE, "file.py")]
+
+    def test_slow_reply_is_awaited(self, tmp_path):
+        socket_path = str(tmp_path / "rou.sock")
+        with fake_daemon(socket_path, reply=b'{"results": [["file.py", 1, 0, "ROU110 slow"]]}\n', delay=0.2):
+            results = daemon.request({"filename": "file.py", "source": SOURCE}, socket_path, connect_timeout=0.05)
+        assert results == [("file.py", 1, 0, "ROU110 slow")]
+
+    def test_fallback_without_daemon(self, tmp_path):
+        results = daemon.lint(source=SOURCE, filename="file.py", socket_path=str(tmp_path / "none.sock"))
+        assert results == [("file.py", *result) for result in lint_source(SOURCE, "file.py")]
+        assert not daemon.is_running(str(tmp_path / "none.sock"))
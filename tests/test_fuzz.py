@@ -0,0 +1,90 @@
+# Python imports
+import ast
+import io
+import os
+import random
+import tokenize
+
+# Pip imports
+import pytest
+
+# Internal imports
+from flake8_routable import Visitor, cli
+from flake8_routable.fuzz import FILENAMES, compare, default_seed_files, fuzz, mutate, parses, seed_snippets
+from flake8_routable.reference import reference_errors
+from flake8_routable.runner import lint_source
+
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+
+
+def seeds():
+    return seed_snippets(os.path.join(ROOT, path) for path in default_seed_files())
+
+
+class TestFuzz:
+    def test_seeds(self, monkeypatch):
+        monkeypatch.chdir(ROOT)
+        assert len(seeds()) > 50
+        assert all(parses(seed) for seed in seeds())
+
+    def test_engines_agree(self, monkeypatch):
+        monkeypatch.chdir(ROOT)
+        result = fuzz(seeds(), seconds=60, seed=0, max_sources=len(seeds()) + 100)
+
+        assert result.mismatch is None
+        assert result.checked == len(seeds()) + 100
+
+    def test_mutations_are_repeatable_and_parse(self, monkeypatch):
+        monkeypatch.chdir(ROOT)
+        first = [mutate(random.Random(7), seeds()) for _ in range(20)]
+        assert first == [mutate(random.Random(7), seeds()) for _ in range(20)]
+        assert all(parses(source) for source in first)
+
+    def test_finds_a_difference(self, monkeypatch):
+        monkeypatch.chdir(ROOT)
+        monkeypatch.setattr(Visitor, "_is_ordered", lambda self, values: True)
+
+        mismatch = fuzz(seeds(), seconds=60, seed=0).mismatch
+        assert mismatch is not None
+        assert mismatch.filename == FILENAMES[0]
+        assert all(code == "ROU103" for _, _, code in set(mismatch.expected) - set(mismatch.actual))
+        assert "only reference:" in mismatch.describe()
+
+    @pytest.mark.parametrize(
+        "source",
+        [
+            "def foo(): pass\n# not a docstring\n",
+            "class Migration:\n    operations = [migrations.RenameField(a, b)]\n",
+            'message = "call instance.save() when done"\n',
+            "from app.decorators import cached as shared_task\n\n\n@shared_task\ndef method(a):\n    pass\n",
+        ],
+    )
+    def test_known_differences(self, source):
+        file_tokens = tokenize.generate_tokens(io.StringIO(source).readline)
+        reference = sorted(reference_errors(ast.parse(source), file_tokens, "app/models.py"))
+
+        assert reference != lint_source(source, "app/models.py")
+        assert compare(source, "app/models.py") is None
+
+    def test_exceptions_are_compared(self, monkeypatch):
+        def fail(self, node):
+            raise RuntimeError("broken")
+
+        monkeypatch.setattr(Visitor, "visit_Dict", fail)
+        mismatch = compare('LIMITS = {"a": 1}\n', "app/views.py")
+        assert (mismatch.expected, mismatch.actual) == ([], "RuntimeError")
+
+
+class TestCli:
+    def test_fuzz(self, monkeypatch, capsys):
+        monkeypatch.chdir(ROOT)
+        assert cli.main(["fuzz", "--seconds", "0.5", "--seed", "3"]) == 0
+        assert "from seed 3" in capsys.readouterr().err
+
+    def test_fuzz_reports_the_first_mismatch(self, monkeypatch, capsys):
+        monkeypatch.chdir(ROOT)
+        monkeypatch.setattr(Visitor, "_is_ordered", lambda self, values: True)
+
+        assert cli.main(["fuzz", "--seconds", "60", "--seed", "3"]) == 1
+        assert "only reference:" in capsys.readouterr().out
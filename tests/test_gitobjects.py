@@ -0,0 +1,150 @@
+# Python imports
+import os
+import subprocess
+
+# Pip imports
+import pytest
+
+# Internal imports
+from flake8_routable import cli, runner
+from flake8_routable.baseline import Baseline
+from flake8_routable.cache import ResultCache, blob_id
+from flake8_routable.gitobjects import BlobReader, clean_blob_ids, lint_revision, python_blobs, recently_changed
+
+
+FIELD = "class Invoice(Model):\n    field_a = models.BooleanField(default=False)\n"
+
+UNSORTED = 'LIMITS = {"b": 1, "a": 2}\n'
+
+
+def git(*args):
+    return subprocess.run(["git", *args], capture_output=True, check=True, text=True).stdout
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    git("init", "-q")
+    git("config", "user.email", "dev@example.com")
+    git("config", "user.name", "Dev")
+
+    for name, contents in (
+        ("app/models.py", FIELD),
+        ("app/migrations/0001_initial.py", FIELD),
+        ("app/views.py", UNSORTED),
+        ("node_modules/app/views.py", UNSORTED),
+        ("README.md", "# app\n"),
+    ):
+        os.makedirs(os.path.dirname(name) or ".", exist_ok=True)
+        with open(name, "w") as f:
+            f.write(contents)
+    git("add", "-A")
+    git("commit", "-q", "-m", "Initial")
+    return tmp_path
+
+
+class TestGitObjects:
+    def test_python_blobs(self, repository):
+        blobs = python_blobs("HEAD")
+        assert [filename for filename, _ in blobs] == [
+            "./app/migrations/0001_initial.py",
+            "./app/models.py",
+            "./app/views.py",
+        ]
+        assert blobs[0][1] == blobs[1][1] == git("rev-parse", "HEAD:app/models.py").strip()
+
+    def test_reads_the_commit_not_the_checkout(self, repository):
+        (repository / "app" / "views.py").write_text("LIMITS = {}\n")
+        os.remove(repository / "app" / "models.py")
+
+        assert list(lint_revision("HEAD")) == [
+            ("./app/models.py", 2, 21, "ROU114 Field default exists but db_default does not"),
+            ("./app/views.py", 1, 9, "ROU103 Object does not have attributes in order"),
+        ]
+        assert not (repository / "app" / "models.py").exists()
+
+    def test_staged(self, repository):
+        (repository / "app" / "views.py").write_text("LIMITS = {}\n")
+        assert [row[0] for row in lint_revision(None)] == ["./app/models.py", "./app/views.py"]
+
+        git("add", "app/views.py")
+        assert [row[0] for row in lint_revision(None)] == ["./app/models.py"]
+
+    def test_paths(self, repository):
+        assert [row[0] for row in lint_revision("HEAD", ["app/views.py"])] == ["./app/views.py"]
+
+    def test_baseline_matches_the_blob(self, repository):
+        baseline = Baseline.from_rows(lint_revision("HEAD"), root=None)
+        (repository / "app" / "views.py").write_text("\n\n" + UNSORTED)
+
+        assert list(lint_revision("HEAD", baseline=baseline)) == []
+
+    def test_recently_changed(self, repository):
+        (repository / "app" / "urls.py").write_text("")
+        git("add", "app/urls.py")
+        git("commit", "-q", "-m", "Urls")
+        (repository / "app" / "views.py").write_text("LIMITS = {}\n")
+        (repository / "app" / "forms.py").write_text("")
+
+        ages = recently_changed()
+        assert ages["app/views.py"] == ages["app/forms.py"] == 0
+        assert ages["app/urls.py"] == 1
+        assert ages["app/models.py"] == 2
+        assert recently_changed(str(repository / "app")).keys() >= {"models.py", "urls.py"}
+
+    def test_missing_blob(self, repository):
+        with BlobReader() as reader, pytest.raises(LookupError):
+            reader.read("0" * 40)
+
+    def test_cli(self, repository, capsys):
+        assert cli.main(["check", "--ref", "HEAD", "--no-daemon"]) == 1
+        assert capsys.readouterr().out.splitlines() == [
+            "./app/models.py:2:22: ROU114 Field default exists but db_default does not",
+            "./app/views.py:1:10: ROU103 Object does not have attributes in order",
+        ]
+
+    def test_cli_does_not_shard_the_commit(self, repository):
+        with pytest.raises(SystemExit):
+            cli.main(["check", "--ref", "HEAD", "--shard", "1/2"])
+
+
+class TestBlobIdCache:
+    def test_blob_id_is_gits(self, repository):
+        assert blob_id(UNSORTED.encode()) == git("rev-parse", "HEAD:app/views.py").strip()
+
+    def test_clean_blob_ids(self, repository):
+        (repository / "app" / "views.py").write_text("LIMITS = {}\n")
+        (repository / "app" / "urls.py").write_text("")
+
+        assert sorted(clean_blob_ids()) == [
+            "README.md",
+            "app/migrations/0001_initial.py",
+            "app/models.py",
+            "node_modules/app/views.py",
+        ]
+
+    def test_outside_a_repository(self, tmp_path):
+        assert clean_blob_ids(str(tmp_path)) == {}
+
+    def test_clean_files_are_not_read(self, repository, monkeypatch):
+        cache = ResultCache()
+        expected = list(runner.lint_paths(["."], cache=cache))
+        (repository / "app" / "views.py").write_text("\n" + UNSORTED)
+
+        opened = []
+        monkeypatch.setattr(
+            runner, "open", lambda filename, *args: opened.append(filename) or open(filename, *args), raising=False
+        )
+        rows = list(runner.lint_paths(["."], cache=cache, blob_ids=clean_blob_ids()))
+
+        assert opened == ["./app/views.py", "./app/views.py"]
+        assert rows == [
+            (filename, line + (filename == "./app/views.py"), col, msg) for filename, line, col, msg in expected
+        ]
+
+    def test_cli_cache(self, repository, capsys):
+        for _ in range(2):
+            assert cli.main(["check", "--no-daemon", "--cache", ".cache/results.json"]) == 1
+        settings = cli.cache_settings(cli.build_parser().parse_args(["check"]))
+        # the migration shares its blob with the models file
+        assert len(ResultCache.load(".cache/results.json", settings)) == 2
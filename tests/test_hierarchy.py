@@ -0,0 +1,236 @@
+# Python imports
+import os
+import subprocess
+import sys
+
+# Pip imports
+import pytest
+
+# Internal imports
+from flake8_routable import Plugin
+from flake8_routable.hierarchy import ModelIndex, ModuleIndex, is_models_file, load_model_names, load_modules
+from flake8_routable.regions import RegionLinter
+from flake8_routable.runner import lint_source
+from tests.helpers import results
+
+
+BASE_MODELS = (
+    "from django.db import models\n"
+    "\n"
+    "\n"
+    "class BaseModel(models.Model):\n"
+    "    class Meta:\n"
+    "        abstract = True\n"
+    "\n"
+    "\n"
+    "class TimestampMixin(BaseModel):\n"
+    "    class Meta:\n"
+    "        abstract = True\n"
+)
+
+INVOICE_MODELS = (
+    "from common.models.base import TimestampMixin\n"
+    "\n"
+    "\n"
+    "class Document(TimestampMixin):\n"
+    "    pass\n"
+    "\n"
+    "\n"
+    "class NotAModel:\n"
+    "    pass\n"
+)
+
+FILE_WITH_MODELS = (
+    "class Invoice(Document):\n"
+    "    field_a = models.BooleanField(default=False)\n"
+    "\n"
+    "\n"
+    "class BaseSerializer(serializers.Serializer):\n"
+    "    field_a = serializers.BooleanField(default=False)\n"
+    "\n"
+    "\n"
+    "class Payment(Invoice):\n"
+    "    field_b = models.BooleanField(default=False)\n"
+)
+
+
+IMPORTS = (
+    "from app.models.base import BaseModel\n"
+    "from app.tests.factories import InvoiceFactory\n"
+    "from contests.views import index\n"
+    "from django.db.models.functions import Now\n"
+)
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / "common" / "models").mkdir(parents=True)
+    (tmp_path / "common" / "models" / "base.py").write_text(BASE_MODELS)
+    (tmp_path / "invoices").mkdir()
+    (tmp_path / "invoices" / "models.py").write_text(INVOICE_MODELS)
+    (tmp_path / "invoices" / "views.py").write_text("class Invoice(Document):\n    pass\n")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def model_names(project, monkeypatch):
+    monkeypatch.setattr(Plugin, "model_names", load_model_names(".cache/models.json"))
+
+
+class TestModelIndex:
+    def test_is_models_file(self):
+        assert is_models_file("./invoices/models.py")
+        assert is_models_file("common/models/base.py")
+        assert not is_models_file("invoices/views.py")
+        assert not is_models_file("models_test.py")
+
+    def test_model_names(self, project):
+        index = ModelIndex()
+        index.update(["./common/models/base.py", "./invoices/models.py", "./invoices/views.py"])
+
+        assert len(index) == 2
+        assert index.model_names() == {"BaseModel", "Document", "Model", "TimestampMixin"}
+
+    def test_update_only_parses_changed_files(self, project):
+        assert load_model_names(".cache/models.json") == {"BaseModel", "Document", "Model", "TimestampMixin"}
+
+        index = ModelIndex.load(".cache/models.json")
+        index.update(["./common/models/base.py", "./invoices/models.py"])
+        assert index.parsed == 0
+
+        (project / "invoices" / "models.py").write_text(INVOICE_MODELS + "\n\nclass Receipt(Document):\n    pass\n")
+        index.update(["./common/models/base.py", "./invoices/models.py"])
+        assert index.parsed == 1
+        assert "Receipt" in index.model_names()
+
+        os.remove(project / "invoices" / "models.py")
+        index.update(["./common/models/base.py"])
+        assert index.model_names() == {"BaseModel", "Model", "TimestampMixin"}
+
+    def test_load_unreadable_index(self, project):
+        (project / ".cache").mkdir()
+        (project / ".cache" / "models.json").write_text("{")
+        assert len(ModelIndex.load(".cache/models.json")) == 0
+
+
+@pytest.fixture
+def package_tree(tmp_path, monkeypatch):
+    for name in ("app/__init__.py", "app/models/__init__.py", "app/models/base.py", "app/tests/factories.py"):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("")
+    (tmp_path / "contests").mkdir()
+    (tmp_path / "contests" / "views.py").write_text("")
+    (tmp_path / "node_modules" / "app").mkdir(parents=True)
+    (tmp_path / "node_modules" / "app" / "views.py").write_text("")
+    (tmp_path / ".cache").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def modules(package_tree, monkeypatch):
+    monkeypatch.setattr(Plugin, "modules", load_modules(".cache/modules.json"))
+
+
+class TestModuleIndex:
+    def test_modules(self, package_tree):
+        index = ModuleIndex()
+        index.update()
+
+        modules = index.modules()
+        assert sorted(modules) == ["app", "app.models", "app.models.base", "app.tests.factories", "contests.views"]
+        assert modules["app.models"].is_package
+        assert not modules["app.models"].is_models_submodule
+        assert modules["app.models.base"].is_models_submodule
+        assert modules["app.tests.factories"].is_test
+        assert not modules["contests.views"].is_test
+
+    def test_update_only_lists_changed_directories(self, package_tree):
+        load_modules(".cache/modules.json")
+
+        index = ModuleIndex.load(".cache/modules.json")
+        index.update()
+        assert index.listed == 0
+
+        (package_tree / "contests" / "urls.py").write_text("")
+        index.update()
+        assert index.listed == 1
+        assert "contests.urls" in index.modules()
+
+    def test_module_roots(self, package_tree):
+        (package_tree / "src" / "billing" / "tests").mkdir(parents=True)
+        (package_tree / "src" / "billing" / "tests" / "factories.py").write_text("")
+
+        modules = load_modules(".cache/modules.json", ["src"])
+
+        assert sorted(modules) == ["billing.tests.factories"]
+        assert modules["billing.tests.factories"].path == os.path.join("src", "billing", "tests", "factories.py")
+        assert modules["billing.tests.factories"].is_test
+
+    def test_flake8_module_roots(self, package_tree):
+        (package_tree / "src" / "billing" / "tests").mkdir(parents=True)
+        (package_tree / "src" / "billing" / "tests" / "factories.py").write_text("")
+        (package_tree / "imports.py").write_text("from billing.tests.factories import InvoiceFactory\n")
+        flake8 = [sys.executable, "-m", "flake8", "--select", "ROU", "--routable-module-index", ".cache/modules.json"]
+
+        # named from the current directory the module is `src.billing.tests.factories`, which nothing imports
+        output = subprocess.run([*flake8, "imports.py"], capture_output=True, text=True).stdout
+        assert output == ""
+
+        output = subprocess.run(
+            [*flake8, "--routable-module-roots", "src", "imports.py"], capture_output=True, text=True
+        )
+        assert output.stdout.splitlines() == ["imports.py:1:1: ROU101 Import from a tests directory"]
+
+
+class TestImportsWithIndex:
+    def test_imports_are_resolved(self, modules):
+        assert results(IMPORTS) == {
+            "1:0: ROU108 Import from model module instead of sub-packages",
+            "2:0: ROU101 Import from a tests directory",
+        }
+
+    def test_flake8_option(self, package_tree):
+        (package_tree / "imports.py").write_text(IMPORTS)
+        flake8 = [sys.executable, "-m", "flake8", "--select", "ROU", "--routable-module-index", ".cache/modules.json"]
+        output = subprocess.run([*flake8, "imports.py"], capture_output=True, text=True).stdout
+        assert output.splitlines() == [
+            "imports.py:1:1: ROU108 Import from model module instead of sub-packages",
+            "imports.py:2:1: ROU101 Import from a tests directory",
+        ]
+
+    def test_guessed_without_index(self):
+        assert results(IMPORTS) == {
+            "1:0: ROU108 Import from model module instead of sub-packages",
+            "2:0: ROU101 Import from a tests directory",
+            "3:0: ROU101 Import from a tests directory",
+            "4:0: ROU108 Import from model module instead of sub-packages",
+        }
+
+
+class TestModelFieldsWithIndex:
+    def test_only_models_are_checked(self, model_names):
+        assert results(FILE_WITH_MODELS) == {
+            "10:21: ROU114 Field default exists but db_default does not",
+            "2:21: ROU114 Field default exists but db_default does not",
+        }
+
+    def test_guessed_without_index(self):
+        assert results(FILE_WITH_MODELS) == {
+            "10:21: ROU114 Field default exists but db_default does not",
+            "6:26: ROU114 Field default exists but db_default does not",
+        }
+
+    @pytest.mark.parametrize("select", ["ROU", "ROU114"])
+    def test_flake8_option(self, project, select):
+        (project / "invoices" / "fields.py").write_text(FILE_WITH_MODELS)
+        flake8 = [sys.executable, "-m", "flake8", "--select", select, "--routable-model-index", ".cache/models.json"]
+        output = subprocess.run([*flake8, "invoices/fields.py"], capture_output=True, text=True).stdout
+        assert output.splitlines() == [
+            "invoices/fields.py:2:22: ROU114 Field default exists but db_default does not",
+            "invoices/fields.py:10:22: ROU114 Field default exists but db_default does not",
+        ]
+
+    def test_region_linter(self, model_names):
+        assert RegionLinter().lint(FILE_WITH_MODELS, "file.py") == lint_source(FILE_WITH_MODELS, "file.py")
@@ -0,0 +1,59 @@
+# Python imports
+import json
+
+# Pip imports
+import pytest
+
+# Internal imports
+from flake8_routable import FileTokenHelper, cli, membench
+from flake8_routable.corpus import dict_keys, model_fields
+from flake8_routable.membench import TREE_WALK, benchmark, handler_groups, summarize
+
+
+SOURCES = (
+    ("dict_keys", "app/settings.py", dict_keys(1)),
+    ("model_fields", "app/models.py", model_fields(1)),
+)
+
+
+@pytest.fixture(scope="module")
+def results():
+    return benchmark(SOURCES)
+
+
+class TestMemoryBenchmark:
+    def test_every_rule_on_every_source(self, results):
+        assert len(results) == len(SOURCES) * (1 + len(handler_groups()) + len(FileTokenHelper.RULES))
+        assert {result.source for result in results} == {"dict_keys", "model_fields"}
+        assert all(result.peak >= result.retained >= 0 for result in results)
+
+    def test_rules_are_measured_alone(self, results):
+        results = {(result.rule, result.source): result for result in results}
+
+        assert "visit_Dict/visit_Set ROU103" in dict(handler_groups())
+        # comparing the keys of the dict takes more than walking the tree
+        assert results["visit_Dict/visit_Set ROU103", "dict_keys"].peak > results[TREE_WALK, "dict_keys"].peak
+        # there are no fields outside a model
+        fields = "model_field_definitions ROU114/ROU115/ROU116"
+        assert results[fields, "model_fields"].peak > results[fields, "dict_keys"].peak
+
+    def test_summary(self, results):
+        summary = summarize(results)
+
+        assert len(summary) == 1 + len(handler_groups()) + len(FileTokenHelper.RULES)
+        assert summary == sorted(summary, key=lambda row: -row["peak_per_mb"])
+        assert summary[0]["peak_source"] in ("dict_keys", "model_fields")
+
+
+class TestCli:
+    def test_benchmark(self, results, monkeypatch, capsys):
+        monkeypatch.setattr(membench, "corpus", lambda scale: SOURCES)
+
+        assert cli.main(["benchmark"]) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0].split() == ["rule", "peak", "KB/MB", "retained", "KB/MB", "peak", "source"]
+        assert len(lines) == 1 + len(summarize(results))
+
+        assert cli.main(["benchmark", "--json"]) == 0
+        rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert sorted(rows[0]) == ["peak", "retained", "rule", "source", "source_bytes"]
@@ -0,0 +1,87 @@
+# Internal imports
+from flake8_routable import STATEMENT_MEMOS, UNDEFINED, StatementMemo
+from flake8_routable.runner import RunStats, lint_paths, lint_source
+
+
+MODELS = (
+    "class Invoice(BaseModel):\n"
+    "    id = models.UUIDField(db_index=True, default=uuid.uuid4, editable=False, primary_key=True)\n"
+    "    pk = models.UUIDField(db_index=True, default=uuid.uuid4, editable=False, primary_key=True)\n"
+    "    name = models.CharField(default='', null=True)\n"
+    "    name = models.CharField(default='', null=True)\n"
+    "    a = models.IntegerField(default=0); b = models.IntegerField(db_default=0, default=0)\n"
+    "    total = models.IntegerField(\n"
+    "        default=0,\n"
+    "    )\n"
+    "\n"
+    "    def save(self):\n"
+    "        self.invoice.save()\n"
+    "        self.invoice.save()\n"
+    "        self.invoice.save()  # not a model\n"
+    "        FeatureFlag.objects.create(name='a')\n"
+    "        FeatureFlag.objects.create(name='a')\n"
+)
+
+
+def clear_memos():
+    for memo in STATEMENT_MEMOS.values():
+        memo._entries.clear()
+
+
+class TestStatementMemo:
+    def test_hits_and_misses(self):
+        memo = StatementMemo()
+        assert memo.get("x = 1") is UNDEFINED
+        memo.set("x = 1", True)
+
+        assert memo.get("x = 1") is True
+        assert (memo.hits, memo.misses) == (1, 1)
+
+    def test_starts_over_when_full(self):
+        memo = StatementMemo(max_entries=2)
+        for text in ("a", "b", "c"):
+            memo.set(text, True)
+        assert memo.get("c") is True and len(memo._entries) == 1
+
+
+class TestMemoizedRules:
+    def test_same_results_as_without_memo(self):
+        clear_memos()
+        expected = lint_source(MODELS, "app/models.py")
+        assert [(line, msg.split(" ", 1)[0]) for line, _, msg in expected] == [
+            (3, "ROU114"),
+            (4, "ROU114"),
+            (4, "ROU116"),
+            (5, "ROU114"),
+            (5, "ROU116"),
+            (6, "ROU114"),
+            (7, "ROU114"),
+            (12, "ROU110"),
+            (13, "ROU110"),
+            (15, "ROU111"),
+            (16, "ROU111"),
+        ]
+
+        for _ in range(2):
+            assert lint_source(MODELS, "app/models.py") == expected
+            clear_memos()
+
+    def test_repeated_statements_hit_the_memo(self):
+        clear_memos()
+        lint_source(MODELS, "app/models.py")
+        memo = STATEMENT_MEMOS["model_field_definitions"]
+        hits = memo.hits
+
+        lint_source(MODELS.replace("    ", "\t"), "app/models.py")
+
+        # every single-line field signature is remembered, whatever its indentation
+        assert memo.hits - hits == 6
+
+    def test_hit_rate_in_stats(self, tmp_path):
+        (tmp_path / "models.py").write_text(MODELS)
+        stats = RunStats()
+
+        list(lint_paths(["models.py"], root=str(tmp_path), stats=stats))
+
+        assert stats.counts["memo hits"] > 0 and stats.counts["memo misses"] >= 0
+        assert "memo hit rate: " in stats.summary()
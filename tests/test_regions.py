@@ -0,0 +1,65 @@
+# Python imports
+import ast
+
+# Pip imports
+import pytest
+
+# Internal imports
+from flake8_routable.regions import RegionLinter, split_regions
+from flake8_routable.runner import lint_source
+from tests import test_rou_104
+
+
+MODELS = (
+    "from django.db import models\n"
+    "\n"
+    "\n"
+    "class Parent(BaseModel):\n"
+    "    name = models.CharField(default='')\n"
+    "\n"
+    "\n"
+    "class Child(Parent):\n"
+    "    age = models.IntegerField(default=0)\n"
+    "\n"
+    "\n"
+    "B = 1\n"
+    "A = 2\n"
+)
+
+
+def regions_of(source):
+    return [(region.start, region.end) for region in split_regions(source.splitlines(keepends=True), ast.parse(source))]
+
+
+class TestRegions:
+    def test_split_regions(self):
+        assert regions_of(MODELS) == [(1, 1), (2, 5), (6, 9), (10, 13)]
+
+    def test_adjacent_statements_share_a_region(self):
+        assert regions_of("def foo(): pass\n# comment\n\n\nx = 1\n") == [(1, 5)]
+
+    def test_comments_after_a_block_share_its_region(self):
+        assert regions_of("class Foo:\n    x = 1\n\n# comment\n\n\ny = 1\n") == [(1, 7)]
+        assert regions_of("x = 1\n\n# comment\n\n\ny = 1\n") == [(1, 1), (2, 6)]
+
+    @pytest.mark.parametrize(
+        "source",
+        (
+            MODELS,
+            test_rou_104.TestROU104.BLANK_LINES_BEFORE_DEDENT_SECTION,
+            test_rou_104.TestROU104.BLANK_LINES_BEFORE_DEDENT_STATEMENT,
+            "class Foo:\n    x = 1\n# Setup\n\n\nUser = get_user_model()\n",
+            "from celery import shared_task as task\n\n\n@task\ndef foo(priority):\n    pass\n",
+        ),
+    )
+    def test_same_results_as_whole_file(self, source):
+        assert RegionLinter().lint(source, "app/models.py") == lint_source(source, "app/models.py")
+
+    def test_only_changed_regions_are_relinted(self):
+        linter = RegionLinter()
+        linter.lint(MODELS, "app/models.py")
+        assert (linter.hits, linter.misses) == (0, 4)
+
+        edited = MODELS.replace("IntegerField(default=0)", "IntegerField(db_default=0, default=0)")
+        assert linter.lint(edited, "app/models.py") == lint_source(edited, "app/models.py")
+        assert (linter.hits, linter.misses) == (3, 5)
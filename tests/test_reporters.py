@@ -0,0 +1,78 @@
+# Python imports
+import io
+import json
+
+# Internal imports
+from flake8_routable import ROU103, ROU105, cli
+from flake8_routable.reporters import RULES, JsonLinesReporter, SarifReporter, write_report
+
+
+ROWS = [("app/views.py", 1, 9, ROU103), ("app/views.py", 1, 0, ROU105), ("app/urls.py", 3, 4, "ROU999 Unknown rule")]
+
+
+class CountingWriter(io.StringIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        return super().write(text)
+
+
+class TestReporters:
+    def test_text(self):
+        out = io.StringIO()
+        assert write_report(ROWS[:1], out) == 1
+        assert out.getvalue() == "app/views.py:1:10: ROU103 Object does not have attributes in order\n"
+
+    def test_json_lines(self):
+        out = io.StringIO()
+        assert write_report(ROWS, out, "jsonl") == 3
+
+        first = json.loads(out.getvalue().splitlines()[0])
+        assert first == {
+            "code": "ROU103",
+            "column": 10,
+            "filename": "app/views.py",
+            "line": 1,
+            "message": "Object does not have attributes in order",
+        }
+
+    def test_sarif(self):
+        out = io.StringIO()
+        write_report(ROWS, out, "sarif")
+
+        run = json.loads(out.getvalue())["runs"][0]
+        rules = run["tool"]["driver"]["rules"]
+        assert len(rules) == len(RULES)
+        assert [result["ruleId"] for result in run["results"]] == ["ROU103", "ROU105", "ROU999"]
+        assert rules[run["results"][1]["ruleIndex"]]["id"] == "ROU105"
+        assert "ruleIndex" not in run["results"][2]
+        assert run["results"][0]["locations"][0]["physicalLocation"]["region"] == {"startColumn": 10, "startLine": 1}
+
+    def test_empty_sarif(self):
+        out = io.StringIO()
+        assert write_report([], out, "sarif") == 0
+        assert json.loads(out.getvalue())["runs"][0]["results"] == []
+
+    def test_writes_are_buffered(self):
+        rows = (("app/views.py", line, 0, ROU103) for line in range(1, 10001))
+        out = CountingWriter()
+        assert JsonLinesReporter(out, buffer_bytes=64 * 1024).report(rows) == 10000
+        assert out.writes <= len(out.getvalue()) // (64 * 1024) + 1
+
+        out = CountingWriter()
+        SarifReporter(out, buffer_bytes=1).report(ROWS)
+        assert out.writes == 5
+        assert json.loads(out.getvalue())
+
+
+class TestCli:
+    def test_check_writes_sarif(self, tmp_path, monkeypatch):
+        (tmp_path / "views.py").write_text('LIMITS = {"b": 1, "a": 2}\n')
+        monkeypatch.chdir(tmp_path)
+
+        assert cli.main(["check", "views.py", "--no-daemon", "--format", "sarif", "--output", "report.sarif"]) == 1
+        with open("report.sarif") as f:
+            assert [result["ruleId"] for result in json.load(f)["runs"][0]["results"]] == ["ROU103"]
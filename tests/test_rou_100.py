@@ -30,6 +30,8 @@ class TestROU100:
         "    return x + y\n"
     )
 
+    FUNC_ONE_LINE_HASH_AFTER = "def foo(): pass\n# Not a docstring, the body is already over\nx = 1\n"
+
     FUNC_DOCSTRING_TRIPLE_SINGLE_QUOTES_MULTI_LINE = (
         "def foo(\n"
         "    one_really_long_argument,\n"
@@ -53,6 +55,20 @@ class TestROU100:
         "    return y\n"
     )
 
+    FUNC_ANNOTATED_MULTI_LINE_DOCSTRING_HASH = (
+        "def foo(\n" "    x: int,\n" "    y: int,\n" ") -> int:\n" "    # Hash mon?\n" "    return x + y\n"
+    )
+
+    FUNC_ANNOTATED_MULTI_LINE_SIGNATURE_HASH = (
+        "def foo(\n"
+        "    x: int,\n"
+        "    # y is optional\n"
+        "    y: int = 0,\n"
+        ") -> int:\n"
+        '    """ What a lovely docstring """\n'
+        "    return x + y\n"
+    )
+
     METHOD_DOCSTRING_HASH = "class Bar:\n" "    def __init__(self, x):\n" "        # Hash mon?\n" "        self.x = x\n"
 
     METHOD_DOCSTRING_TRIPLE_DOUBLE_QUOTES = (
@@ -89,6 +105,14 @@ class TestROU100:
         errors = results(self.FUNC_IGNORE_INLINE_HASH)
         assert errors == set()
 
+    def test_incorrect_docstring_annotated_multi_line_function(self):
+        errors = results(self.FUNC_ANNOTATED_MULTI_LINE_DOCSTRING_HASH)
+        assert errors == {"5:4: ROU100 Triple double quotes not used for docstring"}
+
+    def test_ignore_hash_comment_in_signature(self):
+        errors = results(self.FUNC_ANNOTATED_MULTI_LINE_SIGNATURE_HASH)
+        assert errors == set()
+
     @pytest.mark.parametrize("doc_string", (METHOD_DOCSTRING_TRIPLE_SINGLE_QUOTES, METHOD_DOCSTRING_HASH))
     def test_incorrect_docstring_method(self, doc_string):
         errors = results(doc_string)
@@ -97,3 +121,7 @@ class TestROU100:
     def test_incorrect_docstring_multi_line_function(self):
         errors = results(self.FUNC_DOCSTRING_TRIPLE_SINGLE_QUOTES_MULTI_LINE)
         assert errors == {"5:4: ROU100 Triple double quotes not used for docstring"}
+
+    def test_ignore_hash_comment_after_one_line_function(self):
+        errors = results(self.FUNC_ONE_LINE_HASH_AFTER)
+        assert errors == set()
@@ -18,6 +18,24 @@ instance.save(  # multi-line with update_fields
 )
 """
 
+    SAVE_MULTILINE_WITH_UPDATE_FIELDS = """from app.models import Model
+instance = Model(id="123", name="test")
+instance.save(
+    update_fields=["id", "name"],
+)
+"""
+
+    SAVE_MULTILINE_WITHOUT_UPDATE_FIELDS = """from app.models import Model
+Model.objects.get(
+    id="123",
+).save(
+    using="default",
+)
+"""
+
+    SAVE_IN_STRING = """message = "call instance.save() when done"
+"""
+
     SAVE_WITHOUT_UPDATE_FIELDS = """from app.models import Model
 instance = Model(id="123", name="test")
 instance.save()
@@ -37,6 +55,20 @@ instance.save()  {comment}
         errors = results(self.SAVE_MULTILINE_WITH_UPDATE_FIELDS_FLAG)
         assert errors == set()
 
+    def test_save_multiline_with_update_fields(self):
+        errors = results(self.SAVE_MULTILINE_WITH_UPDATE_FIELDS)
+        assert errors == set()
+
+    def test_save_multiline_without_update_fields(self):
+        errors = results(self.SAVE_MULTILINE_WITHOUT_UPDATE_FIELDS)
+        assert errors == {
+            "4:0: ROU110 Disallow .save() with no update_fields",
+        }
+
+    def test_save_in_string(self):
+        errors = results(self.SAVE_IN_STRING)
+        assert errors == set()
+
     def test_save_without_update_fields(self):
         errors = results(self.SAVE_WITHOUT_UPDATE_FIELDS)
         assert errors == {
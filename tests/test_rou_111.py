@@ -21,6 +21,21 @@ def method():
     FeatureFlag.objects.get_or_create(company=company, feature_flag=flag)
 """
 
+    FEATURE_FLAG_CHAINED_UPDATE_OR_CREATE = """from feature_config.models import FeatureFlag
+def method():
+    FeatureFlag.objects.filter(
+        company=company,
+    ).update_or_create(feature_flag=flag)
+"""
+
+    FEATURE_FLAG_QUALIFIED_CREATE = """from feature_config import models
+models.FeatureFlag.objects.create(company=company, feature_flag=flag)
+"""
+
+    OTHER_MODEL_CREATE = """from app.models import Company
+Company.objects.create(name="FeatureFlag.objects.create")
+"""
+
     FEATURE_FLAG_WITH_COMMENT = """from feature_config.models import FeatureFlag
 FeatureFlag.objects.create(  {comment}
     company=company, feature_flag=flag
@@ -45,6 +60,22 @@ FeatureFlag.objects.create(  {comment}
             "3:0: ROU111 Disallow FeatureFlag creation in code",
         }
 
+    def test_feature_flag_chained_update_or_create(self):
+        errors = results(self.FEATURE_FLAG_CHAINED_UPDATE_OR_CREATE)
+        assert errors == {
+            "5:4: ROU111 Disallow FeatureFlag creation in code",
+        }
+
+    def test_feature_flag_qualified_create(self):
+        errors = results(self.FEATURE_FLAG_QUALIFIED_CREATE)
+        assert errors == {
+            "2:0: ROU111 Disallow FeatureFlag creation in code",
+        }
+
+    def test_other_model_create(self):
+        errors = results(self.OTHER_MODEL_CREATE)
+        assert errors == set()
+
     @pytest.mark.parametrize(
         "comment",
         [
@@ -102,9 +102,32 @@ class TestROU112:
 
     TASK_SINGLELINE_MISSING_ARGS_KWARGS = "\n" "@shared_task\n" "def task_method(field_1, field_2):\n" "    pass\n" "\n"
 
+    TASK_ALIASED_IMPORT_MISSING_ARGS_KWARGS = (
+        "from celery import shared_task as task\n"
+        "\n"
+        "\n"
+        "@task(bind=True)\n"
+        "async def task_method(self, field_1) -> None:\n"
+        "    pass\n"
+    )
+
+    TASK_MODULE_ATTRIBUTE_MISSING_ARGS_KWARGS = (
+        "import celery\n" "\n" "\n" "@celery.shared_task\n" "def task_method(field_1: dict = {'a': 1}):\n" "    pass\n"
+    )
+
+    NOT_A_TASK = (
+        "from app.decorators import cached as shared_task\n"
+        "\n"
+        "\n"
+        "@shared_task\n"
+        "def method(field_1):\n"
+        "    pass\n"
+    )
+
     @pytest.mark.parametrize(
         "code",
         (
+            NOT_A_TASK,
             TASK_DECORATOR_WITH_PARAMS_WITH_ARGS_KWARGS,
             TASK_WITH_TYPES_WITH_PARAMS_WITH_ARGS_KWARGS,
             TASK_MULTILINE_WITH_ARGS_KWARGS,
@@ -126,6 +149,8 @@ class TestROU112:
             (TASK_SINGLELINE_MISSING_KWARGS, "3:40"),
             (TASK_MULTILINE_MISSING_ARGS_KWARGS, "6:1"),
             (TASK_SINGLELINE_MISSING_ARGS_KWARGS, "3:33"),
+            (TASK_ALIASED_IMPORT_MISSING_ARGS_KWARGS, "5:44"),
+            (TASK_MODULE_ATTRIBUTE_MISSING_ARGS_KWARGS, "5:41"),
         ),
     )
     def test_incorrect_signature(self, code, location):
@@ -59,6 +59,15 @@ class TestROU113:
         "\n"
     )
 
+    TASK_WITH_PRIORITY_IN_DECORATOR = (
+        "from celery import shared_task\n"
+        "\n"
+        "\n"
+        "@shared_task(queue=QUEUE, priority=5)\n"
+        "def task_method(field_1, *args, **kwargs):\n"
+        "    pass\n"
+    )
+
     @pytest.mark.parametrize(
         "code",
         (TASK_WITH_OUT_PRIORITY,),
@@ -85,6 +94,7 @@ class TestROU113:
                     "8:1: ROU112 Tasks mush have *args, **kwargs",
                 },
             ),
+            (TASK_WITH_PRIORITY_IN_DECORATOR, {"4:26: ROU113 Tasks can not have priority in the signature"}),
         ),
     )
     def test_incorrect_signature(self, code, error):
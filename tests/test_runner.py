@@ -0,0 +1,127 @@
+# Python imports
+import subprocess
+import sys
+
+# Internal imports
+from flake8_routable.cache import ResultCache, blob_id
+from flake8_routable.runner import (
+    RunStats,
+    group_by_content,
+    iter_python_files,
+    lint_buffer,
+    lint_paths,
+    lint_source,
+)
+
+
+NOQA_SOURCE = (
+    "from .a import b  # noqa\n"
+    "from .c import d  # noqa: ROU101\n"
+    "from .e.tests import f  # NOQA:ROU106,ROU101\n"
+    "g = {'b': 1, 'a': 2}  # noqa: ROU1\n"
+    'invoice.note = """\n'
+    "    paid\n"
+    '""".strip()  # noqa: E501, ROU102\n'
+    "invoice.save()\n"
+)
+
+
+class TestRunner:
+    def test_lint_source(self):
+        assert lint_source("from foo.tests import bar\n", "file.py") == [(1, 0, "ROU101 Import from a tests directory")]
+
+    def test_lint_source_syntax_error(self):
+        assert lint_source("def (\n", "file.py") == []
+
+    def test_lint_paths_undecodable(self, tmp_path):
+        (tmp_path / "cookie.py").write_bytes(b'# -*- coding: bogus -*-\nx = {"b": 1, "a": 2}\n')
+        (tmp_path / "latin1.py").write_bytes(b'x = {"b": "\xff", "a": 2}\n')
+
+        assert list(lint_paths(["."], root=str(tmp_path))) == [
+            ("./cookie.py", 2, 4, "ROU103 Object does not have attributes in order"),
+            ("./latin1.py", 1, 4, "ROU103 Object does not have attributes in order"),
+        ]
+
+    def test_noqa(self, tmp_path):
+        assert lint_buffer(NOQA_SOURCE, "file.py") == [
+            (2, 0, "ROU106 Relative imports are not allowed"),
+            (8, 0, "ROU110 Disallow .save() with no update_fields"),
+        ]
+        assert lint_buffer(f"# flake8: noqa\n{NOQA_SOURCE}", "file.py") == []
+
+        (tmp_path / "file.py").write_text(NOQA_SOURCE)
+        flake8 = [sys.executable, "-m", "flake8", "--select", "ROU", "--format", "%(row)d:%(col)d: %(code)s %(text)s"]
+        output = subprocess.run([*flake8, "file.py"], capture_output=True, text=True, cwd=tmp_path).stdout
+        assert output.splitlines() == [
+            f"{line}:{col + 1}: {msg}" for line, col, msg in lint_buffer(NOQA_SOURCE, "file.py")
+        ]
+
+    def test_iter_python_files(self, tmp_path):
+        (tmp_path / "app" / "migrations").mkdir(parents=True)
+        (tmp_path / "app" / "migrations" / "0001_initial.py").write_text("")
+        (tmp_path / "app" / "README.md").write_text("")
+        (tmp_path / "setup.py").write_text("")
+
+        assert list(iter_python_files(["."], root=str(tmp_path))) == [
+            "./setup.py",
+            "./app/migrations/0001_initial.py",
+        ]
+
+    def test_lint_paths_cache(self, tmp_path):
+        (tmp_path / "a.py").write_text("from .b import c\n")
+        cache = ResultCache()
+
+        for _ in range(2):
+            assert list(lint_paths(["a.py"], cache=cache, root=str(tmp_path))) == [
+                ("a.py", 1, 0, "ROU106 Relative imports are not allowed")
+            ]
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_lint_paths_hashes_once(self, tmp_path, monkeypatch):
+        (tmp_path / "a.py").write_text("from .b import c\n")
+        cache = ResultCache()
+        # the key comes from grouping the files by content
+        monkeypatch.setattr(ResultCache, "key", None)
+
+        list(lint_paths(["a.py"], cache=cache, root=str(tmp_path)))
+
+        assert list(cache._entries) == [(blob_id(b"from .b import c\n"), "a.py")]
+
+    def test_cache_file(self, tmp_path):
+        cache = ResultCache()
+        cache.set(("abc", "a.py"), [(1, 0, "ROU106 Relative imports are not allowed")])
+        cache.write(str(tmp_path / "results.json"), "settings")
+
+        loaded = ResultCache.load(str(tmp_path / "results.json"), "settings")
+        assert loaded.get(("abc", "a.py")) == [(1, 0, "ROU106 Relative imports are not allowed")]
+        assert len(ResultCache.load(str(tmp_path / "results.json"), "other settings")) == 0
+        assert len(ResultCache.load(str(tmp_path / "missing.json"), "settings")) == 0
+
+    def test_lint_paths_lints_duplicates_once(self, tmp_path):
+        source = "from .b import c\n\n\nclass Foo(BaseModel):\n    name = models.CharField(default='')\n"
+        (tmp_path / "app" / "migrations").mkdir(parents=True)
+        for name in ("app/migrations/0001.py", "app/models.py", "app/copy.py", "app/other.py"):
+            (tmp_path / name).write_text(source if name != "app/other.py" else "x = 1\n")
+        stats = RunStats()
+
+        rows = list(lint_paths(["app"], root=str(tmp_path), stats=stats))
+
+        assert rows == [
+            ("app/copy.py", 1, 0, "ROU106 Relative imports are not allowed"),
+            ("app/copy.py", 5, 18, "ROU114 Field default exists but db_default does not"),
+            ("app/models.py", 1, 0, "ROU106 Relative imports are not allowed"),
+            ("app/models.py", 5, 18, "ROU114 Field default exists but db_default does not"),
+            ("app/migrations/0001.py", 1, 0, "ROU106 Relative imports are not allowed"),
+        ]
+        assert (stats.counts["files"], stats.counts["duplicates"]) == (2, 2)
+
+    def test_group_by_content(self, tmp_path):
+        (tmp_path / "tests").mkdir()
+        (tmp_path / "tests" / "a.py").write_text("x = 1\n")
+        (tmp_path / "b.py").write_text("x = 1\n")
+        (tmp_path / "c.py").write_text("# routable: skip-file\n")
+        (tmp_path / "d.py").write_text("# routable: skip-file\n")
+
+        groups = group_by_content(["./tests/a.py", "./b.py", "c.py", "d.py"], root=str(tmp_path))
+
+        assert groups == [(blob_id(b"x = 1\n"), ["./b.py", "./tests/a.py"]), (None, ["c.py"]), (None, ["d.py"])]
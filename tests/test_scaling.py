@@ -0,0 +1,72 @@
+# Python imports
+import ast
+import gc
+import io
+import math
+import time
+import tokenize
+import tracemalloc
+
+# Pip imports
+import pytest
+
+# Internal imports
+from flake8_routable import STATEMENT_MEMOS, Plugin
+from flake8_routable.corpus import SOURCES
+
+
+SCALES = (1, 4, 16)
+
+# timed runs at each scale, the small sizes are timed more often since their noise weighs most on the ratios
+REPEATS = (5, 3, 1)
+
+# the highest exponent of the size the time and memory may grow with, linear growth is 1 and quadratic 2
+MAX_EXPONENT = 1.3
+
+
+def measure(source, filename, repeats):
+    """The fastest time of `Plugin.run` over `repeats` runs and its peak traced memory, without parsing."""
+    tree = ast.parse(source)
+    lines = source.splitlines(keepends=True)
+    tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+
+    # the memos would otherwise answer every repeated run from the first one
+    def run():
+        for memo in STATEMENT_MEMOS.values():
+            memo.clear()
+        return list(Plugin(tree, tokens, filename, lines).run())
+
+    seconds = []
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            run()
+            seconds.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(seconds), peak
+
+
+def growth_exponent(values):
+    """The exponent `k` of the scale in `value = c * scale ** k` best fitting `values`, the slope of a log-log fit."""
+    xs = [math.log(scale) for scale in SCALES]
+    ys = [math.log(value) for value in values]
+    x_mean, y_mean = sum(xs) / len(xs), sum(ys) / len(ys)
+    return sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / sum((x - x_mean) ** 2 for x in xs)
+
+
+@pytest.mark.scaling
+@pytest.mark.parametrize("generate,filename", SOURCES, ids=[generate.__name__ for generate, _ in SOURCES])
+def test_grows_linearly(generate, filename):
+    seconds, peaks = zip(*(measure(generate(scale), filename, repeats) for scale, repeats in zip(SCALES, REPEATS)))
+
+    assert growth_exponent(seconds) < MAX_EXPONENT, f"time grew as size ** {growth_exponent(seconds):.2f}"
+    assert growth_exponent(peaks) < MAX_EXPONENT, f"peak memory grew as size ** {growth_exponent(peaks):.2f}"
@@ -0,0 +1,99 @@
+# Python imports
+from concurrent.futures import ProcessPoolExecutor
+
+# Internal imports
+from flake8_routable.runner import lint_paths
+from flake8_routable.scheduling import MemoryAwareScheduler, Task, estimate_cost
+
+
+RELATIVE_IMPORT = "from .b import c\n"
+
+
+def write_files(tmp_path, sizes):
+    for name, size in sizes.items():
+        # the name keeps the contents distinct, files with the same contents are only linted once
+        (tmp_path / name).write_text(RELATIVE_IMPORT + f"# {name}".ljust(size - len(RELATIVE_IMPORT) - 1, "#") + "\n")
+
+
+class TestMemoryAwareScheduler:
+    def test_plan(self, tmp_path):
+        write_files(tmp_path, {"a.py": 300, "b.py": 300, "big.py": 5000, "bigger.py": 8000, "c.py": 300})
+        scheduler = MemoryAwareScheduler(large_file_bytes=4000, batch_bytes=500, root=str(tmp_path))
+
+        tasks = scheduler.plan(["a.py", "big.py", "b.py", "bigger.py", "c.py"])
+        assert [(task.filenames, task.is_large) for task in tasks] == [
+            (["bigger.py"], True),
+            (["big.py"], True),
+            (["a.py", "b.py"], False),
+            (["c.py"], False),
+        ]
+        assert tasks[0].cost == estimate_cost(8000)
+
+    def test_admission_control(self):
+        scheduler = MemoryAwareScheduler(memory_budget=100)
+        tasks = [Task(["large.py"], 90, True), Task(["small.py"], 10, False)]
+
+        assert scheduler._admit(tasks, in_flight_cost=50, is_idle=False).filenames == ["small.py"]
+        assert scheduler._admit(tasks, in_flight_cost=50, is_idle=False) is None
+        # a task larger than what is left still runs once nothing else is in flight
+        assert scheduler._admit(tasks, in_flight_cost=0, is_idle=True).filenames == ["large.py"]
+
+    def test_worker_counts(self):
+        small, large = Task(["small.py"], 10, False), Task(["large.py"], 90, True)
+        scheduler = MemoryAwareScheduler(processes=4)
+
+        assert scheduler.worker_counts([small] * 8) == {False: 4, True: 0}
+        assert scheduler.worker_counts([large] * 8) == {False: 0, True: 4}
+        assert scheduler.worker_counts([large, small]) == {False: 3, True: 1}
+        assert scheduler.worker_counts([large] * 8 + [small]) == {False: 1, True: 3}
+        assert MemoryAwareScheduler(processes=1).worker_counts([large, small]) == {False: 1, True: 1}
+
+    def test_admission_to_free_workers(self):
+        scheduler = MemoryAwareScheduler(memory_budget=100)
+        tasks = [Task(["large.py"], 20, True), Task(["small.py"], 10, False)]
+
+        assert scheduler._admit(tasks, in_flight_cost=0, is_idle=False, full={True}).filenames == ["small.py"]
+        assert scheduler._admit(tasks, in_flight_cost=0, is_idle=False, full={True}) is None
+
+    def test_run(self, tmp_path):
+        write_files(tmp_path, {"a.py": 300, "b.py": 300, "big.py": 5000})
+        scheduler = MemoryAwareScheduler(processes=2, large_file_bytes=4000, root=str(tmp_path))
+
+        file_results = dict(scheduler.run(["a.py", "b.py", "big.py"]))
+
+        serial = list(lint_paths(["a.py", "b.py", "big.py"], root=str(tmp_path)))
+        assert sorted((filename, *result) for filename, results in file_results.items() for result in results) == (
+            sorted(serial)
+        )
+        assert sum(stats.files for stats in scheduler.worker_stats.values()) == 3
+        assert [stats.dedicated for stats in scheduler.worker_stats.values()].count(True) == 1
+        assert all(stats.peak_rss > 0 for stats in scheduler.worker_stats.values())
+
+    def test_run_lints_duplicates_once(self, tmp_path):
+        (tmp_path / "app").mkdir()
+        for name in ("a.py", "b.py", "app/c.py"):
+            (tmp_path / name).write_text(RELATIVE_IMPORT)
+        scheduler = MemoryAwareScheduler(processes=2, root=str(tmp_path))
+
+        file_results = dict(scheduler.run(["a.py", "b.py", "app/c.py"]))
+
+        assert file_results == {name: [(1, 0, "ROU106 Relative imports are not allowed")] for name in file_results}
+        assert len(file_results) == 3
+        assert sum(stats.files for stats in scheduler.worker_stats.values()) == 1
+        assert scheduler.stats.counts["duplicates"] == 2
+
+    def test_run_stopped_early(self, tmp_path, monkeypatch):
+        write_files(tmp_path, {"a.py": 300, "b.py": 300, "big.py": 5000})
+        shutdowns = []
+        shutdown = ProcessPoolExecutor.shutdown
+        monkeypatch.setattr(
+            ProcessPoolExecutor,
+            "shutdown",
+            lambda self, **kwargs: shutdowns.append(kwargs) or shutdown(self, **kwargs),
+        )
+        scheduler = MemoryAwareScheduler(processes=2, large_file_bytes=4000, batch_bytes=100, root=str(tmp_path))
+
+        file_results = scheduler.run(["a.py", "b.py", "big.py"])
+        next(file_results)
+        file_results.close()
+        assert shutdowns == [{"cancel_futures": True, "wait": False}] * 2
@@ -0,0 +1,151 @@
+# Python imports
+import os
+
+# Pip imports
+import pytest
+
+# Internal imports
+from flake8_routable import cli, daemon
+from flake8_routable.cache import ResultCache
+from flake8_routable.runner import RunStats, first_failing_file, lint_paths
+from flake8_routable.sharding import TimingHistory, assign_shards, changed_first, parse_shard, select_shard
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / "app" / "migrations").mkdir(parents=True)
+    for index in range(6):
+        (tmp_path / "app" / "migrations" / f"000{index}.py").write_text('LIMITS = {"b": 1, "a": 2}\n' * (index + 1))
+    (tmp_path / "app" / "views.py").write_text("x = 1\n" * 200)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestSharding:
+    def test_parse_shard(self):
+        assert parse_shard("2/4") == (2, 4)
+        for value in ("0/4", "5/4", "1", "a/b"):
+            with pytest.raises(ValueError):
+                parse_shard(value)
+
+    def test_longest_processing_time(self):
+        costs = {"a.py": 5.0, "b.py": 4.0, "c.py": 3.0, "d.py": 3.0, "e.py": 1.0}
+        assert assign_shards(costs, 2) == [["a.py", "d.py"], ["b.py", "c.py", "e.py"]]
+        assert assign_shards(costs, 7)[5:] == [[], []]
+
+    def test_costs_without_history_follow_size(self, project):
+        costs = TimingHistory().costs(["app/views.py", "app/migrations/0000.py"])
+        assert costs["app/views.py"] == pytest.approx(costs["app/migrations/0000.py"] * 1200 / 26)
+
+    def test_history(self, project):
+        history = TimingHistory()
+        history.update({"./app/gone.py": 1.0, "./app/views.py": 2.0}, ["app/views.py", "app/migrations/0000.py"])
+
+        costs = history.costs(["app/views.py", "app/migrations/0000.py"])
+        assert costs["app/views.py"] == 2.0
+        # estimated at the measured rate, 2 seconds for 1200 bytes
+        assert costs["app/migrations/0000.py"] == pytest.approx(2.0 * 26 / 1200)
+        assert len(history) == 1
+
+    def test_cache_hits_are_not_timed(self, project):
+        cache = ResultCache()
+        stats = RunStats(record_durations=True)
+        list(lint_paths(["app"], cache=cache, stats=stats))
+        assert len(stats.durations) == 7
+
+        stats = RunStats(record_durations=True)
+        list(lint_paths(["app"], cache=cache, stats=stats))
+        assert stats.durations == {}
+
+    def test_shards_cover_every_file_once(self, project):
+        filenames = [os.path.join("app", "migrations", f"000{index}.py") for index in range(6)]
+        shards = [select_shard(filenames, (index, 3), TimingHistory()) for index in (1, 2, 3)]
+        assert sorted(sum(shards, [])) == filenames
+        assert all(shards)
+
+
+class TestOrdering:
+    def test_changed_first(self, project):
+        history = TimingHistory()
+        filenames = ["a.py", "b.py", "c.py", "d.py", "e.py"]
+        for filename in filenames:
+            (project / filename).write_text("")
+        history.update(dict.fromkeys(filenames, 0.1), filenames, violations={"c.py": 1, "e.py": 3})
+
+        assert changed_first(filenames, {"b.py": 0, "d.py": 2, "e.py": 2}, history) == [
+            "b.py",
+            "e.py",
+            "d.py",
+            "c.py",
+            "a.py",
+        ]
+
+    def test_first_failing_file(self):
+        closed = []
+
+        def file_results():
+            try:
+                yield from [("a.py", []), ("b.py", [(1, 0, "ROU103"), (2, 0, "ROU103")]), ("c.py", [(1, 0, "ROU103")])]
+            finally:
+                closed.append(True)
+
+        assert [row[:2] for row in first_failing_file(file_results())] == [("b.py", 1), ("b.py", 2)]
+        assert closed
+
+
+class TestCli:
+    def test_records_history_and_shards(self, project, capsys):
+        assert cli.main(["check", "app", "--timing-history", ".cache/timings.json"]) == 1
+        lines = capsys.readouterr().out.splitlines()
+        assert len(TimingHistory.load(".cache/timings.json")) == 7
+
+        sharded = []
+        for index in (1, 2):
+            args = ["check", "app", "--no-daemon", "--shard", f"{index}/2", "--timing-history", ".cache/timings.json"]
+            cli.main(args)
+            sharded += capsys.readouterr().out.splitlines()
+        assert sorted(sharded) == sorted(lines)
+
+    def test_shard_changed_first(self, project, capsys):
+        assert cli.main(["check", "app", "--no-daemon"]) == 1
+        lines = capsys.readouterr().out.splitlines()
+
+        sharded = []
+        for index in (1, 2):
+            cli.main(["check", "app", "--no-daemon", "--shard", f"{index}/2", "--changed-first"])
+            sharded += capsys.readouterr().out.splitlines()
+        assert sorted(sharded) == sorted(lines)
+
+    def test_fail_fast(self, project, capsys):
+        assert cli.main(["check", "app", "--no-daemon", "--threads", "2", "--fail-fast"]) == 1
+        assert {line.split(":")[0] for line in capsys.readouterr().out.splitlines()} == {"app/migrations/0000.py"}
+
+    @pytest.mark.parametrize("options", [[], ["--threads", "2"], ["--baseline", "baseline.txt"]])
+    def test_fail_fast_stops_linting(self, project, capsys, options):
+        (project / "baseline.txt").write_text("")
+        assert cli.main(["check", "app", "--no-daemon", "--fail-fast", "--statistics", *options]) == 1
+        output = capsys.readouterr()
+        assert {line.split(":")[0] for line in output.out.splitlines()} == {"app/migrations/0000.py"}
+        if not options:
+            # app/views.py comes first and is clean, no file after the failing one is linted
+            assert output.err == "files: 2\n"
+
+    def test_fail_fast_lints_in_process(self, project, capsys, monkeypatch):
+        def request(*args, **kwargs):
+            raise AssertionError("linted through the daemon")
+
+        monkeypatch.setattr(daemon, "request", request)
+        assert cli.main(["check", "app", "--fail-fast"]) == 1
+        assert {line.split(":")[0] for line in capsys.readouterr().out.splitlines()} == {"app/migrations/0000.py"}
+
+    def test_changed_first_records_violations(self, project, capsys):
+        assert cli.main(["check", "app", "--changed-first", "--timing-history", ".cache/timings.json"]) == 1
+        history = TimingHistory.load(".cache/timings.json")
+        assert history.violations("app/migrations/0005.py") == 6
+        assert history.violations("app/views.py") == 0
+        capsys.readouterr()
+
+        cli.main(
+            ["check", "app", "--no-daemon", "--changed-first", "--fail-fast", "--timing-history", ".cache/timings.json"]
+        )
+        assert {line.split(":")[0] for line in capsys.readouterr().out.splitlines()} == {"app/migrations/0005.py"}
@@ -0,0 +1,57 @@
+# Python imports
+import ast
+import tokenize
+
+# Internal imports
+from flake8_routable import ALL_CODES, STYLE_CODES, Plugin, SkipConfig
+from flake8_routable.runner import RunStats, lint_paths
+
+
+GENERATED = "# Generated by Django 4.2\nx = {'b': 1, 'a': 2}\nfrom .a import b\n"
+
+
+def plugin_results(source, filename="file.py"):
+    lines = source.splitlines(keepends=True)
+    file_tokens = list(tokenize.generate_tokens(iter(lines).__next__))
+    return sorted(Plugin(ast.parse(source), file_tokens, filename, lines).run())
+
+
+class TestSkipConfig:
+    def test_markers(self):
+        config = SkipConfig()
+        assert config.disabled_codes("# routable: skip-file\n", 10) == ALL_CODES
+        assert config.disabled_codes(GENERATED, 10) == STYLE_CODES
+        assert config.disabled_codes("x = 1\n", 10) == frozenset()
+
+    def test_thresholds(self):
+        config = SkipConfig(max_bytes=100, max_lines=10)
+        assert config.disabled_codes("", 101) == STYLE_CODES
+        assert config.disabled_codes("", 50, 11) == STYLE_CODES
+        assert config.disabled_codes("", 50, None) == frozenset()
+        assert config.disabled_codes("", 100, 10) == frozenset()
+
+
+class TestPlugin:
+    def test_skip_file(self):
+        assert plugin_results("# routable: skip-file\nfrom .a import b\n") == []
+
+    def test_generated_file_keeps_non_style_rules(self):
+        assert plugin_results(GENERATED) == [(3, 0, "ROU106 Relative imports are not allowed", Plugin)]
+
+    def test_without_lines(self):
+        source = "# routable: skip-file\nfrom .a import b\n"
+        file_tokens = list(tokenize.generate_tokens(iter(source.splitlines(keepends=True)).__next__))
+        assert len(list(Plugin(ast.parse(source), file_tokens, "file.py").run())) == 1
+
+
+class TestRunner:
+    def test_stats(self, tmp_path):
+        (tmp_path / "generated.py").write_text(GENERATED)
+        (tmp_path / "skipped.py").write_text("# routable: skip-file\nfrom .a import b\n")
+        (tmp_path / "large.py").write_text("x = {'b': 1, 'a': 2}\n" + "#\n" * 100)
+        stats = RunStats()
+
+        results = list(lint_paths(["."], root=str(tmp_path), skip_config=SkipConfig(max_lines=50), stats=stats))
+
+        assert results == [("./generated.py", 3, 0, "ROU106 Relative imports are not allowed")]
+        assert (stats.counts["files"], stats.counts["reduced"], stats.counts["skipped"]) == (3, 2, 1)
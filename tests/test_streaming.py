@@ -0,0 +1,65 @@
+# Python imports
+import ast
+import io
+import tokenize
+
+# Pip imports
+import pytest
+
+# Internal imports
+import flake8_routable
+from flake8_routable import Plugin
+from flake8_routable.runner import lint_source
+
+
+def counted_tokens(source, pulled):
+    for token in tokenize.generate_tokens(io.StringIO(source).readline):
+        pulled.append(token)
+        yield token
+
+
+class TestStreaming:
+    def test_small_chunks_match_whole_file(self, monkeypatch, snippets):
+        expected = [lint_source(source, filename) for source, filename in snippets]
+
+        monkeypatch.setattr(flake8_routable, "TOKEN_CHUNK_SIZE", 3)
+        assert [lint_source(source, filename) for source, filename in snippets] == expected
+
+    @pytest.mark.parametrize("chunk_size", (1, 2, 5))
+    def test_signatures_across_chunks(self, monkeypatch, chunk_size):
+        source = (
+            "@shared_task\n"
+            "def one(): pass\n"
+            "# not a docstring\n"
+            "def two(x: int) -> int:\n"
+            "    # comment docstring\n"
+            "    return x\n"
+            "class Three:\n"
+            '    x = f("""a\n'
+            'b""")\n'
+        )
+        expected = lint_source(source, "file.py")
+        assert {code[:6] for _, _, code in expected} == {"ROU100", "ROU102", "ROU112"}
+
+        monkeypatch.setattr(flake8_routable, "TOKEN_CHUNK_SIZE", chunk_size)
+        assert lint_source(source, "file.py") == expected
+
+    def test_generated_tokens_match_token_list(self, snippets):
+        for source, filename in snippets:
+            try:
+                tree = ast.parse(source)
+            except SyntaxError:
+                continue
+            file_tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+            assert sorted(Plugin(tree, iter(file_tokens), filename).errors()) == sorted(
+                Plugin(tree, file_tokens, filename).errors()
+            )
+
+    def test_tokens_are_read_once(self):
+        source = "class Foo(BaseModel):\n    id = models.BooleanField(default=False)\n"
+        pulled = []
+
+        errors = list(Plugin(ast.parse(source), counted_tokens(source, pulled), "file.py").errors())
+
+        assert errors == [(2, 16, "ROU114 Field default exists but db_default does not")]
+        assert len(pulled) == len(list(tokenize.generate_tokens(io.StringIO(source).readline)))
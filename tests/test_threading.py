@@ -0,0 +1,61 @@
+# Python imports
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+# Internal imports
+from flake8_routable.cache import ResultCache
+from flake8_routable.regions import RegionLinter
+from flake8_routable.runner import lint_paths, lint_source
+
+
+THREADS = 8
+
+
+class TestThreading:
+    def test_concurrent_runs_match_serial_run(self, snippets):
+        expected = [lint_source(source, filename) for source, filename in snippets]
+
+        def lint_shuffled(seed):
+            order = list(range(len(snippets)))
+            random.Random(seed).shuffle(order)
+            results = [None] * len(snippets)
+            for i in order:
+                results[i] = lint_source(*snippets[i])
+            return results
+
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            for results in executor.map(lint_shuffled, range(THREADS * 2)):
+                assert results == expected
+
+    def test_shared_region_linter_matches_serial_run(self, snippets):
+        expected = [lint_source(source, filename) for source, filename in snippets]
+        linter = RegionLinter()
+
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            for _ in range(2):
+                assert list(executor.map(lambda sample: linter.lint(*sample), snippets)) == expected
+
+    def test_lint_paths_threads(self, tmp_path, snippets):
+        for i, (source, _) in enumerate(snippets):
+            (tmp_path / f"module_{i:03}.py").write_text(source)
+        serial = list(lint_paths(["."], root=str(tmp_path)))
+
+        assert serial
+        assert list(lint_paths(["."], root=str(tmp_path), threads=THREADS)) == serial
+        assert list(lint_paths(["."], cache=ResultCache(), root=str(tmp_path), threads=THREADS)) == serial
+
+    def test_lint_paths_threads_stopped_early(self, tmp_path, monkeypatch, snippets):
+        for i, (source, _) in enumerate(snippets):
+            (tmp_path / f"module_{i:03}.py").write_text(source)
+        shutdowns = []
+        shutdown = ThreadPoolExecutor.shutdown
+        monkeypatch.setattr(
+            ThreadPoolExecutor,
+            "shutdown",
+            lambda self, **kwargs: shutdowns.append(kwargs) or shutdown(self, **kwargs),
+        )
+
+        rows = lint_paths(["."], root=str(tmp_path), threads=THREADS)
+        next(rows)
+        rows.close()
+        assert shutdowns == [{"cancel_futures": True, "wait": False}]
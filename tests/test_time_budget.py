@@ -0,0 +1,92 @@
+# Internal imports
+from flake8_routable import ROU117, RuleTimer, SkipConfig, daemon
+from flake8_routable.cache import ResultCache
+from flake8_routable.regions import RegionLinter
+from flake8_routable.runner import RunStats, lint_file, lint_source
+
+
+SOURCE = "from .a import b\n\nx = {'b': 1, 'a': 2}\n"
+
+FULL_RESULTS = [
+    (1, 0, "ROU106 Relative imports are not allowed"),
+    (3, 4, "ROU103 Object does not have attributes in order"),
+]
+
+PARTLY_CHECKED_RESULTS = [
+    (1, 0, "ROU106 Relative imports are not allowed"),
+    (1, 0, ROU117),
+]
+
+
+class TestRuleTimer:
+    def test_expensive_rules_are_skipped_over_budget(self):
+        calls = []
+        timer = RuleTimer(budget=0)
+
+        timer.run(("ROU106",), calls.append, "cheap")
+        timer.run(("ROU103",), calls.append, "expensive")
+
+        assert calls == ["cheap"]
+        assert timer.degraded
+        assert list(timer.timings) == ["ROU106"]
+
+    def test_without_budget(self):
+        timer = RuleTimer()
+        timer.run(("ROU103",), lambda: None)
+        assert not timer.degraded
+        assert timer.slowest_rule() == "ROU103"
+
+
+class TestDegradedMode:
+    def test_lint_source(self):
+        assert lint_source(SOURCE, "file.py") == FULL_RESULTS
+        assert lint_source(SOURCE, "file.py", timer=RuleTimer(budget=0)) == PARTLY_CHECKED_RESULTS
+
+    def test_region_linter_does_not_cache_partly_checked_regions(self):
+        linter = RegionLinter()
+        assert linter.lint(SOURCE, "file.py", timer=RuleTimer(budget=0)) == PARTLY_CHECKED_RESULTS
+        assert linter.lint(SOURCE, "file.py") == FULL_RESULTS
+
+    def test_result_cache_does_not_keep_partly_checked_files(self, tmp_path):
+        (tmp_path / "file.py").write_text(SOURCE)
+        cache = ResultCache()
+        stats = RunStats()
+
+        assert lint_file(
+            "file.py", cache=cache, root=str(tmp_path), skip_config=SkipConfig(time_budget=0), stats=stats
+        ) == (PARTLY_CHECKED_RESULTS)
+        assert lint_file("file.py", cache=cache, root=str(tmp_path)) == FULL_RESULTS
+        assert stats.counts["partly checked"] == 1
+
+    def test_daemon_does_not_cache_partly_checked_buffers(self, tmp_path):
+        server = daemon.LintServer(str(tmp_path / "rou.sock"), skip_config=SkipConfig(time_budget=0))
+        try:
+            request = {"filename": "file.py", "source": SOURCE}
+            assert server.dispatch(request) == [("file.py", *result) for result in PARTLY_CHECKED_RESULTS]
+
+            server.skip_config = SkipConfig()
+            assert server.dispatch(request) == [("file.py", *result) for result in FULL_RESULTS]
+        finally:
+            server.server_close()
+
+
+class TestSlowFileReport:
+    def test_keeps_the_slowest_files(self):
+        stats = RunStats(slow_files=2)
+        for i, seconds in enumerate((0.5, 0.1, 2.0, 1.0)):
+            stats.add_timing(f"file_{i}.py", seconds, "ROU103")
+
+        assert stats.slowest() == [(2.0, "file_2.py", "ROU103"), (1.0, "file_3.py", "ROU103")]
+        assert stats.slow_file_report().splitlines() == [
+            "   2.000s file_2.py (mostly ROU103)",
+            "   1.000s file_3.py (mostly ROU103)",
+        ]
+
+    def test_lint_file_records_timings(self, tmp_path):
+        (tmp_path / "file.py").write_text(SOURCE)
+        stats = RunStats(slow_files=1)
+
+        lint_file("file.py", root=str(tmp_path), stats=stats)
+
+        [(seconds, filename, rule)] = stats.slowest()
+        assert filename == "file.py" and seconds > 0 and rule is not None
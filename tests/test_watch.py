@@ -0,0 +1,58 @@
+# Internal imports
+from flake8_routable.runner import SkipConfig
+from flake8_routable.watch import Watcher
+
+
+RELATIVE_IMPORT = "from .b import c\n"
+
+RELATIVE_IMPORT_RESULT = {"code": "ROU106", "col": 0, "line": 1, "message": "Relative imports are not allowed"}
+
+
+class TestWatcher:
+    def test_initial_poll_reports_files_with_results(self, tmp_path):
+        (tmp_path / "clean.py").write_text("x = 1\n")
+        (tmp_path / "dirty.py").write_text(RELATIVE_IMPORT)
+        watcher = Watcher(["."], root=str(tmp_path))
+
+        assert list(watcher.poll(now=0)) == [{"filename": "./dirty.py", "results": [RELATIVE_IMPORT_RESULT]}]
+        assert list(watcher.poll(now=1)) == []
+
+    def test_change_is_debounced(self, tmp_path):
+        (tmp_path / "a.py").write_text("x = 1\n")
+        watcher = Watcher(["."], root=str(tmp_path), debounce=0.5)
+        list(watcher.poll(now=0))
+
+        (tmp_path / "a.py").write_text(RELATIVE_IMPORT)
+        assert list(watcher.poll(now=1)) == []
+        assert list(watcher.poll(now=1.2)) == []
+        assert list(watcher.poll(now=1.6)) == [{"filename": "./a.py", "results": [RELATIVE_IMPORT_RESULT]}]
+
+        (tmp_path / "a.py").write_text("y = 2\n")
+        list(watcher.poll(now=2))
+        assert list(watcher.poll(now=3)) == [{"filename": "./a.py", "results": []}]
+
+    def test_deleted_file(self, tmp_path):
+        (tmp_path / "a.py").write_text(RELATIVE_IMPORT)
+        watcher = Watcher(["."], root=str(tmp_path))
+        list(watcher.poll(now=0))
+
+        (tmp_path / "a.py").unlink()
+        assert list(watcher.poll(now=1)) == [{"deleted": True, "filename": "./a.py"}]
+        assert watcher.files == {}
+
+    def test_edit_relints_changed_regions(self, tmp_path):
+        (tmp_path / "a.py").write_text(f"{RELATIVE_IMPORT}\n\ndef pay():\n    pass\n")
+        watcher = Watcher(["."], root=str(tmp_path), debounce=0)
+        list(watcher.poll(now=0))
+
+        (tmp_path / "a.py").write_text(f"{RELATIVE_IMPORT}\n\ndef pay():\n    return 1\n")
+        assert list(watcher.poll(now=1)) == [{"filename": "./a.py", "results": [RELATIVE_IMPORT_RESULT]}]
+        assert (watcher.regions.hits, watcher.regions.misses) == (1, 3)
+
+    def test_skip_config_and_noqa(self, tmp_path):
+        (tmp_path / "skipped.py").write_text(f"# routable: skip-file\n{RELATIVE_IMPORT}")
+        (tmp_path / "silenced.py").write_text(RELATIVE_IMPORT.replace("\n", "  # noqa: ROU106\n"))
+        (tmp_path / "reduced.py").write_text(f'{RELATIVE_IMPORT}LIMITS = {{"b": 1, "a": 2}}\n')
+        watcher = Watcher(["."], root=str(tmp_path), skip_config=SkipConfig(max_lines=1))
+
+        assert list(watcher.poll(now=0)) == [{"filename": "./reduced.py", "results": [RELATIVE_IMPORT_RESULT]}]